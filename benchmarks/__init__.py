@@ -0,0 +1,4 @@
+"""Covcheck benchmarks.
+
+Benchmarks are run as modules from the repository root, e.g. `python -m benchmarks.bench_jobs`.
+"""
@@ -0,0 +1,85 @@
+"""Benchmark comparing coverage trees with a baseline as the number of changed files grows.
+
+Compares CoverageDiff.compare with comparing every node by path, as a full walk of both trees would. Hashing both
+trees is linear in their size, as parsing them is, and is also timed on its own, along with the walk of the hashed
+trees, which only descends into changed subtrees.
+
+Usage: python -m benchmarks.bench_baseline_diff [--files N] [--changed N ...] [--depth N]
+"""
+
+import argparse
+import random
+
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.timing import time_operation
+from covcheck import CoverageChange, CoverageDiff, CoverageNode, CoverageNodeType, CoverageSummary
+
+
+def _build(filepaths: List[str], summaries: List[CoverageSummary]) -> CoverageNode:
+    return CoverageNode.from_paths(
+        (filepath.rpartition('/')[0], CoverageNode(filepath.rpartition('/')[2], CoverageNodeType.FILE, summary))
+        for filepath, summary in zip(filepaths, summaries))
+
+
+def _compare_all(baseline: CoverageNode, current: CoverageNode) -> List[str]:
+    """Compare the summary of every node by path, visiting every node of both trees."""
+    baseline_counts: Dict[str, Tuple[int, int, int, int]] = {
+        path: (node.summary.n_lines, node.summary.n_lines_covered, node.summary.n_branches,
+               node.summary.n_branches_covered)
+        for path, node in baseline.walk()
+    }
+    return [
+        path for path, node in current.walk()
+        if baseline_counts.get(path) != (node.summary.n_lines, node.summary.n_lines_covered, node.summary.n_branches,
+                                         node.summary.n_branches_covered)
+    ]
+
+
+def _hash_both(baseline: CoverageNode, current: CoverageNode) -> None:
+    # pylint: disable=protected-access
+    CoverageDiff._hash_tree(baseline)
+    CoverageDiff._hash_tree(current)
+
+
+def _diff_hashed(baseline: CoverageNode, current: CoverageNode) -> Callable[[], List[CoverageChange]]:
+    """Hash both trees, and get a function walking the hashed trees."""
+    # pylint: disable=protected-access
+    return partial(CoverageDiff._diff, baseline, CoverageDiff._hash_tree(baseline), current,
+                   CoverageDiff._hash_tree(current))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', default=200000, type=int, help="Number of files in the trees.")
+    parser.add_argument('--changed', default=[0, 10, 1000, 100000], type=int, nargs='+',
+                        help="Numbers of files whose coverage changed.")
+    parser.add_argument('--depth', default=5, type=int, help="Directory depth of files.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    filepaths = [
+        '/'.join(f"p{rng.randrange(8)}" for _ in range(args.depth)) + f"/F{index}.java" for index in range(args.files)
+    ]
+    summaries = [CoverageSummary(20, rng.randrange(21), 4, rng.randrange(5)) for _ in filepaths]
+    baseline = _build(filepaths, summaries)
+
+    for n_changed in args.changed:
+        current_summaries = list(summaries)
+        for index in rng.sample(range(args.files), min(n_changed, args.files)):
+            summary = summaries[index]
+            current_summaries[index] = CoverageSummary(summary.n_lines + 1, summary.n_lines_covered, 4,
+                                                       summary.n_branches_covered)
+        current = _build(filepaths, current_summaries)
+
+        print(f"{args.files} files, {n_changed} changed")
+        time_operation("hash both trees", partial(_hash_both, baseline, current))
+        time_operation("walk hashed trees", _diff_hashed(baseline, current))
+        time_operation("CoverageDiff.compare (hash and walk)", partial(CoverageDiff.compare, baseline, current))
+        time_operation("compare every node by path", partial(_compare_all, baseline, current))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark reading a coverage.py data file directly against writing and parsing the report of `coverage xml`.
+
+Usage: python -m benchmarks.bench_coverage_db [--modules N] [--functions N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+
+from benchmarks.timing import time_operation
+from covcheck._parsing.coverage_db_reader import CoverageDBReader
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+def write_project(dirpath: Path, n_modules: int, n_functions: int) -> None:
+    """Write a package of modules with branching functions, and a script calling half of the functions.
+
+    :param dirpath: Directory to write the project in.
+    :param n_modules: Number of modules in the package.
+    :param n_functions: Number of functions per module.
+    """
+    (dirpath / 'pkg').mkdir()
+    (dirpath / 'pkg' / '__init__.py').touch()
+    function_source = ('def f{i}(x):\n    if x > {i}:\n        return x - {i}\n'
+                       '    for _ in range(2):\n        x += 1\n    return x\n\n\n')
+    calls = []
+    for module in range(n_modules):
+        source = ''.join(function_source.format(i=i) for i in range(n_functions))
+        (dirpath / 'pkg' / f'mod{module}.py').write_text(source)
+        calls.append(f'import pkg.mod{module}\n')
+        calls.extend(f'pkg.mod{module}.f{i}({module % 3})\n' for i in range(0, n_functions, 2))
+    (dirpath / 'main.py').write_text(''.join(calls))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modules', default=500, type=int, help="Number of modules in the measured package.")
+    parser.add_argument('--functions', default=40, type=int, help="Number of functions per module.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        dirpath = Path(temp_dirpath)
+        write_project(dirpath, args.modules, args.functions)
+        subprocess.run([sys.executable, '-m', 'coverage', 'run', '--branch', 'main.py'], cwd=dirpath, check=True)
+        os.chdir(dirpath)
+
+        def xml_round_trip() -> None:
+            subprocess.run([sys.executable, '-m', 'coverage', 'xml', '-q'], check=True)
+            CoverageXMLParser.parse(dirpath / 'coverage.xml')
+
+        print(f"Project: {args.modules} modules, {args.modules * args.functions} functions")
+        xml_seconds = time_operation('coverage xml + parse', xml_round_trip)
+        db_seconds = time_operation('read .coverage', lambda: CoverageDBReader.read(dirpath / '.coverage'))
+        print(f"{'speedup':<40}  {xml_seconds / db_seconds:>8.2f} x")
+
+        assert CoverageDBReader.read(dirpath / '.coverage').serialize() == \
+            CoverageXMLParser.parse(dirpath / 'coverage.xml').serialize()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark parallel parsing of a coverage report as the number of jobs grows.
+
+Usage: python -m benchmarks.bench_jobs [--packages N] [--files N] [--lines N]
+"""
+
+import argparse
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.synthetic import write_report
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--packages', default=200, type=int, help="Number of packages in the report.")
+    parser.add_argument('--files', default=50, type=int, help="Number of files per package.")
+    parser.add_argument('--lines', default=200, type=int, help="Number of lines per file.")
+    parser.add_argument('--repeat', default=3, type=int, help="Number of timed runs per job count.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        filepath = Path(temp_dirpath) / 'coverage.xml'
+        write_report(filepath, n_packages=args.packages, n_files=args.files, n_lines=args.lines)
+        size_mb = filepath.stat().st_size / 2**20
+        print(f"Report: {size_mb:.1f} MB, {args.packages * args.files} files")
+
+        expected = CoverageXMLParser.parse(filepath).serialize()
+        baseline = None
+        print(f"{'jobs':>4}  {'seconds':>8}  {'speedup':>7}")
+        for jobs in [1, 2, 4, 8, 16]:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                node = CoverageXMLParser.parse(filepath, jobs=jobs)
+                timings.append(time.perf_counter() - start)
+            assert node.serialize() == expected, "Parallel parse differs from serial parse"
+
+            seconds = min(timings)
+            baseline = baseline or seconds
+            print(f"{jobs:>4}  {seconds:>8.3f}  {baseline / seconds:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
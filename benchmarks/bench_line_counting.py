@@ -0,0 +1,77 @@
+"""Benchmark counting the <line> elements of classes in bulk against counting them line by line.
+
+The line attributes of every class of a synthetic branch-heavy report are read once, and then counted by the per-line
+loop CoverageXMLParser used before, and by its bulk counting.
+
+Usage: python -m benchmarks.bench_line_counting [--lines N [N ...]] [--branch-every N]
+"""
+
+import argparse
+import re
+import tempfile
+
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, List, Mapping, Tuple
+
+from benchmarks.synthetic import write_report
+from benchmarks.timing import time_operation
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+from covcheck._parsing.xml_backends import ExpatBackend
+
+_Counts = Tuple[int, int, int, int]
+
+
+def count_per_line(lines: Iterable[Mapping[str, str]]) -> _Counts:
+    """Count lines and branches one line at a time, matching each condition-coverage attribute separately."""
+    n_lines = n_lines_covered = n_branches = n_branches_covered = 0
+    for line_attrib in lines:
+        n_lines += 1
+        if line_attrib['hits'] != '0':
+            n_lines_covered += 1
+        if 'branch' in line_attrib and line_attrib['branch']:
+            match = re.match(r"^\d+% \((\d+)\/(\d+)\)$", line_attrib['condition-coverage'])
+            assert match is not None
+            n_branches_covered += int(match.group(1))
+            n_branches += int(match.group(2))
+    return n_lines, n_lines_covered, n_branches, n_branches_covered
+
+
+def count_bulk(lines: Iterable[Mapping[str, str]]) -> _Counts:
+    """Count lines and branches with CoverageXMLParser."""
+    summary = CoverageXMLParser._count_lines(lines)  # pylint: disable=protected-access
+    return summary.n_lines, summary.n_lines_covered, summary.n_branches, summary.n_branches_covered
+
+
+def count_all(count: Callable[[List[Mapping[str, str]]], _Counts], classes: List[List[Mapping[str, str]]],
+              results: List[List[_Counts]]) -> None:
+    """Count the lines of every class."""
+    results.append([count(lines) for lines in classes])
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', default=[200, 2000, 20000], type=int, nargs='+',
+                        help="Numbers of lines per file, for one report each.")
+    parser.add_argument('--total-lines', default=400000, type=int, help="Number of lines in each report.")
+    parser.add_argument('--branch-every', default=1, type=int, help="Every nth line is a branch line.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        filepath = Path(temp_dirpath) / 'coverage.xml'
+        for n_lines in args.lines:
+            n_files = max(1, args.total_lines // n_lines)
+            write_report(filepath, n_packages=1, n_files=n_files, n_lines=n_lines, branch_every=args.branch_every)
+            with open(filepath, 'rb') as f:
+                classes = [list(lines or []) for _, lines in ExpatBackend.iter_classes(f)]
+
+            print(f"{n_files} files of {n_lines} lines, a branch every {args.branch_every} lines")
+            results: List[List[_Counts]] = []
+            time_operation("per line", partial(count_all, count_per_line, classes, results))
+            time_operation("bulk", partial(count_all, count_bulk, classes, results))
+            assert all(result == results[0] for result in results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark the peak memory of parallel parsing of a coverage report.
+
+Each parse runs in a fresh interpreter, so that the peak resident set size of the parsing process and of its jobs is
+measured for that parse alone.
+
+Usage: python -m benchmarks.bench_parallel_memory [--packages N] [--files N] [--lines N] [--jobs N ...]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+
+from benchmarks.synthetic import write_report
+
+_MEASURE = """
+import resource, sys, time
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+start = time.perf_counter()
+CoverageXMLParser.parse(sys.argv[1], jobs=int(sys.argv[2]))
+seconds = time.perf_counter() - start
+parent = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+print(seconds, parent, children)
+"""
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--packages', default=200, type=int, help="Number of packages in the report.")
+    parser.add_argument('--files', default=50, type=int, help="Number of files per package.")
+    parser.add_argument('--lines', default=200, type=int, help="Number of lines per file.")
+    parser.add_argument('--jobs', default=[1, 2, 4], nargs='+', type=int, help="Job counts to measure.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        filepath = Path(temp_dirpath) / 'coverage.xml'
+        write_report(filepath, n_packages=args.packages, n_files=args.files, n_lines=args.lines)
+        print(f"Report: {filepath.stat().st_size / 2**20:.1f} MB, {args.packages * args.files} files")
+
+        # Peak RSS is reported in KiB on Linux, and is the largest of any single job for the jobs
+        print(f"{'jobs':>4}  {'seconds':>8}  {'parent MiB':>10}  {'job MiB':>8}")
+        for jobs in args.jobs:
+            output = subprocess.run(
+                [sys.executable, '-c', _MEASURE, str(filepath), str(jobs)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            seconds, parent, children = output.split()
+            print(f"{jobs:>4}  {float(seconds):>8.3f}  {int(parent) / 2**10:>10.1f}  {int(children) / 2**10:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark the throughput of the XML parser backends on synthetic reports of growing size.
+
+Each report is parsed once per installed backend, and the throughput is reported in <line> elements per second.
+Reports of several GB take minutes to write and parse, so the default sizes are small; pass --sizes to run larger ones.
+
+Usage: python -m benchmarks.bench_parsers [--sizes MB [MB ...]] [--trust-header]
+"""
+
+import argparse
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.synthetic import write_report
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+from covcheck._parsing.xml_backends import XML_BACKENDS
+
+_FILES_PER_PACKAGE = 20
+_LINES_PER_FILE = 200
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default=[1, 10, 100], type=float, nargs='+', help="Sizes of the reports in MB.")
+    parser.add_argument('--trust-header', action='store_true', help="Parse with trust_header.")
+    args = parser.parse_args()
+
+    backends = [name for name, backend in XML_BACKENDS.items() if backend.is_available()]
+    print(f"{'MB':>8}  {'lines':>11}  " + '  '.join(f"{name + ' lines/s':>18}" for name in backends))
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        filepath = Path(temp_dirpath) / 'coverage.xml'
+        write_report(filepath, n_packages=1, n_files=_FILES_PER_PACKAGE, n_lines=_LINES_PER_FILE)
+        package_size = filepath.stat().st_size
+
+        for size in args.sizes:
+            n_packages = max(1, round(size * 2**20 / package_size))
+            write_report(filepath, n_packages=n_packages, n_files=_FILES_PER_PACKAGE, n_lines=_LINES_PER_FILE)
+            n_lines = n_packages * _FILES_PER_PACKAGE * _LINES_PER_FILE
+
+            expected = None
+            throughputs = []
+            for name in backends:
+                start = time.perf_counter()
+                node = CoverageXMLParser.parse(filepath, trust_header=args.trust_header, parser=name, compact=True)
+                throughputs.append(n_lines / (time.perf_counter() - start))
+                summary = node.summary
+                counts = (summary.n_lines, summary.n_lines_covered, summary.n_branches, summary.n_branches_covered)
+                expected = expected or counts
+                assert counts == expected, f"Parse with {name} differs"
+
+            size_mb = filepath.stat().st_size / 2**20
+            columns = '  '.join(f"{throughput:>18,.0f}" for throughput in throughputs)
+            print(f"{size_mb:>8.1f}  {n_lines:>11}  {columns}")
+
+
+if __name__ == '__main__':
+    main()
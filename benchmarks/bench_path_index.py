@@ -0,0 +1,101 @@
+"""Benchmark path lookups and glob queries with a PathIndex against naive tree traversal.
+
+Naive lookups walk the tree from the root one path component at a time, scanning the children of each directory, and
+naive glob queries match the full path of every node in the tree.
+
+Usage: python -m benchmarks.bench_path_index [--files N] [--depth N] [--queries N]
+"""
+
+import argparse
+import random
+
+from fnmatch import fnmatchcase
+from typing import List, Optional
+
+from benchmarks.timing import time_operation
+from covcheck import CoverageNode, CoverageNodeType, CoverageResult, CoverageSummary
+
+
+def naive_get(root: CoverageNode, path: str) -> Optional[CoverageNode]:
+    """Find a node by walking the children of each directory on its path."""
+    node: Optional[CoverageNode] = root
+    for name in path.split('/'):
+        if node is None:
+            return None
+        node = next((child for child in node.children() if child.name == name), None)
+    return node
+
+
+def naive_glob(root: CoverageNode, pattern: str) -> CoverageSummary:
+    """Aggregate the summaries of nodes whose full paths match a pattern, without descending into matching nodes.
+
+    Patterns are matched one path component at a time, as by PathIndex.glob, but against every node of the tree.
+    """
+    pattern_parts = pattern.split('/')
+    summary = CoverageSummary(0, 0, 0, 0)
+    stack = [('', root)]
+    while stack:
+        path, node = stack.pop()
+        parts = path.split('/')
+        if path and len(parts) == len(pattern_parts) and all(map(fnmatchcase, parts, pattern_parts)):
+            node_summary = node.summary
+            summary.n_lines += node_summary.n_lines
+            summary.n_lines_covered += node_summary.n_lines_covered
+            summary.n_branches += node_summary.n_branches
+            summary.n_branches_covered += node_summary.n_branches_covered
+            continue
+        stack.extend((f'{path}/{child.name}' if path else child.name, child) for child in node.children())
+    return summary
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', default=50000, type=int, help="Number of files in the tree.")
+    parser.add_argument('--depth', default=4, type=int, help="Directory depth of each file.")
+    parser.add_argument('--fanout', default=12, type=int, help="Number of subdirectories per directory.")
+    parser.add_argument('--queries', default=2000, type=int, help="Number of lookups and of glob queries.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    root = CoverageNode('root', CoverageNodeType.DIR)
+    paths: List[str] = []
+    for i in range(args.files):
+        dirpath = '/'.join(f"d{rng.randrange(args.fanout)}" for _ in range(args.depth))
+        n_lines = rng.randint(1, 500)
+        root.add_child(CoverageNode(f"f{i}.py", CoverageNodeType.FILE, CoverageSummary(n_lines, n_lines // 2, 0, 0)),
+                       dirpath=dirpath)
+        paths.append(f"{dirpath}/f{i}.py")
+
+    result = CoverageResult(root)
+    lookups = [rng.choice(paths) for _ in range(args.queries)]
+    patterns = [f"d{rng.randrange(args.fanout)}/*/d{rng.randrange(args.fanout)}" for _ in range(args.queries // 100)]
+
+    def get_indexed() -> None:
+        for path in lookups:
+            assert result.get(path) is not None
+
+    def get_naive() -> None:
+        for path in lookups:
+            assert naive_get(root, path) is not None
+
+    indexed_totals: List[int] = []
+    naive_totals: List[int] = []
+
+    def glob_indexed() -> None:
+        indexed_totals.extend(result.glob(pattern).n_lines for pattern in patterns)
+
+    def glob_naive() -> None:
+        naive_totals.extend(naive_glob(root, pattern).n_lines for pattern in patterns)
+
+    print(f"{args.files} files at depth {args.depth}, {len(lookups)} lookups and {len(patterns)} glob queries")
+    time_operation("build index", lambda: len(result.index))
+    time_operation("get (indexed)", get_indexed)
+    time_operation("get (naive)", get_naive)
+    time_operation("glob (indexed)", glob_indexed)
+    time_operation("glob (naive)", glob_naive)
+    assert indexed_totals == naive_totals
+
+
+if __name__ == '__main__':
+    main()
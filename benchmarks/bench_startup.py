@@ -0,0 +1,91 @@
+"""Benchmark the startup time of the covcheck CLI.
+
+Each command runs in a fresh interpreter, so that imports are measured as they are on every covcheck invocation.
+The wall time of `covcheck --help` and of checking a small report is compared with starting a bare interpreter, and
+`-X importtime` breaks the import time of the CLI down by module. Pass --max-import-ms to fail if importing covcheck
+modules for a small-report check takes longer than a budget, to catch regressions in CI.
+
+Usage: python -m benchmarks.bench_startup [--runs N] [--top N] [--max-import-ms MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.synthetic import write_report
+
+_RUN_CLI = "import sys; from covcheck._cli.main import run; sys.argv[0] = 'covcheck'; run()"
+
+
+def _time_command(command: List[str], runs: int) -> float:
+    """Get the median wall time of a command in seconds."""
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def _import_times(args: List[str]) -> Tuple[Dict[str, int], int]:
+    """Get the self import time in microseconds of each module imported by the CLI.
+
+    :return: Self import time of each module, and the total import time of covcheck modules, including the modules
+        they import.
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', _RUN_CLI, *args],
+                            check=True, capture_output=True, text=True).stderr
+    times = {}
+    covcheck_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(self_us)
+        # Modules imported directly rather than by another module are indented by a single space
+        if module.startswith(' covcheck'):
+            covcheck_us += int(cumulative_us)
+    return times, covcheck_us
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', default=20, type=int, help="Number of runs of each command.")
+    parser.add_argument('--top', default=15, type=int, help="Number of modules with the longest import times to list.")
+    parser.add_argument('--max-import-ms', default=None, type=float,
+                        help="Fail if covcheck modules take longer than this to import for a small-report check.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        filepath = Path(temp_dirpath) / 'coverage.xml'
+        write_report(filepath, n_packages=2, n_files=5, n_lines=50)
+        check_args = [str(filepath), '--line', '0', '--no-cache']
+
+        commands = [
+            ("python -c pass", [sys.executable, '-c', 'pass']),
+            ("covcheck --help", [sys.executable, '-c', _RUN_CLI, '--help']),
+            ("covcheck small report", [sys.executable, '-c', _RUN_CLI, *check_args]),
+        ]
+        print(f"{'command':<24}  {'median ms':>9}")
+        for label, command in commands:
+            print(f"{label:<24}  {_time_command(command, args.runs) * 1000:>9.1f}")
+
+        for label, cli_args in [("--help", ['--help']), ("small report", check_args)]:
+            times, covcheck_us = _import_times(cli_args)
+            print(f"\nImports for {label}: {len(times)} modules, {covcheck_us / 1000:.1f} ms for covcheck")
+            for module, self_us in sorted(times.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"  {module:<48}  {self_us / 1000:>6.1f} ms")
+
+    if args.max_import_ms is not None and covcheck_us / 1000 > args.max_import_ms:
+        sys.exit(f"Importing covcheck took {covcheck_us / 1000:.1f} ms, more than {args.max_import_ms} ms")
+
+
+if __name__ == '__main__':
+    main()
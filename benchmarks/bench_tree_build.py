@@ -0,0 +1,94 @@
+"""Benchmark building coverage trees from file paths across a range of directory depths.
+
+Compares inserting each file with a Path of its parent directory, descending one level per recursive call as
+CoverageNode.add_child previously did, with inserting each file through the iterative add_child, and with building
+the whole tree with CoverageNode.from_paths.
+
+Usage: python -m benchmarks.bench_tree_build [--files N] [--depths N ...]
+"""
+
+import argparse
+import random
+
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from benchmarks.timing import time_operation
+from covcheck import CoverageNode, CoverageNodeType, CoverageSummary
+
+
+def _add_child_recursive(parent: CoverageNode, node: CoverageNode, dirpath: Optional[Path]) -> None:
+    """Add a child one directory level per call, building the Path of the remaining levels at each level."""
+    if dirpath is None:
+        parent.add_child(node)
+        return
+    directory_name = dirpath.parts[0]
+    remaining_path = Path(*dirpath.parts[1:]) if len(dirpath.parts) > 1 else None
+    if parent.child(directory_name) is None:
+        parent.add_child(CoverageNode(directory_name, node_type=CoverageNodeType.DIR))
+    directory = parent.child(directory_name)
+    assert directory is not None
+    _add_child_recursive(directory, node, remaining_path)
+
+
+def _filepaths(n_files: int, depth: int, files_per_directory: int, rng: random.Random) -> List[str]:
+    """Generate paths of files grouped by directory, as in a coverage report of a Java-style package tree."""
+    filepaths: List[str] = []
+    while len(filepaths) < n_files:
+        dirpath = '/'.join(f"p{rng.randrange(8)}" for _ in range(depth))
+        start = len(filepaths)
+        filepaths.extend([f"{dirpath}/F{start + index}.java" for index in range(files_per_directory)])
+    return filepaths[:n_files]
+
+
+def _build_recursive(filepaths: List[str], nodes: List[CoverageNode]) -> CoverageNode:
+    root = CoverageNode('root', CoverageNodeType.DIR)
+    for filepath, node in zip(filepaths, nodes):
+        _add_child_recursive(root, node, Path(filepath).parent)
+    return root
+
+
+def _build_add_child(filepaths: List[str], nodes: List[CoverageNode]) -> CoverageNode:
+    root = CoverageNode('root', CoverageNodeType.DIR)
+    for filepath, node in zip(filepaths, nodes):
+        root.add_child(node, dirpath=filepath.rpartition('/')[0])
+    return root
+
+
+def _build_from_paths(filepaths: List[str], nodes: List[CoverageNode]) -> CoverageNode:
+    return CoverageNode.from_paths((filepath.rpartition('/')[0], node) for filepath, node in zip(filepaths, nodes))
+
+
+def _append_build(roots: List[CoverageNode], build: Callable[[List[str], List[CoverageNode]], CoverageNode],
+                  filepaths: List[str], nodes: List[CoverageNode]) -> None:
+    roots.append(build(filepaths, nodes))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', default=200000, type=int, help="Number of files in the tree.")
+    parser.add_argument('--depths', default=[2, 5, 10, 20], type=int, nargs='+', help="Directory depths of files.")
+    parser.add_argument('--files-per-directory', default=10, type=int, help="Number of files in each directory.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    builds = [
+        ("add_child (recursive, Path per level)", _build_recursive),
+        ("add_child (iterative)", _build_add_child),
+        ("from_paths", _build_from_paths),
+    ]
+    for depth in args.depths:
+        filepaths = _filepaths(args.files, depth, args.files_per_directory, rng)
+        print(f"{args.files} files at depth {depth}")
+        roots: List[CoverageNode] = []
+        for label, build in builds:
+            nodes = [CoverageNode(filepath.rpartition('/')[2], CoverageNodeType.FILE, CoverageSummary(20, 15, 4, 2))
+                     for filepath in filepaths]
+            time_operation(label, partial(_append_build, roots, build, filepaths, nodes))
+        assert roots[0].serialize() == roots[1].serialize() == roots[2].serialize()
+
+
+if __name__ == '__main__':
+    main()
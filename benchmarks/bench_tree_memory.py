@@ -0,0 +1,63 @@
+"""Benchmark the memory used by CoverageNode trees and CompactCoverageTrees.
+
+Usage: python -m benchmarks.bench_tree_memory [--packages N] [--files N]
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+
+from benchmarks.synthetic import write_report
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+def _measure(filepath: Path, compact: bool) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = CoverageXMLParser.parse(filepath, streaming=True, compact=compact)
+    parse_seconds = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    _walk_summaries(tree)
+    walk_seconds = time.perf_counter() - start
+
+    label = 'compact' if compact else 'nodes'
+    print(f"{label:>8}  {retained / 2**20:>11.1f}  {peak / 2**20:>8.1f}  {parse_seconds:>7.2f}  {walk_seconds:>6.2f}")
+
+
+def _walk_summaries(node: BaseCoverageNode) -> None:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        _ = current.summary
+        stack.extend(current.children())
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--packages', default=500, type=int, help="Number of packages in the report.")
+    parser.add_argument('--files', default=100, type=int, help="Number of files per package.")
+    parser.add_argument('--lines', default=2, type=int, help="Number of lines per file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        filepath = Path(temp_dirpath) / 'coverage.xml'
+        write_report(filepath, n_packages=args.packages, n_files=args.files, n_lines=args.lines)
+        print(f"Report: {args.packages * args.files} files")
+
+        print(f"{'tree':>8}  {'tree (MiB)':>11}  {'peak MiB':>8}  {'parse s':>7}  {'walk s':>6}")
+        _measure(filepath, compact=False)
+        _measure(filepath, compact=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark mixed workloads of tree mutations and summary reads.
+
+CoverageNode keeps summaries up to date incrementally. For comparison, LazyNode reproduces the previous behavior of
+invalidating summaries along the insertion path and recomputing them from all children on the next read.
+
+Usage: python -m benchmarks.bench_tree_updates [--files N] [--depth N] [--operations N]
+"""
+
+import argparse
+import random
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from benchmarks.timing import time_operation
+from covcheck import CoverageNode, CoverageNodeType, CoverageSummary
+
+
+class LazyNode:
+    """Coverage node with lazily recomputed summaries."""
+    def __init__(self, name: str, summary: Optional[CoverageSummary] = None):
+        self.name = name
+        self.own_summary = summary
+        self.cached_summary: Optional[CoverageSummary] = None
+        self.children: Dict[str, LazyNode] = {}
+
+    def add_child(self, node: 'LazyNode', dirpath: Optional[Path] = None) -> None:
+        """Add or replace a child, in the same way as CoverageNode previously did."""
+        self.cached_summary = None
+        if dirpath is None:
+            self.children[node.name] = node
+            return
+        path = Path(dirpath)
+        directory_name = path.parts[0]
+        remaining_path = Path(*path.parts[1:]) if len(path.parts) > 1 else None
+        if directory_name not in self.children:
+            self.children[directory_name] = LazyNode(directory_name)
+        self.children[directory_name].add_child(node, remaining_path)
+
+    @property
+    def summary(self) -> CoverageSummary:
+        """Get the summary, recomputing it from all children if it was invalidated."""
+        if not self.children:
+            return self.own_summary or CoverageSummary(0, 0, 0, 0)
+        if self.cached_summary is None:
+            summary = CoverageSummary(0, 0, 0, 0)
+            for child in self.children.values():
+                child_summary = child.summary
+                summary.n_lines += child_summary.n_lines
+                summary.n_lines_covered += child_summary.n_lines_covered
+                summary.n_branches += child_summary.n_branches
+                summary.n_branches_covered += child_summary.n_branches_covered
+            self.cached_summary = summary
+        return self.cached_summary
+
+
+def _random_summary(rng: random.Random) -> CoverageSummary:
+    n_lines = rng.randint(1, 500)
+    n_branches = rng.randint(0, 100)
+    return CoverageSummary(n_lines, rng.randint(0, n_lines), n_branches, rng.randint(0, n_branches))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', default=50000, type=int, help="Number of files in the tree.")
+    parser.add_argument('--depth', default=6, type=int, help="Directory depth of each file.")
+    parser.add_argument('--fanout', default=8, type=int, help="Number of subdirectories per directory.")
+    parser.add_argument('--operations', default=20000, type=int, help="Number of mutations in each workload.")
+    parser.add_argument('--reads', default=4, type=int, help="Number of summary reads after each mutation.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    dirpaths = ['/'.join(f"d{rng.randrange(args.fanout)}" for _ in range(args.depth)) for _ in range(args.files)]
+    summaries = [_random_summary(rng) for _ in range(args.files)]
+    updates = [(rng.randrange(args.files), _random_summary(rng)) for _ in range(args.operations)]
+
+    nodes = [CoverageNode(f"f{i}.py", CoverageNodeType.FILE, summary) for i, summary in enumerate(summaries)]
+    root = CoverageNode('root', CoverageNodeType.DIR)
+    lazy_root = LazyNode('root')
+
+    def build() -> None:
+        for dirpath, node in zip(dirpaths, nodes):
+            root.add_child(node, dirpath=dirpath)
+
+    def build_lazy() -> None:
+        for dirpath, node in zip(dirpaths, nodes):
+            lazy_root.add_child(LazyNode(node.name, node.summary), Path(dirpath))
+
+    def mutate_and_read() -> None:
+        for index, summary in updates:
+            nodes[index].set_summary(summary)
+            for _ in range(args.reads):
+                _ = root.summary.line_rate
+
+    def replace_and_read() -> None:
+        for index, summary in updates:
+            root.add_child(CoverageNode(f"f{index}.py", CoverageNodeType.FILE, summary), dirpaths[index], replace=True)
+            for _ in range(args.reads):
+                _ = root.summary.line_rate
+
+    def replace_and_read_lazy() -> None:
+        for index, summary in updates:
+            lazy_root.add_child(LazyNode(f"f{index}.py", summary), Path(dirpaths[index]))
+            for _ in range(args.reads):
+                _ = lazy_root.summary.line_rate
+
+    print(f"{args.files} files at depth {args.depth}, {args.operations} mutations with {args.reads} reads each")
+    time_operation("build (incremental)", build)
+    time_operation("build (lazy)", build_lazy)
+    time_operation("set_summary + reads (incremental)", mutate_and_read)
+    time_operation("replace child + reads (incremental)", replace_and_read)
+    time_operation("replace child + reads (lazy)", replace_and_read_lazy)
+    assert root.summary.n_lines == lazy_root.summary.n_lines
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Benchmark suite tracking the throughput and peak memory of covcheck on synthetic reports, to catch regressions.
+
+Reports of each size are parsed with CoverageXMLParser.parse, their trees are summarized and serialized, and they are
+checked end to end with validate_coverage. Each benchmark runs in a fresh interpreter, so that its peak resident set
+size is its own. Results are saved as JSON, and can be compared with the results of a previous version.
+
+Usage: python -m benchmarks.suite [--sizes MB [MB ...]] [--repeat N] [--output FILEPATH]
+    [--baseline FILEPATH [--max-regression PERCENT]] [--depth N] [--hit-distribution NAME] [--parser NAME]
+"""
+
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import HIT_DISTRIBUTIONS, SyntheticReport
+
+BENCHMARKS = ('parse', 'summary', 'serialize', 'validate')
+
+_ROOT_DIRPATH = Path(__file__).resolve().parents[1]
+
+_RUN_BENCHMARK = "import sys; from benchmarks.suite import run_benchmark; run_benchmark(*sys.argv[1:])"
+
+
+def run_benchmark(benchmark: str, filepath: str, parser: str) -> None:
+    """Run a benchmark once in this process, and print its results as JSON.
+
+    :param benchmark: Name of the benchmark, see BENCHMARKS.
+    :param filepath: Path to the report to run the benchmark on.
+    :param parser: Name of the XML parser backend.
+    """
+    # Imported here, so that running the suite itself does not count towards the peak memory of benchmarks
+    # pylint: disable=import-outside-toplevel
+    from covcheck._cli.config import Config
+    from covcheck._cli.validate import validate_coverage
+    from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+    size_bytes = Path(filepath).stat().st_size
+    if benchmark in ('parse', 'validate'):
+        start = time.perf_counter()
+        if benchmark == 'parse':
+            CoverageXMLParser.parse(filepath, parser=parser)
+        else:
+            with tempfile.TemporaryDirectory() as temp_dirpath:
+                config = Config.create(filepath, line=0, output=Path(temp_dirpath) / 'coverage.json', silent=True,
+                                       cache=False, parser=parser)
+                validate_coverage(config)
+        seconds = time.perf_counter() - start
+        count, unit = size_bytes, 'bytes'
+    else:
+        tree = CoverageXMLParser.parse(filepath, parser=parser)
+        nodes = [node for _, node in tree.walk()]
+        start = time.perf_counter()
+        if benchmark == 'summary':
+            for node in nodes:
+                summary = node.summary
+                _ = summary.line_rate, summary.branch_rate
+        else:
+            tree.serialize()
+        seconds = time.perf_counter() - start
+        count, unit = len(nodes), 'nodes'
+
+    print(json.dumps({'seconds': seconds, 'count': count, 'unit': unit, 'peak_rss': _peak_rss()}))
+
+
+def _peak_rss() -> int:
+    """Get the peak resident set size of this process in bytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _measure(benchmark: str, filepath: Path, parser: str, repeat: int) -> Dict[str, Any]:
+    """Run a benchmark in fresh interpreters, taking the median time and the largest peak resident set size."""
+    runs = []
+    for _ in range(repeat):
+        stdout = subprocess.run([sys.executable, '-c', _RUN_BENCHMARK, benchmark, str(filepath), parser], check=True,
+                                capture_output=True, text=True, cwd=_ROOT_DIRPATH).stdout
+        runs.append(json.loads(stdout.splitlines()[-1]))
+    seconds = statistics.median(run['seconds'] for run in runs)
+    return {
+        'benchmark': benchmark,
+        'seconds': seconds,
+        'throughput': runs[0]['count'] / seconds if seconds > 0 else None,
+        'unit': f"{runs[0]['unit']}/s",
+        'peak_rss': max(run['peak_rss'] for run in runs),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Get the commit of the working tree, or None outside of a git repository."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], check=True, capture_output=True, text=True,
+                              cwd=_ROOT_DIRPATH).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: Optional[float]) -> List[str]:
+    """Print the change of each result from a baseline.
+
+    :return: Description of each result that regressed by more than max_regression percent.
+    """
+    baseline_results: Dict[Tuple[str, str], Dict[str, Any]] = {
+        (result['report'], result['benchmark']): result for result in baseline['results']
+    }
+    print(f"\nCompared with {baseline.get('git_commit') or 'baseline'}:")
+    print(f"{'report':<10}  {'benchmark':<10}  {'throughput':>10}  {'peak RSS':>9}")
+    regressions = []
+    for result in results:
+        previous = baseline_results.get((result['report'], result['benchmark']))
+        if previous is None or not previous['throughput'] or not result['throughput']:
+            continue
+        throughput_change = (result['throughput'] / previous['throughput'] - 1) * 100
+        rss_change = (result['peak_rss'] / previous['peak_rss'] - 1) * 100
+        print(f"{result['report']:<10}  {result['benchmark']:<10}  {throughput_change:>+9.1f}%  {rss_change:>+8.1f}%")
+        if max_regression is not None and (-throughput_change > max_regression or rss_change > max_regression):
+            regressions.append(f"{result['benchmark']} on {result['report']}: throughput {throughput_change:+.1f}%, "
+                               f"peak RSS {rss_change:+.1f}%")
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default=[10, 50], type=float, nargs='+', help="Sizes of the reports in MB.")
+    parser.add_argument('--benchmarks', default=list(BENCHMARKS), nargs='+', choices=BENCHMARKS,
+                        help="Benchmarks to run.")
+    parser.add_argument('--repeat', default=3, type=int, help="Number of runs of each benchmark.")
+    parser.add_argument('--output', default=None, type=str, help="Path to a file where results should be saved.")
+    parser.add_argument('--baseline', default=None, type=str, help="Path to the results of a previous run.")
+    parser.add_argument('--max-regression', default=None, type=float,
+                        help="Fail if throughput drops or peak RSS grows by more than this percentage of --baseline.")
+    parser.add_argument('--depth', default=1, type=int, help="Number of directories in the path of each file.")
+    parser.add_argument('--hit-distribution', default='uniform', choices=HIT_DISTRIBUTIONS,
+                        help="Distribution of hits of the reports.")
+    parser.add_argument('--parser', default='auto', help="XML parser backend.")
+    parser.add_argument('--reports-dir', default=None, type=str,
+                        help="Directory where reports are written and kept, to reuse them across runs.")
+    args = parser.parse_args()
+
+    report_shape = SyntheticReport(depth=args.depth, hit_distribution=args.hit_distribution)
+    results: List[Dict[str, Any]] = []
+    print(f"{'report':<10}  {'benchmark':<10}  {'seconds':>8}  {'throughput':>18}  {'peak RSS MiB':>12}")
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        reports_dirpath = Path(args.reports_dir or temp_dirpath)
+        reports_dirpath.mkdir(parents=True, exist_ok=True)
+        for size in args.sizes:
+            report_name = f"{size:g}MB"
+            filepath = reports_dirpath / f"{report_name}-d{args.depth}-{args.hit_distribution}.xml"
+            if not filepath.exists():
+                report_shape.scaled(int(size * 2**20)).write(filepath)
+
+            for benchmark in args.benchmarks:
+                result = {
+                    'report': report_name,
+                    'size_bytes': filepath.stat().st_size,
+                    **_measure(benchmark, filepath, args.parser, args.repeat),
+                }
+                results.append(result)
+                print(f"{report_name:<10}  {benchmark:<10}  {result['seconds']:>8.3f}  "
+                      f"{result['throughput']:>11,.0f} {result['unit']:<7}  {result['peak_rss'] / 2**20:>12.1f}")
+
+    run = {
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'report_shape': {**vars(report_shape), 'n_packages': None},
+        'results': results,
+    }
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=4)
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = _compare(results, json.load(f), args.max_regression)
+        if regressions:
+            sys.exit("Regressions from baseline:\n" + '\n'.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
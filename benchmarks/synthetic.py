@@ -0,0 +1,183 @@
+"""Synthetic Cobertura coverage reports for benchmarks.
+
+Reports can be shaped by number of files, directory depth, lines per file, branch density and distribution of hits,
+and scaled to a target size, up to several GB. Reports with the same shape and seed are identical.
+
+Usage: python -m benchmarks.synthetic FILEPATH [--size-mb MB | --packages N] [--files N] [--lines N] [--depth N]
+    [--files-per-directory N] [--branch-every N] [--conditions N] [--hit-rate RATE] [--hit-distribution NAME]
+"""
+
+import argparse
+import io
+import random
+
+from pathlib import Path
+from typing import List, TextIO, Union
+
+# Distributions of the hits of lines:
+# - uniform: each line is covered with probability hit_rate, and covered lines have 1 hit
+# - bimodal: each file is either mostly covered or mostly uncovered, with a fraction hit_rate of files mostly covered
+# - pareto: each line is covered with probability hit_rate, and covered lines have heavy-tailed hit counts. Any
+#   nonzero count is covered, so the line rate matches uniform while exercising hit counts above 1.
+HIT_DISTRIBUTIONS = ('uniform', 'bimodal', 'pareto')
+
+# Line rates of mostly covered and mostly uncovered files with the bimodal distribution
+_BIMODAL_RATES = (0.95, 0.05)
+
+
+class SyntheticReport:  # pylint: disable=too-many-instance-attributes
+    """Shape of a synthetic XML coverage report."""
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        n_packages: int = 100,
+        n_files: int = 20,
+        n_lines: int = 200,
+        branch_every: int = 5,
+        seed: int = 0,
+        depth: int = 1,
+        files_per_directory: int = 10,
+        conditions: int = 2,
+        hit_rate: float = 0.8,
+        hit_distribution: str = 'uniform',
+    ):
+        """Construct SyntheticReport.
+
+        :param n_packages: Number of <package> elements.
+        :param n_files: Number of <class> elements per package.
+        :param n_lines: Number of <line> elements per class.
+        :param branch_every: Every nth line is a branch line.
+        :param seed: Seed for random hits.
+        :param depth: Number of directories below src/ in the path of each file. Files of a package are split into
+            directories of files_per_directory files below the package directory.
+        :param files_per_directory: Number of files per directory when depth is greater than 1.
+        :param conditions: Number of conditions of each branch line.
+        :param hit_rate: Fraction of lines covered, or of files mostly covered with the bimodal distribution.
+        :param hit_distribution: Distribution of hits, see HIT_DISTRIBUTIONS.
+        """
+        if hit_distribution not in HIT_DISTRIBUTIONS:
+            raise ValueError(f"Invalid hit distribution ({hit_distribution}). "
+                             f"Must be one of: {', '.join(HIT_DISTRIBUTIONS)}.")
+        if depth < 1:
+            raise ValueError(f"Invalid depth ({depth}). Must be at least 1.")
+        self.n_packages = n_packages
+        self.n_files = n_files
+        self.n_lines = n_lines
+        self.branch_every = branch_every
+        self.seed = seed
+        self.depth = depth
+        self.files_per_directory = files_per_directory
+        self.conditions = conditions
+        self.hit_rate = hit_rate
+        self.hit_distribution = hit_distribution
+
+    def write(self, filepath: Union[str, Path]) -> None:
+        """Write the report.
+
+        :param filepath: Path on disk where the report should be written.
+        """
+        rng = random.Random(self.seed)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" ?>\n<coverage version="6.2">\n\t<packages>\n')
+            for i in range(self.n_packages):
+                self._write_package(f, i, rng)
+            f.write('\t</packages>\n</coverage>\n')
+
+    def package_size(self) -> int:
+        """Get the approximate size of a <package> element in bytes, to scale reports to a target size."""
+        f = io.StringIO()
+        self._write_package(f, 0, random.Random(self.seed))
+        return len(f.getvalue().encode('utf-8'))
+
+    def scaled(self, size_bytes: int) -> 'SyntheticReport':
+        """Get a report of the same shape with enough packages to be about a target size.
+
+        :param size_bytes: Target size of the report in bytes.
+        """
+        report = SyntheticReport(**vars(self))
+        report.n_packages = max(1, round(size_bytes / self.package_size()))
+        return report
+
+    def _write_package(self, f: TextIO, i: int, rng: random.Random) -> None:
+        f.write(f'\t\t<package name="pkg{i}">\n\t\t\t<classes>\n')
+        for j in range(self.n_files):
+            dirpath = f"src/pkg{i}"
+            if self.depth > 1:
+                dirpath += f"/g{j // self.files_per_directory}"
+                dirpath += ''.join(f"/l{level}" for level in range(2, self.depth))
+            # Each class is written at once, as writing each <line> separately dominates the time to write large files
+            parts = [f'\t\t\t\t<class name="mod{j}.py" filename="{dirpath}/mod{j}.py">\n\t\t\t\t\t<lines>\n']
+            parts.extend(self._lines(rng))
+            parts.append('\t\t\t\t\t</lines>\n\t\t\t\t</class>\n')
+            f.write(''.join(parts))
+        f.write('\t\t\t</classes>\n\t\t</package>\n')
+
+    def _lines(self, rng: random.Random) -> List[str]:
+        line_rate = self.hit_rate
+        if self.hit_distribution == 'bimodal':
+            line_rate = _BIMODAL_RATES[0] if rng.random() < self.hit_rate else _BIMODAL_RATES[1]
+
+        branch_every, conditions, pareto = self.branch_every, self.conditions, self.hit_distribution == 'pareto'
+        lines = []
+        for k in range(1, self.n_lines + 1):
+            hits = int(rng.random() < line_rate)
+            if hits and pareto:
+                hits = int(rng.paretovariate(1.0))
+            if k % branch_every == 0:
+                covered = rng.randint(0, conditions)
+                lines.append(f'\t\t\t\t\t\t<line number="{k}" hits="{hits}" branch="true" condition-coverage='
+                             f'"{covered * 100 // conditions}% ({covered}/{conditions})"/>\n')
+            else:
+                lines.append(f'\t\t\t\t\t\t<line number="{k}" hits="{hits}"/>\n')
+        return lines
+
+
+def write_report(
+    filepath: Union[str, Path],
+    n_packages: int = 100,
+    n_files: int = 20,
+    n_lines: int = 200,
+    branch_every: int = 5,
+    seed: int = 0,
+) -> None:
+    """Write a synthetic XML coverage report.
+
+    :param filepath: Path on disk where the report should be written.
+    :param n_packages: Number of <package> elements.
+    :param n_files: Number of <class> elements per package.
+    :param n_lines: Number of <line> elements per class.
+    :param branch_every: Every nth line is a branch line.
+    :param seed: Seed for random hits.
+    """
+    SyntheticReport(n_packages, n_files, n_lines, branch_every, seed).write(filepath)
+
+
+def main() -> None:
+    """Write a synthetic report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filepath', help="Path where the report should be written.")
+    parser.add_argument('--size-mb', default=None, type=float,
+                        help="Approximate size of the report in MB, overriding --packages.")
+    parser.add_argument('--packages', default=100, type=int, help="Number of packages.")
+    parser.add_argument('--files', default=20, type=int, help="Number of files per package.")
+    parser.add_argument('--lines', default=200, type=int, help="Number of lines per file.")
+    parser.add_argument('--depth', default=1, type=int, help="Number of directories in the path of each file.")
+    parser.add_argument('--files-per-directory', default=10, type=int, help="Number of files per directory.")
+    parser.add_argument('--branch-every', default=5, type=int, help="Every nth line is a branch line.")
+    parser.add_argument('--conditions', default=2, type=int, help="Number of conditions of each branch line.")
+    parser.add_argument('--hit-rate', default=0.8, type=float, help="Fraction of lines covered.")
+    parser.add_argument('--hit-distribution', default='uniform', choices=HIT_DISTRIBUTIONS,
+                        help="Distribution of hits.")
+    parser.add_argument('--seed', default=0, type=int, help="Seed for random hits.")
+    args = parser.parse_args()
+
+    report = SyntheticReport(args.packages, args.files, args.lines, args.branch_every, args.seed, depth=args.depth,
+                             files_per_directory=args.files_per_directory, conditions=args.conditions,
+                             hit_rate=args.hit_rate, hit_distribution=args.hit_distribution)
+    if args.size_mb is not None:
+        report = report.scaled(int(args.size_mb * 2**20))
+    report.write(args.filepath)
+    print(f"Wrote {report.n_packages * report.n_files} files, {Path(args.filepath).stat().st_size / 2**20:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
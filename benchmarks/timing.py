@@ -0,0 +1,19 @@
+"""Timing helpers for benchmarks."""
+
+import time
+
+from typing import Callable
+
+
+def time_operation(label: str, operation: Callable[[], object]) -> float:
+    """Time a single run of an operation and print the result.
+
+    :param label: Label of the operation to print.
+    :param operation: Operation to run.
+    :return: Wall time of the operation in seconds.
+    """
+    start = time.perf_counter()
+    operation()
+    seconds = time.perf_counter() - start
+    print(f"{label:<40}  {seconds:>8.3f} s")
+    return seconds
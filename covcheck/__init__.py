@@ -1,13 +1,70 @@
 """Covcheck main module."""
 
-from covcheck._parsing.coverage_node import CoverageNode
-from covcheck._parsing.coverage_node_type import CoverageNodeType
-from covcheck._parsing.coverage_result import CoverageResult
-from covcheck._parsing.coverage_summary import CoverageSummary
+from importlib import import_module
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from covcheck._output.columnar_export import CoverageExporter
+    from covcheck._output.json_writer import CoverageJSONWriter
+    from covcheck._parsing.compact_coverage_tree import CompactCoverageNode, CompactCoverageTree
+    from covcheck._parsing.coverage_cache import CoverageCache
+    from covcheck._parsing.coverage_diff import CoverageChange, CoverageDiff
+    from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
+    from covcheck._parsing.coverage_node_type import CoverageNodeType
+    from covcheck._parsing.coverage_result import CoverageResult
+    from covcheck._parsing.coverage_summary import CoverageSummary
+    from covcheck._parsing.instrumentation import Instrumentation, PhaseMetrics
+    from covcheck._parsing.line_coverage import LineCoverage
+    from covcheck._parsing.path_index import PathIndex
+
+# Modules defining the public names, which are imported when a name is first used rather than with covcheck itself,
+# so that running the CLI only imports the modules it needs
+_EXPORTS = {
+    'BaseCoverageNode': 'covcheck._parsing.coverage_node',
+    'CompactCoverageNode': 'covcheck._parsing.compact_coverage_tree',
+    'CompactCoverageTree': 'covcheck._parsing.compact_coverage_tree',
+    'CoverageCache': 'covcheck._parsing.coverage_cache',
+    'CoverageChange': 'covcheck._parsing.coverage_diff',
+    'CoverageDiff': 'covcheck._parsing.coverage_diff',
+    'CoverageExporter': 'covcheck._output.columnar_export',
+    'CoverageJSONWriter': 'covcheck._output.json_writer',
+    'CoverageNode': 'covcheck._parsing.coverage_node',
+    'CoverageNodeType': 'covcheck._parsing.coverage_node_type',
+    'CoverageResult': 'covcheck._parsing.coverage_result',
+    'CoverageSummary': 'covcheck._parsing.coverage_summary',
+    'Instrumentation': 'covcheck._parsing.instrumentation',
+    'LineCoverage': 'covcheck._parsing.line_coverage',
+    'PathIndex': 'covcheck._parsing.path_index',
+    'PhaseMetrics': 'covcheck._parsing.instrumentation',
+}
 
 __all__ = [
+    'BaseCoverageNode',
+    'CompactCoverageNode',
+    'CompactCoverageTree',
+    'CoverageCache',
+    'CoverageChange',
+    'CoverageDiff',
+    'CoverageExporter',
+    'CoverageJSONWriter',
     'CoverageNode',
     'CoverageNodeType',
     'CoverageResult',
     'CoverageSummary',
+    'Instrumentation',
+    'LineCoverage',
+    'PathIndex',
+    'PhaseMetrics',
 ]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,22 +1,18 @@
 """Configuration for covcheck validation."""
 
+import sys
+
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Dict, Optional, Sequence, Union
 
 from covcheck._cli.utilities import fail_with_error
 
-try:
-    import toml
-    TOML_INSTALLED = True
-except ImportError:
-    TOML_INSTALLED = False
-
 
-class Config:
+class Config:  # pylint: disable=too-many-instance-attributes
     """Configuration for covcheck validation."""
     def __init__(
         self,
-        coverage_filepath: Union[str, Path],
+        coverage_filepath: Union[str, Path, Sequence[Union[str, Path]]],
         line: Optional[float] = None,
         branch: Optional[float] = None,
         output: Optional[Union[str, Path]] = None,
@@ -24,7 +20,8 @@ class Config:
     ):
         """Create a covcheck config.
 
-        :param coverage_filepath: XML coverage file from Coverage.py.
+        :param coverage_filepath: XML coverage file from Coverage.py, or a sequence of coverage files from separate
+            runs, such as test shards, to merge. Glob patterns are expanded.
         :param line: Threshold for line coverage.
         :param branch: Threshold for branch coverage.
         :param output: Path on disk where a JSON output file should be saved.
@@ -36,10 +33,36 @@ class Config:
         self.output = output
         self.silent = silent
 
+        # Settings below are only set through Config.create, from the CLI or a config file
+        self.streaming = False
+        self.file_format = 'auto'
+        self.parser = 'auto'
+        self.trust_header = False
+        self.verify_header = False
+        self.jobs = 1
+        self.compact = False
+        self.diff: Optional[Union[str, Path]] = None
+        self.diff_range: Optional[str] = None
+        self.output_format = 'indent'
+        self.export: Optional[Union[str, Path]] = None
+        self.export_format = 'auto'
+        self.cache = True
+        self.cache_dir: Optional[Union[str, Path]] = None
+        self.cache_size = 512.0
+        self.cache_key = 'content'
+        self.baseline: Optional[Union[str, Path]] = None
+        self.baseline_tolerance = 0.0
+        self.timings = False
+        self.timings_output: Optional[Union[str, Path]] = None
+        self.profile: Optional[Union[str, Path]] = None
+        self.profile_type = 'cpu'
+        # Thresholds of files and directories matching glob patterns, from [tool.covcheck.rules]
+        self.rules: Dict[str, Dict[str, float]] = {}
+
     @classmethod
     def create(
         cls,
-        coverage_filepath: Union[str, Path],
+        coverage_filepath: Union[str, Path, Sequence[Union[str, Path]]],
         config_filepath: Optional[Union[str, Path]] = None,
         group: Optional[str] = None,
         **kwargs: Optional[Any],
@@ -49,43 +72,100 @@ class Config:
         If the same argument is specified in both CLI arguments and config file,
         then the CLI argument will take precedence.
 
-        :param coverage_filepath: Path to XML coverage file from Coverage.py.
+        :param coverage_filepath: Path to XML coverage file from Coverage.py, or a sequence of paths to merge.
         :param config_filepath: Path to pyproject.toml config file.
         :param group: Name of coverage group to check.
         :param kwargs: Kwargs containing additional config settings.
         """
-        config = cls(coverage_filepath)
+        toml_covcheck = cls._load_settings(config_filepath)
+        return cls._create(coverage_filepath, toml_covcheck, group, kwargs)
 
-        if config_filepath is not None:
-            if not TOML_INSTALLED:
-                raise ImportError("--config was passed, but the toml package was not installed. "
-                                  "Please 'pip install toml' before running with --config.")
+    @classmethod
+    def create_groups(
+        cls,
+        coverage_filepath: Union[str, Path, Sequence[Union[str, Path]]],
+        config_filepath: Optional[Union[str, Path]],
+        groups: str,
+        **kwargs: Optional[Any],
+    ) -> Dict[str, 'Config']:
+        """Get the configs of several coverage groups, reading the config file once.
+
+        :param coverage_filepath: Path to XML coverage file from Coverage.py, or a sequence of paths to merge.
+        :param config_filepath: Path to pyproject.toml config file.
+        :param groups: 'all' for every group in the config file, or a comma-separated list of group names.
+        :param kwargs: Kwargs containing additional config settings, which apply to every group.
+        :return: Config of each group, by group name.
+        """
+        toml_covcheck = cls._load_settings(config_filepath)
+
+        if groups == 'all':
+            group_names = list(toml_covcheck.get('group', {})) if toml_covcheck is not None else []
+            if len(group_names) == 0:
+                fail_with_error("No groups found in config")
+        else:
+            group_names = [group.strip() for group in groups.split(',') if group.strip()]
+            # Named groups without a loaded config would otherwise be checked with no thresholds at all
+            if toml_covcheck is None and len(group_names) > 0:
+                fail_with_error(f"Group {group_names[0]} not found in config")
 
+        return {group: cls._create(coverage_filepath, toml_covcheck, group, kwargs) for group in group_names}
+
+    @classmethod
+    def _load_settings(cls, config_filepath: Optional[Union[str, Path]]) -> Optional[Dict[str, Any]]:
+        """Load the [tool.covcheck] settings of a config file.
+
+        :param config_filepath: Path to pyproject.toml config file.
+        :return: Covcheck settings, or None if there is no config file or it has no covcheck settings.
+        """
+        if config_filepath is None:
+            return None
+
+        # Config files are read with tomllib from the standard library on Python 3.11+, and otherwise with the toml
+        # package, which is only looked up when a config file is passed
+        # pylint: disable=import-outside-toplevel
+        if sys.version_info >= (3, 11):
+            import tomllib
+            with open(config_filepath, 'rb') as f:
+                toml_config = tomllib.load(f)
+        else:
+            try:
+                import toml
+            except ImportError as e:
+                raise ImportError("--config was passed, but the toml package was not installed. "
+                                  "Please 'pip install toml' before running with --config.") from e
             with open(config_filepath, 'r', encoding='utf-8') as f:
                 toml_config = toml.load(f)
 
-                if 'tool' in toml_config:
-                    toml_tools = toml_config['tool']
-                    if 'covcheck' in toml_tools:
-                        toml_covcheck = toml_tools['covcheck']
-
-                        # Check for missing group configuration
-                        if group is not None:
-                            # Group name selected but no matching group in config file
-                            if 'group' in toml_covcheck and group not in toml_covcheck['group']:
-                                fail_with_error(f"Group {group} not found in config")
-                            # Group name selected but no groups at all in config file
-                            if 'group' not in toml_covcheck:
-                                fail_with_error(f"Group {group} not found in config")
-
-                        if 'group' in toml_covcheck and group is not None:
-                            group_dict = toml_covcheck['group'][group]
-                            if 'coverage' in group_dict:
-                                for key, value in group_dict['coverage'].items():
-                                    setattr(config, key, value)
-                        else:
-                            for key, value in toml_covcheck.items():
-                                setattr(config, key, value)
+        return toml_config.get('tool', {}).get('covcheck')
+
+    @classmethod
+    def _create(
+        cls,
+        coverage_filepath: Union[str, Path, Sequence[Union[str, Path]]],
+        toml_covcheck: Optional[Dict[str, Any]],
+        group: Optional[str],
+        kwargs: Dict[str, Optional[Any]],
+    ) -> 'Config':
+        config = cls(coverage_filepath)
+
+        if toml_covcheck is not None:
+            # Check for missing group configuration
+            if group is not None:
+                # Group name selected but no matching group in config file
+                if 'group' in toml_covcheck and group not in toml_covcheck['group']:
+                    fail_with_error(f"Group {group} not found in config")
+                # Group name selected but no groups at all in config file
+                if 'group' not in toml_covcheck:
+                    fail_with_error(f"Group {group} not found in config")
+
+            if 'group' in toml_covcheck and group is not None:
+                group_dict = toml_covcheck['group'][group]
+                if 'coverage' in group_dict:
+                    for key, value in group_dict['coverage'].items():
+                        setattr(config, key, value)
+            else:
+                for key, value in toml_covcheck.items():
+                    setattr(config, key, value)
 
         for key, value in kwargs.items():
             if value is not None:
@@ -2,9 +2,6 @@
 
 import argparse
 
-from covcheck._cli.config import Config
-from covcheck._cli.validate import validate_coverage
-
 
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments.
@@ -12,15 +9,69 @@ def parse_args() -> argparse.Namespace:
     :return: Argparse namespace containing the arguments.
     """
     parser = argparse.ArgumentParser()
-    parser.add_argument('coverage_file', help="Path to XML coverage file.")
+    parser.add_argument('coverage_files', nargs='+',
+                        help="Path to coverage file, which may be compressed with gzip or zstd, or - for stdin. "
+                        "Files from separate runs, or glob patterns, are merged.")
     parser.add_argument('--line', default=None, type=float, help="Line coverage percentage threshold.")
     parser.add_argument('--branch', default=None, type=float, help="Branch coverage percentage threshold.")
 
     parser.add_argument('--output', default=None, type=str, help="Path to a file where output JSON should be saved.")
+    parser.add_argument('--output-format', default=None, choices=['indent', 'compact', 'ndjson'],
+                        help="Format of the output JSON: indented, compact, or one flat object per node and line.")
+    parser.add_argument('--export', default=None, type=str,
+                        help="Path to a file where a table of coverage with one row per node should be saved.")
+    parser.add_argument('--export-format', default=None, choices=['auto', 'parquet', 'csv'],
+                        help="Format of the exported table. Defaults to the extension of the file, or Parquet if "
+                        "pyarrow is installed and CSV otherwise.")
     parser.add_argument('--silent', default=False, action='store_true', help="Do not print coverage results.")
 
+    parser.add_argument('--streaming', default=None, action='store_true',
+                        help="Parse the coverage file incrementally to keep memory use flat on very large files.")
+    parser.add_argument('--format', dest='file_format', default=None,
+                        choices=['auto', 'xml', 'lcov', 'json', 'coverage-db'],
+                        help="Format of the coverage files: Cobertura XML, LCOV, coverage.py JSON or a coverage.py "
+                        ".coverage data file. Detected from the content of the files by default.")
+    parser.add_argument('--parser', default=None, choices=['auto', 'lxml', 'expat', 'etree', 'iterparse'],
+                        help="XML parser to read coverage files with. Defaults to lxml if it is installed, or expat.")
+    parser.add_argument('--trust-header', default=None, action='store_true',
+                        help="Read coverage totals from the aggregate attributes in the coverage file.")
+    parser.add_argument('--verify-header', default=None, action='store_true',
+                        help="Check the aggregate attributes in the coverage file against the counted coverage.")
+    parser.add_argument('--jobs', default=None, type=int, help="Number of processes to parse the coverage file with.")
+    parser.add_argument('--compact', default=None, action='store_true',
+                        help="Store the parsed coverage tree in compact arrays to reduce memory use.")
+    parser.add_argument('--diff', default=None, type=str,
+                        help="Path to a unified diff file. Thresholds are only checked against the changed lines.")
+    parser.add_argument('--diff-range', default=None, type=str,
+                        help="Git revision range, such as main...HEAD. Thresholds are only checked against the lines "
+                        "it changes.")
+    parser.add_argument('--no-cache', dest='cache', default=None, action='store_false',
+                        help="Do not load or store parsed coverage trees in the cache.")
+    parser.add_argument('--cache-dir', default=None, type=str,
+                        help="Directory of the cache of parsed coverage trees. Defaults to ~/.cache/covcheck.")
+    parser.add_argument('--cache-size', default=None, type=float,
+                        help="Maximum size of the cache of parsed coverage trees in MiB. Defaults to 512.")
+    parser.add_argument('--cache-key', default=None, choices=['content', 'stat'],
+                        help="Key cached trees by the content of coverage files, or by their size and modification "
+                        "time.")
+    parser.add_argument('--baseline', default=None, type=str,
+                        help="Path to the JSON output of a previous run. Fails if the coverage of any file or "
+                        "directory dropped from it.")
+    parser.add_argument('--baseline-tolerance', default=None, type=float,
+                        help="Drop in percentage points of coverage allowed from --baseline. Defaults to 0.")
+    parser.add_argument('--timings', default=None, action='store_true',
+                        help="Print the wall time, CPU time, memory and counts of each phase of the run to stderr.")
+    parser.add_argument('--timings-output', default=None, type=str,
+                        help="Path to a file where the timings of each phase should be saved as JSON.")
+    parser.add_argument('--profile', default=None, type=str,
+                        help="Path to a file where a profile of the run should be saved.")
+    parser.add_argument('--profile-type', default=None, choices=['cpu', 'memory'],
+                        help="Profile CPU time with cProfile, saved in the pstats format, or memory allocations with "
+                        "tracemalloc, saved as a snapshot. Defaults to cpu.")
+
     parser.add_argument('--config', default=None, type=str, help="Path to pyproject.toml config file.")
-    parser.add_argument('--group', default=None, type=str, help="Name of coverage group to check.")
+    parser.add_argument('--group', default=None, type=str,
+                        help="Name of coverage group to check, a comma-separated list of groups, or 'all'.")
 
     return parser.parse_args()
 
@@ -29,14 +80,43 @@ def run() -> None:
     """Run the covcheck CLI."""
     args = parse_args()
 
-    config = Config.create(
-        args.coverage_file,
-        config_filepath=args.config,
-        line=args.line,
-        branch=args.branch,
-        output=args.output,
-        silent=args.silent,
-        group=args.group,
-    )
-
-    validate_coverage(config)
+    # Imported once arguments are parsed, so that --help and invalid arguments do not import the parsers
+    # pylint: disable=import-outside-toplevel
+    from covcheck._cli.config import Config
+    from covcheck._cli.validate import validate_coverage, validate_groups
+
+    settings = {
+        'line': args.line,
+        'branch': args.branch,
+        'output': args.output,
+        'output_format': args.output_format,
+        'export': args.export,
+        'export_format': args.export_format,
+        'silent': args.silent,
+        'streaming': args.streaming,
+        'file_format': args.file_format,
+        'parser': args.parser,
+        'trust_header': args.trust_header,
+        'verify_header': args.verify_header,
+        'jobs': args.jobs,
+        'compact': args.compact,
+        'diff': args.diff,
+        'diff_range': args.diff_range,
+        'cache': args.cache,
+        'cache_dir': args.cache_dir,
+        'cache_size': args.cache_size,
+        'cache_key': args.cache_key,
+        'baseline': args.baseline,
+        'baseline_tolerance': args.baseline_tolerance,
+        'timings': args.timings,
+        'timings_output': args.timings_output,
+        'profile': args.profile,
+        'profile_type': args.profile_type,
+    }
+
+    if args.group is not None and (args.group == 'all' or ',' in args.group):
+        configs = Config.create_groups(args.coverage_files, args.config, args.group, **settings)
+        validate_groups(configs)
+    else:
+        config = Config.create(args.coverage_files, config_filepath=args.config, group=args.group, **settings)
+        validate_coverage(config)
@@ -0,0 +1,109 @@
+"""Phase timings and profiling of covcheck runs."""
+
+import json
+import sys
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
+
+from covcheck._parsing.instrumentation import Instrumentation, PhaseMetrics
+from covcheck._cli.config import Config
+from covcheck._cli.utilities import fail_with_error
+
+if TYPE_CHECKING:
+    from cProfile import Profile
+
+PROFILE_TYPES = ('cpu', 'memory')
+
+_MIB = 1024 * 1024
+
+
+@contextmanager
+def instrumented(config: Config) -> Iterator[None]:
+    """Collect the metrics of each phase of a run, and profile it, as set in a config.
+
+    The timings are reported and the profile is saved once the run ends, including when it exits with an error.
+
+    :param config: Config object.
+    """
+    if config.profile is not None and config.profile_type not in PROFILE_TYPES:
+        fail_with_error(f"Invalid profile type ({config.profile_type}). Must be one of: {', '.join(PROFILE_TYPES)}.")
+
+    collected: List[PhaseMetrics] = []
+    timed = config.timings or config.timings_output is not None
+    hook = collected.append
+    if timed:
+        Instrumentation.add_hook(hook)
+    profiler = _start_profiler(config.profile_type) if config.profile is not None else None
+    try:
+        yield
+    finally:
+        if config.profile is not None:
+            _save_profile(config.profile_type, profiler, config.profile)
+        if timed:
+            Instrumentation.remove_hook(hook)
+        if config.timings:
+            print('\n'.join(format_timings(collected)), file=sys.stderr)
+        if config.timings_output is not None:
+            with open(config.timings_output, 'w', encoding='utf-8') as f:
+                json.dump({'phases': [metrics.to_dict() for metrics in collected]}, f, indent=4)
+
+
+def format_timings(collected: List[PhaseMetrics]) -> List[str]:
+    """Format the metrics of phases as the lines of a table, in the order the phases ended.
+
+    :param collected: Metrics of each phase.
+    :return: Lines of the table.
+    """
+    lines = [f"{'phase':<16} {'wall ms':>10} {'cpu ms':>10} {'peak MiB':>9} {'rss MiB':>9}  counts"]
+    for metrics in collected:
+        peak = f"{metrics.peak_memory / _MIB:.1f}" if metrics.peak_memory is not None else '-'
+        rss = f"{metrics.max_rss / _MIB:.1f}" if metrics.max_rss is not None else '-'
+        counts = ', '.join(f"{name}={count}" for name, count in metrics.counts.items())
+        lines.append(f"{metrics.name:<16} {metrics.wall_seconds * 1000:>10.1f} {metrics.cpu_seconds * 1000:>10.1f} "
+                     f"{peak:>9} {rss:>9}  {counts}")
+    return lines
+
+
+def _start_profiler(profile_type: str) -> Optional['Profile']:
+    """Start profiling CPU time with cProfile, or tracing memory allocations with tracemalloc.
+
+    Memory tracing also measures the peak memory of each phase.
+
+    :param profile_type: 'cpu' or 'memory'.
+    :return: Running cProfile profiler, or None for memory profiles.
+    """
+    # Profilers are only imported when a profile is requested, as they are not needed by other runs
+    # pylint: disable=import-outside-toplevel
+    if profile_type == 'memory':
+        import tracemalloc
+        tracemalloc.start()
+        return None
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _save_profile(profile_type: str, profiler: Optional['Profile'], filepath: Union[str, Path]) -> None:
+    """Stop profiling and save the profile.
+
+    CPU profiles are saved in the pstats format, to be read with `python -m pstats` or tools such as snakeviz, and
+    memory profiles as tracemalloc snapshots, to be read with tracemalloc.Snapshot.load.
+
+    :param profile_type: 'cpu' or 'memory'.
+    :param profiler: Profiler returned by _start_profiler.
+    :param filepath: Path on disk where the profile should be saved.
+    """
+    if profile_type == 'memory':
+        import tracemalloc  # pylint: disable=import-outside-toplevel
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        snapshot.dump(str(filepath))
+        return
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(filepath)
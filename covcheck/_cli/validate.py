@@ -1,12 +1,63 @@
 """Validation entrypoint."""
 
-import json
+import glob
 
-from typing import Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+from covcheck._output.columnar_export import CoverageExporter
+from covcheck._output.json_writer import CoverageJSONWriter
+from covcheck._parsing.coverage_cache import CoverageCache
+from covcheck._parsing.coverage_diff import CoverageDiff
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_readers import COVERAGE_READERS, detect_format
 from covcheck._parsing.coverage_result import CoverageResult
+from covcheck._parsing.coverage_rules import CoverageRules
+from covcheck._parsing.coverage_source import CoverageSource
+from covcheck._parsing.coverage_summary import CoverageSummary
+from covcheck._parsing.instrumentation import Instrumentation
+from covcheck._parsing.unified_diff_parser import UnifiedDiffParser
+from covcheck._parsing.xml_backends import get_backend
 from covcheck._cli.utilities import fail_with_error
 from covcheck._cli.config import Config
+from covcheck._cli.timings import instrumented
+
+
+# Maximum number of changed files not in the coverage file to list
+_MAX_LISTED_FILEPATHS = 10
+
+# Settings which the coverage files are parsed with, which must be the same for every group checked in one run
+_PARSE_SETTINGS = ('coverage_filepath', 'file_format', 'parser', 'streaming', 'trust_header', 'verify_header', 'jobs',
+                   'compact', 'diff', 'diff_range', 'cache', 'cache_dir', 'cache_size', 'cache_key')
+
+
+class _ParsedCoverage:
+    """Coverage parsed once for one or more configs."""
+    def __init__(
+        self,
+        summary: CoverageSummary,
+        result: Optional[CoverageResult] = None,
+        header_matches: bool = True,
+        diff: bool = False,
+        n_changed_files: int = 0,
+        unmatched_filepaths: Sequence[str] = (),
+    ):
+        """Construct _ParsedCoverage.
+
+        :param summary: CoverageSummary to check thresholds against, of only the changed lines with diff.
+        :param result: Parsed CoverageResult, or None if only the summary was read.
+        :param header_matches: Whether the aggregate attributes in the file match the counted coverage.
+        :param diff: Whether the summary is of only the lines changed by a diff.
+        :param n_changed_files: Number of files changed by the diff.
+        :param unmatched_filepaths: Paths of the files changed by the diff which are not in the coverage tree.
+        """
+        self.summary = summary
+        self.result = result
+        self.header_matches = header_matches
+        self.diff = diff
+        self.n_changed_files = n_changed_files
+        self.unmatched_filepaths = unmatched_filepaths
 
 
 def validate_coverage(config: Config) -> None:
@@ -14,38 +65,419 @@ def validate_coverage(config: Config) -> None:
 
     param: Config object.
     """
-    _validate_thresholds(config.line, config.branch)
+    with instrumented(config), Instrumentation.phase('validate'):
+        _validate_thresholds(config.line, config.branch)
+        rules = _load_rules(config)
+        with Instrumentation.phase('load'):
+            parsed = _parse_coverage(config, needs_tree=_needs_tree(config, rules))
+
+        if _check_coverage(config, parsed, rules):
+            fail_with_error("One or more quality checks failed.")
+
+
+def validate_groups(configs: Dict[str, Config]) -> None:
+    """Validate the code coverage of several coverage groups, parsing the coverage files once.
+
+    The coverage files, parsing settings and diff must be the same for every group. Each group is reported separately,
+    and the process exits with an error once every group is checked if any group failed.
+
+    param: Config object of each group, by group name.
+    """
+    if len(configs) == 0:
+        fail_with_error("No groups to check.")
+
+    # Timings and profiling are CLI settings, which are the same for every group
+    first_group, first_config = next(iter(configs.items()))
+    for group, config in configs.items():
+        different = [name for name in _PARSE_SETTINGS if getattr(config, name) != getattr(first_config, name)]
+        if different:
+            fail_with_error(f"Group {group} has a different {different[0]} than group {first_group}. Groups checked "
+                            "in one run must have the same coverage files, parsing settings and diff.")
+
+    with instrumented(first_config), Instrumentation.phase('validate'):
+        group_rules = {}
+        for group, config in configs.items():
+            _validate_thresholds(config.line, config.branch)
+            group_rules[group] = _load_rules(config)
+
+        needs_tree = any(_needs_tree(config, group_rules[group]) for group, config in configs.items())
+        with Instrumentation.phase('load'):
+            parsed = _parse_coverage(first_config, needs_tree=needs_tree)
+
+        failed_groups = []
+        for group, config in configs.items():
+            if not config.silent:
+                print(f"Group {group}:")
+            if _check_coverage(config, parsed, group_rules[group]):
+                failed_groups.append(group)
+
+        if failed_groups:
+            fail_with_error(f"One or more quality checks failed in groups: {', '.join(failed_groups)}.")
+
+
+def _parse_coverage(config: Config, needs_tree: bool) -> _ParsedCoverage:
+    """Parse the coverage files of a config.
+
+    :param config: Config object.
+    :param needs_tree: Whether the coverage tree is needed, rather than only its summary.
+    :return: Parsed coverage.
+    """
+    filepaths = _find_coverage_filepaths(config.coverage_filepath)
+    file_format = _resolve_format(config, filepaths)
+    _validate_jobs(config.jobs, config.streaming and len(filepaths) == 1, filepaths)
+    _validate_parser(config.parser, config.streaming)
+    changed_lines = _load_changed_lines(config)
+
+    if file_format != 'xml':
+        result = CoverageResult.from_file(
+            filepaths[0],
+            file_format=file_format,
+            compact=config.compact,
+            keep_lines=changed_lines is not None,
+        )
+        if changed_lines is None:
+            return _ParsedCoverage(result.summary, result)
+        return _diff_coverage(result, changed_lines)
+
+    only_summary = not needs_tree and len(filepaths) == 1 and changed_lines is None
+    if config.trust_header and not config.verify_header and only_summary:
+        # Only the summary is needed, so read it from the aggregate attributes of the root element
+        return _ParsedCoverage(CoverageResult.summary_from_xml(filepaths[0]))
+
+    result, header_matches = _load_result(config, filepaths, keep_lines=changed_lines is not None)
+    if changed_lines is None:
+        return _ParsedCoverage(result.summary, result, header_matches)
+    # Filenames in the coverage files are relative to their source directories, and paths in the diff to the root of
+    # the repository, which covcheck is run from
+    source_dirpaths = [
+        source_dirpath for filepath in filepaths if not CoverageSource.is_stdin(filepath)
+        for source_dirpath in CoverageResult.sources_from_xml(filepath)
+    ]
+    return _diff_coverage(result, result.resolve_diff_paths(changed_lines, source_dirpaths), header_matches)
+
+
+def _diff_coverage(result: CoverageResult, changed_lines: Dict[str, int],
+                   header_matches: bool = True) -> _ParsedCoverage:
+    """Get the coverage of only the changed lines of a diff.
+
+    :param result: Parsed CoverageResult, with per-line coverage.
+    :param changed_lines: Bitmap of the changed line numbers of each changed file.
+    :param header_matches: Whether the aggregate attributes in the file match the counted coverage.
+    :return: Parsed coverage of the changed lines.
+    """
+    unmatched_filepaths = result.unmatched_paths(changed_lines)
+    return _ParsedCoverage(result.diff_summary(changed_lines), result, header_matches, diff=True,
+                           n_changed_files=len(changed_lines), unmatched_filepaths=unmatched_filepaths)
+
+
+def _needs_tree(config: Config, rules: Optional[CoverageRules]) -> bool:
+    """Get whether checking a config needs the coverage tree, rather than only its summary."""
+    return config.output is not None or config.export is not None or config.baseline is not None or rules is not None
+
+
+def _check_coverage(config: Config, parsed: _ParsedCoverage, rules: Optional[CoverageRules]) -> bool:
+    """Check parsed coverage against the thresholds and rules of a config, and write its output file.
+
+    :param config: Config object.
+    :param parsed: Parsed coverage.
+    :param rules: Compiled rules of the config.
+    :return: Whether any check failed.
+    """
+    checks_failed = not parsed.header_matches
+
+    if parsed.result is not None:
+        if rules is not None:
+            checks_failed |= _check_rules(config, rules, parsed.result.tree)
 
-    result = CoverageResult.from_xml(config.coverage_filepath)
+        if config.baseline is not None:
+            checks_failed |= _check_baseline(config, config.baseline, parsed.result.tree)
 
-    if config.output is not None:
-        with open(config.output, 'w', encoding='utf-8') as f:
-            json.dump(result.tree.serialize(), f, indent=4)  # type: ignore
+        if config.output is not None:
+            if config.output_format not in CoverageJSONWriter.FORMATS:
+                fail_with_error(f"Invalid output format ({config.output_format}). "
+                                f"Must be one of: {', '.join(CoverageJSONWriter.FORMATS)}.")
+            with Instrumentation.phase('output') as counts, open(config.output, 'w', encoding='utf-8') as f:
+                CoverageJSONWriter.write(parsed.result.tree, f, output_format=config.output_format)
+                counts['bytes'] = f.tell()
 
-    required_args = [config.line, config.branch, config.output]
+        if config.export is not None:
+            try:
+                with Instrumentation.phase('export'):
+                    CoverageExporter.export(parsed.result.tree, config.export, export_format=config.export_format)
+            except (ImportError, ValueError) as e:
+                fail_with_error(str(e))
+
+    required_args = [config.line, config.branch, config.output, config.export, config.baseline, rules]
     if all(input_value is None for input_value in required_args):
-        fail_with_error("Must specify --line, --branch, or --output_filepath.")
+        fail_with_error("Must specify --line, --branch, --output, --export, --baseline, "
+                        "or [tool.covcheck.rules] in the config.")
+
+    summary = parsed.summary
+    if not parsed.diff:
+        checks_failed |= _check_threshold("Line coverage", summary.line_rate, config.line, config.silent)
+        checks_failed |= _check_threshold("Branch coverage", summary.branch_rate, config.branch, config.silent)
+        return checks_failed
+    return _check_diff(config, parsed) or checks_failed
+
+
+def _check_diff(config: Config, parsed: _ParsedCoverage) -> bool:
+    """Check the coverage of only the changed lines of a diff against the thresholds of a config.
+
+    :param config: Config object.
+    :param parsed: Parsed coverage of the changed lines.
+    :return: Whether any check failed.
+    """
+    unmatched = parsed.unmatched_filepaths
+    if 0 < parsed.n_changed_files == len(unmatched):
+        # The paths of the diff are most likely relative to a different directory than the paths of the coverage file
+        fail_with_error(f"None of the {parsed.n_changed_files} changed files are in the coverage file, such as "
+                        f"{unmatched[0]}. Paths in the diff must match the paths of files in the coverage file.",
+                        sys_exit=False)
+        return True
+    if unmatched and not config.silent:
+        listed = ', '.join(unmatched[:_MAX_LISTED_FILEPATHS])
+        more = f" and {len(unmatched) - _MAX_LISTED_FILEPATHS} more" if len(unmatched) > _MAX_LISTED_FILEPATHS else ''
+        print(f"Changed files not in the coverage file: {listed}{more}")
 
+    # Changes without measured lines or branches have nothing to check
     checks_failed = False
+    summary = parsed.summary
+    if summary.n_lines > 0:
+        checks_failed |= _check_threshold("Diff line coverage", summary.line_rate, config.line, config.silent)
+    elif config.line is not None and not config.silent:
+        print("Diff line coverage passed: no measured lines changed")
+    if summary.n_branches > 0:
+        checks_failed |= _check_threshold("Diff branch coverage", summary.branch_rate, config.branch, config.silent)
+    elif config.branch is not None and not config.silent:
+        print("Diff branch coverage passed: no measured branches changed")
+    return checks_failed
+
+
+def _check_rules(config: Config, rules: CoverageRules, tree: BaseCoverageNode) -> bool:
+    """Check a coverage tree against the rules of a config, printing each violation.
+
+    :param config: Config object.
+    :param rules: Compiled rules of the config.
+    :param tree: Parsed coverage tree.
+    :return: Whether any rule was violated.
+    """
+    with Instrumentation.phase('rules') as counts:
+        violations = rules.check(tree)
+        counts.update(rules=len(rules), violations=len(violations))
+    for violation in violations:
+        fail_with_error(violation, sys_exit=False)
+    if not violations and not config.silent:
+        print(f"Coverage rules passed: {len(rules)} rules")
+    return len(violations) > 0
+
 
-    line_rate = result.summary.line_rate * 100
-    if config.line is not None:
-        if line_rate < config.line:
-            fail_with_error(f"Line coverage ({line_rate:.2f}%) below threshold ({config.line}%)", sys_exit=False)
-            checks_failed = True
-        elif not config.silent:
-            print(f"Line coverage passed: {line_rate:.2f}%")
+def _check_baseline(config: Config, baseline_filepath: Union[str, Path], tree: BaseCoverageNode) -> bool:
+    """Check the coverage of each file and directory against a baseline, printing each regression.
 
-    branch_rate = result.summary.branch_rate * 100
-    if config.branch is not None:
-        if branch_rate < config.branch:
-            fail_with_error(f"Branch coverage ({branch_rate:.2f}%) below threshold ({config.branch}%)", sys_exit=False)
-            checks_failed = True
-        elif not config.silent:
-            print(f"Branch coverage passed: {branch_rate:.2f}%")
+    :param config: Config object.
+    :param baseline_filepath: Path to the JSON output of a previous run.
+    :param tree: Parsed coverage tree.
+    :return: Whether the coverage of any file or directory regressed.
+    """
+    if config.baseline_tolerance < 0:
+        fail_with_error(f"Invalid baseline tolerance ({config.baseline_tolerance}). Must be at least 0.")
+
+    with Instrumentation.phase('baseline') as counts:
+        try:
+            baseline = CoverageDiff.read_output(baseline_filepath)
+        except (OSError, ValueError) as e:
+            fail_with_error(f"Could not read baseline: {e}")
+            raise
+        changes = CoverageDiff.compare(baseline, tree)
+        regressions = [change for change in changes if change.regressed(config.baseline_tolerance)]
+        counts.update(changes=len(changes), regressions=len(regressions))
+
+    for change in regressions:
+        fail_with_error(f"Coverage regressed from baseline in {change.describe()}", sys_exit=False)
+    if not regressions and not config.silent:
+        n_files_changed = sum(1 for change in changes if change.node_type == CoverageNodeType.FILE)
+        print(f"Baseline passed: {n_files_changed} files changed, none regressed")
+    return len(regressions) > 0
+
+
+def _check_threshold(coverage_name: str, rate: float, threshold: Optional[float], silent: bool) -> bool:
+    """Check a coverage rate against a threshold, printing the result.
+
+    :param coverage_name: Name of the coverage to print, such as 'Line coverage'.
+    :param rate: Coverage rate between 0 and 1.
+    :param threshold: Threshold percentage, or None to skip the check.
+    :param silent: Whether to only print failures.
+    :return: Whether the check failed.
+    """
+    if threshold is None:
+        return False
+
+    percentage = rate * 100
+    if percentage < threshold:
+        fail_with_error(f"{coverage_name} ({percentage:.2f}%) below threshold ({threshold}%)", sys_exit=False)
+        return True
+    if not silent:
+        print(f"{coverage_name} passed: {percentage:.2f}%")
+    return False
+
+
+def _find_coverage_filepaths(
+    coverage_filepath: Union[str, Path, Sequence[Union[str, Path]]],
+) -> List[Union[str, Path]]:
+    """Find the coverage files of a config, expanding any glob patterns.
+
+    :param coverage_filepath: Path to a coverage file or glob pattern, or a sequence of them.
+    :return: Paths to coverage files.
+    """
+    patterns = [coverage_filepath] if isinstance(coverage_filepath, (str, Path)) else list(coverage_filepath)
+
+    filepaths: List[Union[str, Path]] = []
+    for pattern in patterns:
+        if isinstance(pattern, str) and any(character in pattern for character in '*?['):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if len(matches) == 0:
+                fail_with_error(f"No coverage files match {pattern}")
+            filepaths.extend(matches)
+        else:
+            filepaths.append(pattern)
+    return filepaths
+
+
+def _resolve_format(config: Config, filepaths: List[Union[str, Path]]) -> str:
+    """Get the format of the coverage files of a config, detecting it from their content by default.
+
+    :param config: Config object.
+    :param filepaths: Paths to the coverage files of the config.
+    :return: Name of the format, see COVERAGE_READERS.
+    """
+    if config.file_format != 'auto' and config.file_format not in COVERAGE_READERS:
+        fail_with_error(f"Invalid format ({config.file_format}). Must be one of: auto, {', '.join(COVERAGE_READERS)}.")
+
+    formats = set()
+    for filepath in filepaths:
+        try:
+            formats.add(detect_format(filepath) if config.file_format == 'auto' else config.file_format)
+        except OSError as e:
+            fail_with_error(f"Could not read coverage file: {e}")
+    file_format = formats.pop() if len(formats) == 1 else ''
+    if file_format == 'xml':
+        return file_format
+
+    if len(filepaths) > 1:
+        fail_with_error("Only XML coverage files can be merged.")
+    if config.trust_header or config.verify_header or config.jobs > 1 or config.streaming:
+        fail_with_error("--trust-header, --verify-header, --jobs and --streaming are only supported for XML coverage "
+                        "files.")
+    return file_format
+
+
+def _load_changed_lines(config: Config) -> Optional[Dict[str, int]]:
+    """Parse the changed lines of the diff of a config.
+
+    :param config: Config object.
+    :return: Bitmap of the changed line numbers of each changed file, or None if no diff is configured.
+    """
+    if config.diff is None and config.diff_range is None:
+        return None
+    if config.diff is not None and config.diff_range is not None:
+        fail_with_error("--diff cannot be combined with --diff-range.")
+    if config.compact:
+        fail_with_error("--diff and --diff-range cannot be combined with --compact.")
 
-    if checks_failed:
-        fail_with_error("One or more quality checks failed.")
+    try:
+        with Instrumentation.phase('diff') as counts:
+            if config.diff is not None:
+                changed_lines = UnifiedDiffParser.parse(config.diff)
+            else:
+                changed_lines = UnifiedDiffParser.parse_git(str(config.diff_range))
+            counts['files'] = len(changed_lines)
+        return changed_lines
+    except (OSError, ValueError) as e:
+        fail_with_error(f"Could not load diff: {e}")
+        raise
+
+
+def _load_rules(config: Config) -> Optional[CoverageRules]:
+    """Compile the per-path threshold rules of a config.
+
+    :param config: Config object.
+    :return: Compiled rules, or None if the config has no rules.
+    """
+    if not config.rules:
+        return None
+    try:
+        return CoverageRules.from_config(config.rules)
+    except ValueError as e:
+        fail_with_error(str(e))
+        raise
+
+
+def _load_result(
+    config: Config,
+    filepaths: List[Union[str, Path]],
+    keep_lines: bool = False,
+) -> Tuple[CoverageResult, bool]:
+    """Parse the coverage files of a config.
+
+    :param config: Config object.
+    :param filepaths: Paths to the coverage files of the config.
+    :param keep_lines: Whether to keep the per-line coverage of each file.
+    :return: CoverageResult, and whether the aggregate attributes in the file match the counted coverage.
+    """
+    if len(filepaths) > 1:
+        if config.trust_header or config.verify_header:
+            fail_with_error("--trust-header and --verify-header cannot be used with multiple coverage files.")
+        result = CoverageResult.merge(
+            filepaths,
+            jobs=config.jobs,
+            compact=config.compact,
+            keep_lines=keep_lines,
+            parser=config.parser,
+        )
+        return result, True
+
+    if not config.verify_header:
+        result = CoverageResult.from_xml(
+            filepaths[0],
+            streaming=config.streaming,
+            trust_header=config.trust_header,
+            jobs=config.jobs,
+            compact=config.compact,
+            keep_lines=keep_lines,
+            cache=_load_cache(config),
+            parser=config.parser,
+        )
+        return result, True
+
+    result, mismatches = CoverageResult.verify_xml(
+        filepaths[0],
+        streaming=config.streaming,
+        keep_lines=keep_lines,
+        parser=config.parser,
+    )
+    for mismatch in mismatches:
+        fail_with_error(f"Coverage header mismatch in {mismatch}", sys_exit=False)
+    return result, len(mismatches) == 0
+
+
+def _load_cache(config: Config) -> Optional[CoverageCache]:
+    """Get the cache of parsed coverage trees of a config.
+
+    :param config: Config object.
+    :return: CoverageCache, or None if caching is disabled.
+    """
+    if not config.cache:
+        return None
+    if config.cache_size < 0:
+        fail_with_error(f"Invalid cache size ({config.cache_size}). Must be at least 0.")
+    if config.cache_key not in ('content', 'stat'):
+        fail_with_error(f"Invalid cache key ({config.cache_key}). Must be 'content' or 'stat'.")
+
+    return CoverageCache(
+        config.cache_dir if config.cache_dir is not None else CoverageCache.default_dirpath(),
+        max_bytes=int(config.cache_size * 1024 * 1024),
+        hash_content=config.cache_key == 'content',
+    )
 
 
 def _validate_thresholds(
@@ -65,3 +497,32 @@ def _validate_thresholds(
         if threshold is not None and (threshold < 0 or threshold > 100):
             fail_with_error(
                 f"Invalid threshold for {coverage_type} coverage ({threshold}). Must be between 0 and 100.")
+
+
+def _validate_jobs(jobs: int, streaming: bool, filepaths: List[Union[str, Path]]) -> None:
+    """Validate the number of parsing jobs.
+
+    :param jobs: Number of processes to parse the coverage file with.
+    :param streaming: Whether the coverage file is parsed incrementally.
+    :param filepaths: Paths to the coverage files.
+    """
+    if jobs < 1:
+        fail_with_error(f"Invalid number of jobs ({jobs}). Must be at least 1.")
+    if jobs > 1 and streaming:
+        fail_with_error("--jobs cannot be combined with --streaming.")
+    if jobs > 1 and any(CoverageSource.is_stdin(filepath) for filepath in filepaths):
+        fail_with_error("--jobs cannot be combined with coverage read from stdin.")
+    if jobs > 1 and len(filepaths) == 1 and not CoverageSource.is_plain_file(filepaths[0]):
+        fail_with_error("--jobs requires an uncompressed coverage file, or several coverage files to merge.")
+
+
+def _validate_parser(parser: str, streaming: bool) -> None:
+    """Validate the XML parser backend.
+
+    :param parser: Name of the XML parser backend.
+    :param streaming: Whether the coverage file is parsed incrementally.
+    """
+    try:
+        get_backend(parser, streaming=streaming)
+    except (ImportError, ValueError) as e:
+        fail_with_error(str(e))
@@ -0,0 +1,120 @@
+"""Columnar export of coverage trees."""
+
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode
+
+PYARROW_INSTALLED = find_spec('pyarrow') is not None
+
+COLUMNS = ('path', 'node_type', 'depth', 'parent', 'n_lines', 'n_lines_covered', 'n_branches', 'n_branches_covered')
+
+_Row = Tuple[str, str, int, Optional[str], int, int, int, int]
+
+
+class CoverageExporter:
+    """Exporter of coverage trees as tables with one row per node, for loading into analytics tools.
+
+    Rows are in depth-first pre-order, with the path of each node relative to the root, its depth, the path of its
+    parent, and its aggregated line and branch counts. The root has the path '' and no parent, written as an empty
+    value in CSV files. Rows are written in batches as the tree is walked, so the whole table is never held in memory.
+    """
+    FORMATS = ('auto', 'parquet', 'csv')
+
+    @classmethod
+    def export(
+        cls,
+        node: BaseCoverageNode,
+        filepath: Union[str, Path],
+        export_format: str = 'auto',
+        batch_size: int = 65536,
+    ) -> str:
+        """Export a coverage tree to a Parquet or CSV file.
+
+        :param node: Root of the coverage tree.
+        :param filepath: Path on disk where the table should be written.
+        :param export_format: 'parquet', 'csv', or 'auto' to choose from the extension of filepath, or else Parquet if
+            pyarrow is installed and CSV otherwise.
+        :param batch_size: Number of rows to write at a time.
+        :return: Format of the written file, 'parquet' or 'csv'.
+        """
+        if export_format not in cls.FORMATS:
+            raise ValueError(f"Invalid export format ({export_format}). Must be one of: {', '.join(cls.FORMATS)}.")
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size ({batch_size}). Must be at least 1.")
+
+        if export_format == 'auto':
+            suffix = Path(filepath).suffix.lower()
+            if suffix in ('.parquet', '.csv'):
+                export_format = suffix[1:]
+            else:
+                export_format = 'parquet' if PYARROW_INSTALLED else 'csv'
+
+        if export_format == 'parquet':
+            if not PYARROW_INSTALLED:
+                raise ImportError("Parquet export requires the pyarrow package. "
+                                  "Please 'pip install pyarrow', or export to CSV.")
+            cls._export_parquet(node, filepath, batch_size)
+        else:
+            cls._export_csv(node, filepath, batch_size)
+        return export_format
+
+    @classmethod
+    def iter_batches(cls, node: BaseCoverageNode, batch_size: int = 65536) -> Iterator[List[_Row]]:
+        """Iterate over the rows of a coverage tree in batches.
+
+        :param node: Root of the coverage tree.
+        :param batch_size: Maximum number of rows in each batch.
+        :return: Batches of rows, with values in the order of COLUMNS.
+        """
+        batch: List[_Row] = []
+        for path, descendant in node.walk():
+            summary = descendant.summary
+            batch.append((
+                path,
+                descendant.node_type.value,
+                path.count('/') + 1 if path else 0,
+                path.rpartition('/')[0] if path else None,
+                summary.n_lines,
+                summary.n_lines_covered,
+                summary.n_branches,
+                summary.n_branches_covered,
+            ))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @classmethod
+    def _export_csv(cls, node: BaseCoverageNode, filepath: Union[str, Path], batch_size: int) -> None:
+        import csv  # pylint: disable=import-outside-toplevel
+
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for batch in cls.iter_batches(node, batch_size):
+                writer.writerows(batch)
+
+    @classmethod
+    def _export_parquet(cls, node: BaseCoverageNode, filepath: Union[str, Path], batch_size: int) -> None:
+        import pyarrow  # pylint: disable=import-outside-toplevel,import-error
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel,import-error
+
+        schema = pyarrow.schema([
+            ('path', pyarrow.string()),
+            ('node_type', pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+            ('depth', pyarrow.int32()),
+            ('parent', pyarrow.string()),
+            ('n_lines', pyarrow.int64()),
+            ('n_lines_covered', pyarrow.int64()),
+            ('n_branches', pyarrow.int64()),
+            ('n_branches_covered', pyarrow.int64()),
+        ])
+        with pyarrow.parquet.ParquetWriter(str(filepath), schema) as writer:
+            for batch in cls.iter_batches(node, batch_size):
+                writer.write_table(pyarrow.Table.from_arrays(
+                    [pyarrow.array(column, type=field.type) for column, field in zip(zip(*batch), schema)],
+                    schema=schema,
+                ))
@@ -0,0 +1,123 @@
+"""Streaming JSON writer for coverage trees."""
+
+from json.encoder import encode_basestring_ascii
+from typing import IO, List, Optional, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_summary import CoverageSummary
+
+_BUFFER_SIZE = 1 << 16
+
+# Summary keys in the order of CoverageNode.serialize
+_SUMMARY_KEYS = ('n_lines', 'line_rate', 'n_lines_covered', 'n_branches', 'branch_rate', 'n_branches_covered')
+
+
+class CoverageJSONWriter:
+    """Writer of coverage trees as JSON, walking the tree and writing it incrementally.
+
+    The 'indent' format is byte-identical to json.dump(node.serialize(), f, indent=4), and the 'compact' format to
+    json.dump with separators=(',', ':'), but neither builds the serialized tree of dictionaries in memory. The
+    'ndjson' format writes one flat object per node and line, in depth-first pre-order, with the path and depth of
+    each node and the path of its parent.
+    """
+    FORMATS = ('indent', 'compact', 'ndjson')
+
+    @classmethod
+    def write(cls, node: BaseCoverageNode, f: IO[str], output_format: str = 'indent') -> None:
+        """Write a coverage tree as JSON.
+
+        :param node: Root of the coverage tree.
+        :param f: Text file to write to.
+        :param output_format: 'indent', 'compact' or 'ndjson'.
+        """
+        if output_format == 'ndjson':
+            cls._write_ndjson(node, f)
+        elif output_format in ('indent', 'compact'):
+            cls._write_tree(node, f, indent=4 if output_format == 'indent' else None)
+        else:
+            raise ValueError(f"Invalid output format ({output_format}). Must be one of: {', '.join(cls.FORMATS)}.")
+
+    @classmethod
+    def _write_tree(cls, root: BaseCoverageNode, f: IO[str], indent: Optional[int]) -> None:
+        item_separator = ','
+        key_separator = ': ' if indent is not None else ':'
+
+        def newline(level: int) -> str:
+            return '\n' + ' ' * (indent * level) if indent is not None else ''
+
+        # The stack holds nodes to write with their indentation levels, and literal text between them
+        stack: List[Union[str, BaseCoverageNode]] = [root]
+        levels: List[int] = [0]
+        buffer: List[str] = []
+        buffered = 0
+
+        while stack:
+            entry = stack.pop()
+            level = levels.pop()
+            if isinstance(entry, str):
+                text = entry
+            else:
+                inner = newline(level + 1)
+                summary = ''.join(
+                    (item_separator if index > 0 else '') + newline(level + 2) + f'"{key}"{key_separator}{value}'
+                    for index, (key, value) in enumerate(_summary_items(entry.summary))
+                )
+                node_type = encode_basestring_ascii(entry.node_type.value)
+                text = (
+                    f'{{{inner}"name"{key_separator}{encode_basestring_ascii(entry.name)}{item_separator}'
+                    f'{inner}"summary"{key_separator}{{{summary}{inner}}}{item_separator}'
+                    f'{inner}"node_type"{key_separator}{node_type}{item_separator}'
+                    f'{inner}"children"{key_separator}'
+                )
+
+                children = list(entry.children())
+                if children:
+                    text += '['
+                    stack.append(f'{inner}]{newline(level)}}}')
+                    levels.append(level)
+                    child_prefix = newline(level + 2)
+                    for index in range(len(children) - 1, -1, -1):
+                        stack.append(children[index])
+                        levels.append(level + 2)
+                        stack.append((item_separator if index > 0 else '') + child_prefix)
+                        levels.append(level + 2)
+                else:
+                    text += f'[]{newline(level)}}}'
+
+            # The buffer is checked after every entry, so that it never holds much more than _BUFFER_SIZE characters
+            buffer.append(text)
+            buffered += len(text)
+            if buffered >= _BUFFER_SIZE:
+                f.write(''.join(buffer))
+                buffer.clear()
+                buffered = 0
+
+        f.write(''.join(buffer))
+
+    @classmethod
+    def _write_ndjson(cls, root: BaseCoverageNode, f: IO[str]) -> None:
+        buffer: List[str] = []
+        buffered = 0
+        for path, node in root.walk():
+            parent = encode_basestring_ascii(path.rpartition('/')[0]) if path else 'null'
+            depth = path.count('/') + 1 if path else 0
+            summary = ','.join(f'"{key}":{value}' for key, value in _summary_items(node.summary))
+            line = (
+                f'{{"path":{encode_basestring_ascii(path)},"name":{encode_basestring_ascii(node.name)},'
+                f'"node_type":"{node.node_type.value}","depth":{depth},"parent":{parent},{summary}}}\n'
+            )
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= _BUFFER_SIZE:
+                f.write(''.join(buffer))
+                buffer.clear()
+                buffered = 0
+
+        f.write(''.join(buffer))
+
+
+def _summary_items(summary: CoverageSummary) -> List[Tuple[str, str]]:
+    """Get the keys of a summary as in CoverageNode.serialize, with their values encoded as JSON numbers."""
+    values = (summary.n_lines, summary.line_rate, summary.n_lines_covered, summary.n_branches, summary.branch_rate,
+              summary.n_branches_covered)
+    return [(key, repr(value)) for key, value in zip(_SUMMARY_KEYS, values)]
@@ -0,0 +1,361 @@
+"""Compact coverage tree."""
+
+import mmap
+import struct
+import sys
+
+from array import array
+from itertools import accumulate
+from operator import add, sub
+from pathlib import Path
+from typing import IO, Dict, Generator, Iterable, List, Optional, Sequence, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode, dirpath_parts
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_summary import CoverageSummary
+from covcheck._parsing.line_coverage import LineCoverage
+
+# Directory of a tree under construction, mapping names of children to directories or to indices of files
+_Directory = Dict[str, Union['_Directory', int]]
+
+_NODE_TYPE_CODES = {CoverageNodeType.DIR: 0, CoverageNodeType.FILE: 1}
+_NODE_TYPES = {code: node_type for node_type, code in _NODE_TYPE_CODES.items()}
+
+# Binary format: magic, version, padding, number of nodes and byte length of the names, followed by the parents, sizes
+# and count arrays as native 8-byte integers, the node type codes, and the names separated by NUL bytes. The header is
+# 32 bytes so the integer arrays are aligned.
+_MAGIC = b'CVCKTREE'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('=8sIIQQ')
+_INT_SIZE = 8
+
+
+class CompactCoverageTree:  # pylint: disable=too-many-instance-attributes
+    """Coverage tree stored as parallel arrays, with one entry per node.
+
+    Nodes are stored in depth-first pre-order, so the descendants of a node are the nodes directly following it. The
+    subtree size of each node is stored alongside its summary counts, which are aggregated over its descendants once
+    when the tree is built. The nodes of the tree are accessed through lightweight CompactCoverageNode views.
+    """
+    __slots__ = (
+        'names',
+        'node_types',
+        'parents',
+        'sizes',
+        'n_lines',
+        'n_lines_covered',
+        'n_branches',
+        'n_branches_covered',
+    )
+
+    def __init__(
+        self,
+        names: List[str],
+        node_types: Sequence[int],
+        parents: Sequence[int],
+        sizes: Sequence[int],
+        counts: Tuple[Sequence[int], Sequence[int], Sequence[int], Sequence[int]],
+    ):
+        """Construct a CompactCoverageTree from its arrays, indexed by node in pre-order.
+
+        The arrays are usually array or bytearray objects, but may also be memoryviews, such as views of a
+        memory-mapped file loaded with from_buffer.
+
+        :param names: Name of each node.
+        :param node_types: CoverageNodeType code of each node.
+        :param parents: Index of the parent of each node, or -1 for the root.
+        :param sizes: Number of nodes in the subtree of each node, including the node itself.
+        :param counts: Aggregated line, covered line, branch and covered branch counts of each node.
+        """
+        self.names = names
+        self.node_types = node_types
+        self.parents = parents
+        self.sizes = sizes
+        self.n_lines, self.n_lines_covered, self.n_branches, self.n_branches_covered = counts
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def root(self) -> 'CompactCoverageNode':
+        """Get a view of the root node of the tree.
+
+        :return: Root node view.
+        """
+        return CompactCoverageNode(self, 0)
+
+    def write(self, f: IO[bytes]) -> None:
+        """Write the tree in a binary format which can be loaded without copying with from_buffer.
+
+        Integers are written in the native byte order, so the file should be loaded on the same platform.
+
+        :param f: Binary file to write to.
+        """
+        names = '\0'.join(self.names).encode('utf-8')
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, len(self), len(names)))
+        for values in (self.parents, self.sizes, self.n_lines, self.n_lines_covered, self.n_branches,
+                       self.n_branches_covered):
+            f.write(values if isinstance(values, array) else array('q', values))
+        f.write(bytes(self.node_types))
+        f.write(names)
+
+    @classmethod
+    def from_buffer(cls, buffer: Union[bytes, memoryview, mmap.mmap]) -> 'CompactCoverageTree':
+        """Load a tree written with write, such as from a memory-mapped file.
+
+        The integer arrays of the tree are views of the buffer, so they are not copied. Only the names are decoded.
+
+        :param buffer: Buffer containing a tree in the binary format of write.
+        """
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("Invalid compact coverage tree, the data is truncated")
+        magic, version, _, n_nodes, names_length = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _FORMAT_VERSION or n_nodes == 0:
+            raise ValueError("Invalid compact coverage tree, unknown format")
+
+        arrays_end = _HEADER.size + 6 * n_nodes * _INT_SIZE
+        if len(view) != arrays_end + n_nodes + names_length:
+            raise ValueError("Invalid compact coverage tree, the data is truncated")
+
+        array_size = n_nodes * _INT_SIZE
+        int_arrays = [
+            view[start:start + array_size].cast('q') for start in range(_HEADER.size, arrays_end, array_size)
+        ]
+        node_types = view[arrays_end:arrays_end + n_nodes]
+        names = str(view[arrays_end + n_nodes:], 'utf-8').split('\0')
+
+        parents, sizes, *counts = int_arrays
+        return cls(names, node_types, parents, sizes, (counts[0], counts[1], counts[2], counts[3]))
+
+    @classmethod
+    def from_node(cls, node: BaseCoverageNode) -> 'CompactCoverageTree':
+        """Create a CompactCoverageTree from a tree of CoverageNodes.
+
+        :param node: Root of the tree of CoverageNodes.
+        """
+        names: List[str] = []
+        node_types = bytearray()
+        parents = array('q')
+        file_counts: List[array] = [array('q') for _ in range(4)]
+
+        stack: List[Tuple[BaseCoverageNode, int]] = [(node, -1)]
+        while stack:
+            current, parent = stack.pop()
+            index = len(names)
+            names.append(sys.intern(current.name))
+            node_types.append(_NODE_TYPE_CODES[current.node_type])
+            parents.append(parent)
+
+            # Nodes with children have the aggregated summary of their children
+            children = list(current.children())
+            summary = current.summary if not children else CoverageSummary(0, 0, 0, 0)
+            for counts, value in zip(file_counts, _summary_counts(summary)):
+                counts.append(value)
+
+            stack.extend((child, index) for child in reversed(children))
+
+        return cls._aggregate(names, node_types, parents, file_counts)
+
+    @classmethod
+    def from_file_nodes(
+        cls,
+        file_nodes: Iterable[Tuple[Optional[Union[Path, str]], CoverageNode]],
+    ) -> 'CompactCoverageTree':
+        """Create a CompactCoverageTree from file nodes, without building a tree of CoverageNodes.
+
+        Directories are created as needed, in the same order as adding the file nodes to a root CoverageNode.
+
+        :param file_nodes: File nodes and the paths of their parent directories, relative to the root of the tree.
+        """
+        root: _Directory = {}
+        file_counts: List[array] = [array('q') for _ in range(4)]
+
+        for dirpath, node in file_nodes:
+            directory = root
+            for directory_name in (dirpath_parts(dirpath) if dirpath is not None else ()):
+                child = directory.get(directory_name)
+                if child is None:
+                    child = directory[sys.intern(directory_name)] = {}
+                elif isinstance(child, int):
+                    raise ValueError(f"A file node with the name {directory_name} was already added as a child")
+                directory = child
+
+            if node.name in directory:
+                raise ValueError(f"A node with the name {node.name} was already added as a child")
+            directory[sys.intern(node.name)] = len(file_counts[0])
+            for counts, value in zip(file_counts, _summary_counts(node.summary)):
+                counts.append(value)
+
+        return cls._flatten(root, file_counts)
+
+    @classmethod
+    def _flatten(cls, root: _Directory, file_counts: List['array[int]']) -> 'CompactCoverageTree':
+        names: List[str] = []
+        node_types = bytearray()
+        parents = array('q')
+        node_counts: List[array] = [array('q') for _ in range(4)]
+
+        stack: List[Tuple[str, Union[_Directory, int], int]] = [('root', root, -1)]
+        while stack:
+            name, entry, parent = stack.pop()
+            index = len(names)
+            names.append(name)
+            parents.append(parent)
+
+            if isinstance(entry, int):
+                node_types.append(_NODE_TYPE_CODES[CoverageNodeType.FILE])
+                for counts, values in zip(node_counts, file_counts):
+                    counts.append(values[entry])
+            else:
+                node_types.append(_NODE_TYPE_CODES[CoverageNodeType.DIR])
+                for counts in node_counts:
+                    counts.append(0)
+                stack.extend((child_name, child, index) for child_name, child in reversed(entry.items()))
+
+        return cls._aggregate(names, node_types, parents, node_counts)
+
+    @classmethod
+    def _aggregate(
+        cls,
+        names: List[str],
+        node_types: bytearray,
+        parents: 'array[int]',
+        file_counts: List['array[int]'],
+    ) -> 'CompactCoverageTree':
+        # Children follow their parents in pre-order, so a single backwards pass accumulates subtree sizes
+        sizes = array('q', [0]) * len(names)
+        for index in range(len(names) - 1, 0, -1):
+            sizes[index] += 1
+            sizes[parents[index]] += sizes[index]
+        sizes[0] += 1
+
+        # Descendants of a node directly follow it in pre-order, so the aggregate of a node is the difference of the
+        # prefix sums of the file counts at either end of its subtree.
+        ends = array('q', map(add, range(len(sizes)), sizes))
+        aggregated = []
+        for counts in file_counts:
+            prefix_sums = array('q', accumulate(counts, initial=0))
+            aggregated.append(array('q', map(sub, map(prefix_sums.__getitem__, ends), prefix_sums)))
+
+        counts_tuple = (aggregated[0], aggregated[1], aggregated[2], aggregated[3])
+        return cls(names, node_types, parents, sizes, counts_tuple)
+
+
+class CompactCoverageNode(BaseCoverageNode):
+    """Read-only view of a node in a CompactCoverageTree, with the same API as CoverageNode."""
+    __slots__ = ('_tree', '_index')
+
+    def __init__(self, tree: CompactCoverageTree, index: int):
+        """Construct a CompactCoverageNode.
+
+        :param tree: Tree containing the node.
+        :param index: Index of the node in the tree.
+        """
+        self._tree = tree
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        """Get the CoverageNode name.
+
+        :return: CoverageNode name.
+        """
+        return self._tree.names[self._index]
+
+    @property
+    def node_type(self) -> CoverageNodeType:
+        """Get the CoverageNode type.
+
+        :return: CoverageNode type.
+        """
+        return _NODE_TYPES[self._tree.node_types[self._index]]
+
+    @property
+    def tree(self) -> CompactCoverageTree:
+        """Get the tree containing the node.
+
+        :return: CompactCoverageTree of the node.
+        """
+        return self._tree
+
+    @property
+    def line_coverage(self) -> Optional[LineCoverage]:
+        """Compact coverage trees do not keep per-line coverage.
+
+        :return: None.
+        """
+        return None
+
+    @property
+    def parent(self) -> Optional['CompactCoverageNode']:
+        """Get the parent of the CoverageNode.
+
+        :return: Parent CoverageNode, or None for the root of the tree.
+        """
+        parent = self._tree.parents[self._index]
+        return CompactCoverageNode(self._tree, parent) if parent >= 0 else None
+
+    def add_child(
+        self,
+        node: CoverageNode,
+        dirpath: Optional[Union[Path, str]] = None,
+        replace: bool = False,
+    ) -> None:
+        """Compact coverage trees cannot be modified.
+
+        :param node: CoverageNode to add as a child.
+        :param path: Relative path to the parent of the child to add.
+        :param replace: Whether to replace an existing child with the same name.
+        """
+        raise TypeError("Nodes of a CompactCoverageTree cannot be modified")
+
+    def set_summary(self, summary: CoverageSummary) -> None:
+        """Compact coverage trees cannot be modified.
+
+        :param summary: New summary of coverage for the node.
+        """
+        raise TypeError("Nodes of a CompactCoverageTree cannot be modified")
+
+    @property
+    def summary(self) -> CoverageSummary:
+        """Get a CoverageSummary for the node.
+
+        :return: CoverageSummary for the node.
+        """
+        tree = self._tree
+        index = self._index
+        return CoverageSummary(
+            tree.n_lines[index],
+            tree.n_lines_covered[index],
+            tree.n_branches[index],
+            tree.n_branches_covered[index],
+        )
+
+    def children(self) -> Generator['CompactCoverageNode', None, None]:
+        """Iterate over CoverageNode children."""
+        tree = self._tree
+        child = self._index + 1
+        end = self._index + tree.sizes[self._index]
+        while child < end:
+            yield CompactCoverageNode(tree, child)
+            child += tree.sizes[child]
+
+    def child(self, name: str) -> Optional['CompactCoverageNode']:
+        """Get a direct child by name, skipping over the subtrees of other children.
+
+        :param name: Name of the child.
+        :return: Child CoverageNode, or None if the node has no child with the name.
+        """
+        tree = self._tree
+        child = self._index + 1
+        end = self._index + tree.sizes[self._index]
+        while child < end:
+            if tree.names[child] == name:
+                return CompactCoverageNode(tree, child)
+            child += tree.sizes[child]
+        return None
+
+
+def _summary_counts(summary: CoverageSummary) -> Tuple[int, int, int, int]:
+    return summary.n_lines, summary.n_lines_covered, summary.n_branches, summary.n_branches_covered
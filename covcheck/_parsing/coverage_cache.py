@@ -0,0 +1,136 @@
+"""On-disk cache of parsed coverage trees."""
+
+import mmap
+import os
+
+from pathlib import Path
+from typing import Optional, Union
+
+from covcheck._parsing.compact_coverage_tree import CompactCoverageNode, CompactCoverageTree
+from covcheck._parsing.coverage_node import BaseCoverageNode
+
+_CACHE_SUFFIX = '.covtree'
+_CHUNK_SIZE = 1 << 20
+# Version of the cached parse results, to be increased whenever parsing changes the resulting trees
+_CACHE_VERSION = b'1'
+
+
+class CoverageCache:
+    """Cache of parsed coverage trees in a directory, stored in the binary format of CompactCoverageTree.
+
+    Cached trees are memory-mapped when loaded, so their arrays are not read or copied until they are used. Entries are
+    keyed by a hash of the content of the coverage file, or by its path, size and modification time. Once the total
+    size of the cache is above its limit, the least recently used entries are deleted.
+    """
+    def __init__(
+        self,
+        dirpath: Union[str, Path],
+        max_bytes: int = 512 * 1024 * 1024,
+        hash_content: bool = True,
+    ):
+        """Construct CoverageCache.
+
+        :param dirpath: Directory of the cache, which is created if needed.
+        :param max_bytes: Maximum total size of the cached trees.
+        :param hash_content: Whether to key entries by a hash of the content of coverage files, rather than by their
+            path, size and modification time, which is faster but misses copies of the same file.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"Invalid cache size ({max_bytes}). Must be at least 0.")
+
+        self.dirpath = Path(dirpath)
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+
+    @classmethod
+    def default_dirpath(cls) -> Path:
+        """Get the default cache directory, in $XDG_CACHE_HOME or ~/.cache.
+
+        :return: Default cache directory.
+        """
+        cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        return Path(cache_home) / 'covcheck'
+
+    def key(self, filepath: Union[str, Path], trust_header: bool = False) -> str:
+        """Get the cache key of a coverage file.
+
+        :param filepath: Path on disk to an XML coverage file.
+        :param trust_header: Whether the tree is parsed from the aggregate attributes of <class> elements.
+        :return: Cache key.
+        """
+        import hashlib  # pylint: disable=import-outside-toplevel
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(_CACHE_VERSION + (b'trust' if trust_header else b'count'))
+        if self.hash_content:
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        else:
+            stat = os.stat(filepath)
+            digest.update(f'{Path(filepath).resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[CompactCoverageTree]:
+        """Load a cached tree.
+
+        :param key: Cache key of the coverage file.
+        :return: Memory-mapped CompactCoverageTree, or None if the tree is not cached or the entry is invalid.
+        """
+        filepath = self._entry_filepath(key)
+        try:
+            with open(filepath, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            tree = CompactCoverageTree.from_buffer(buffer)
+            # Mark the entry as recently used for eviction
+            os.utime(filepath)
+        except (OSError, ValueError):
+            return None
+        return tree
+
+    def store(self, key: str, node: BaseCoverageNode) -> None:
+        """Store a tree in the cache, then evict the least recently used entries if the cache is above its size limit.
+
+        Failures to write the cache, such as a read-only directory, are ignored.
+
+        :param key: Cache key of the coverage file.
+        :param node: Root of the coverage tree.
+        """
+        tree = node.tree if isinstance(node, CompactCoverageNode) else CompactCoverageTree.from_node(node)
+        temp_filepath: Optional[str] = None
+        try:
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent runs never load a partially written entry
+            import tempfile  # pylint: disable=import-outside-toplevel
+            with tempfile.NamedTemporaryFile('wb', dir=self.dirpath, suffix='.tmp', delete=False) as f:
+                temp_filepath = f.name
+                tree.write(f)
+            os.replace(temp_filepath, self._entry_filepath(key))
+        except OSError:
+            if temp_filepath is not None and os.path.exists(temp_filepath):
+                os.unlink(temp_filepath)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the total size of the cache is within its limit."""
+        try:
+            entries = []
+            for filepath in self.dirpath.glob(f'*{_CACHE_SUFFIX}'):
+                stat = filepath.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, filepath))
+        except OSError:
+            return
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, filepath in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                filepath.unlink()
+            except OSError:
+                continue
+            total_bytes -= size
+
+    def _entry_filepath(self, key: str) -> Path:
+        return self.dirpath / f'{key}{_CACHE_SUFFIX}'
@@ -0,0 +1,254 @@
+"""Reader for the SQLite data files of coverage.py."""
+
+import os
+
+from collections import Counter, defaultdict
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_reader import CoverageReader, FileNode
+from covcheck._parsing.line_coverage import LineCoverage
+
+if TYPE_CHECKING:
+    import coverage
+
+COVERAGE_INSTALLED = find_spec('coverage') is not None
+
+# Header of SQLite database files
+_SQLITE_MAGIC = b'SQLite format 3\0'
+
+# Number of rows fetched from the data file at a time
+_BATCH_SIZE = 65536
+
+# Line numbers a transition between lines of a file starts and ends at, negative for entering or exiting code objects
+_Arc = Tuple[int, int]
+
+# Measured paths, the file tracer plugin of each path measured by one, and executed line bitmaps or arcs of each path,
+# as recorded in a data file
+_ExecutedData = Tuple[List[str], Dict[str, str], Dict[str, int], Optional[Dict[str, Set[_Arc]]]]
+
+
+class CoverageDBReader(CoverageReader):
+    """Reader of the .coverage data files of coverage.py into a covcheck tree.
+
+    The lines and arcs executed in every file are read with a single query over each table, and the numbits blobs of
+    lines are decoded straight into line bitmaps, one integer per blob. The data file is only read once, by those
+    queries, and is never loaded by coverage.py itself. Data files only record what was executed, so the statements
+    and branches of each file are found by analyzing its source with the file reporter of coverage.py, through the
+    FileReporter interface it documents for plugins, in the same way as `coverage xml`. For files measured by the
+    Python tracer, the tree is identical to parsing the report written by `coverage xml`, without writing the report
+    and parsing it back.
+
+    Files measured by file tracer plugins, such as those of Cython or Django templates, are not supported, since
+    their reporters come from the plugin.
+    """
+    name = 'coverage-db'
+
+    @classmethod
+    def sniff(cls, head: bytes) -> bool:
+        return head.startswith(_SQLITE_MAGIC)
+
+    @classmethod
+    def read(cls, filepath: Union[str, Path], compact: bool = False, keep_lines: bool = False) -> BaseCoverageNode:
+        """Read a coverage.py data file into a covcheck tree.
+
+        :param filepath: Path on disk to an uncompressed .coverage data file. The source files it measured must be
+            present at the paths recorded in it. Configuration is read from the current directory, as `coverage xml`
+            would, for the exclusion patterns, include and omit patterns, source directories and skip_empty.
+        :param compact: Whether to store the tree in a CompactCoverageTree.
+        :param keep_lines: Whether to keep the per-line coverage of each file as the LineCoverage of its node.
+        """
+        if not COVERAGE_INSTALLED:
+            raise ImportError("Reading coverage.py data files requires the coverage package. "
+                              "Please 'pip install coverage'.")
+        import coverage  # pylint: disable=import-outside-toplevel,redefined-outer-name
+        if compact and keep_lines:
+            raise ValueError("Compact trees do not keep per-line coverage")
+        if not Path(filepath).is_file():
+            raise ValueError(f"Coverage data file {filepath} does not exist")
+
+        paths, tracers, executed_lines, executed_arcs = cls._read_executed(filepath)
+
+        # The Coverage object only provides configuration to the file reporters, so rather than loading the data file
+        # again, it is initialized by a public method that reads no data, which also sets the directory files are named
+        # relative to
+        cov = coverage.Coverage(data_file=str(filepath))
+        cov.get_exclude_list()
+        file_nodes = cls._iter_file_nodes(cov, paths, tracers, executed_lines, executed_arcs, keep_lines)
+
+        return cls._build_tree(file_nodes, compact=compact)
+
+    @classmethod
+    def _read_executed(cls, filepath: Union[str, Path]) -> _ExecutedData:
+        """Read the executed lines or arcs of every file, merged across contexts.
+
+        :return: Paths of the measured files as recorded in the data file, the plugin of each file measured by a file
+            tracer plugin, the bitmap of executed line numbers of each file if the data file records lines, and the
+            executed arcs of each file if it records arcs instead.
+        """
+        import sqlite3  # pylint: disable=import-outside-toplevel
+
+        try:
+            connection = sqlite3.connect(f'{Path(filepath).resolve().as_uri()}?mode=ro', uri=True)
+        except sqlite3.Error as e:
+            raise ValueError(f"Could not read coverage data file {filepath}: {e}") from e
+
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'has_arcs'").fetchone()
+            paths = dict(connection.execute("SELECT id, path FROM file").fetchall())
+            tracers = {
+                paths[file_id]: tracer
+                for file_id, tracer in connection.execute("SELECT file_id, tracer FROM tracer WHERE tracer != ''")
+            }
+
+            executed_lines: Dict[str, int] = defaultdict(int)
+            if row is not None and bool(int(row[0])):
+                executed_arcs: Dict[str, Set[_Arc]] = defaultdict(set)
+                cursor = connection.execute("SELECT DISTINCT file_id, fromno, tono FROM arc")
+                for rows in iter(lambda: cursor.fetchmany(_BATCH_SIZE), []):
+                    for file_id, fromno, tono in rows:
+                        executed_arcs[paths[file_id]].add((fromno, tono))
+                return list(paths.values()), tracers, executed_lines, executed_arcs
+
+            # Bit n of a numbits blob is set for line number n, which is the layout of the line bitmaps of
+            # LineCoverage, so each blob is decoded in one step and contexts are merged with a bitwise or
+            cursor = connection.execute("SELECT file_id, numbits FROM line_bits")
+            for rows in iter(lambda: cursor.fetchmany(_BATCH_SIZE), []):
+                for file_id, numbits in rows:
+                    executed_lines[paths[file_id]] |= int.from_bytes(numbits, 'little')
+            return list(paths.values()), tracers, executed_lines, None
+        except sqlite3.Error as e:
+            raise ValueError(f"Could not read coverage data file {filepath}: {e}") from e
+        finally:
+            connection.close()
+
+    @classmethod
+    def _iter_file_nodes(  # pylint: disable=too-many-arguments,too-many-locals
+        cls,
+        cov: 'coverage.Coverage',
+        paths: List[str],
+        tracers: Dict[str, str],
+        executed_lines: Dict[str, int],
+        executed_arcs: Optional[Dict[str, Set[_Arc]]],
+        keep_lines: bool,
+    ) -> Iterator[FileNode]:
+        """Analyze each measured file, in the order of the classes of the report written by `coverage xml`."""
+        # pylint: disable=import-outside-toplevel
+        from coverage.exceptions import CoverageException
+        from coverage.files import GlobMatcher, prep_patterns
+        from coverage.misc import human_sorted_items
+        from coverage.python import PythonFileReporter
+
+        config = cov.config
+        paths = sorted(paths)
+        if config.report_include:
+            include_matcher = GlobMatcher(prep_patterns(config.report_include), 'report_include')
+            paths = [path for path in paths if include_matcher.match(path)]
+        if config.report_omit:
+            omit_matcher = GlobMatcher(prep_patterns(config.report_omit), 'report_omit')
+            paths = [path for path in paths if not omit_matcher.match(path)]
+
+        for path in paths:
+            plugin = tracers.get(path)
+            if plugin is not None:
+                raise ValueError(f"{path} was measured by the coverage.py plugin {plugin}, which is not supported. "
+                                 "Please run 'coverage xml' and check its report instead.")
+
+        source_paths = cls._source_paths(config)
+        packages: Dict[str, Dict[str, FileNode]] = defaultdict(dict)
+        for path in paths:
+            reporter = PythonFileReporter(path, coverage=cov)
+            try:
+                if executed_arcs is None:
+                    line_coverage = cls._analyze_lines(reporter, LineCoverage(executed_lines[path]).line_numbers)
+                else:
+                    line_coverage = cls._analyze_arcs(reporter, executed_arcs[path])
+            except (CoverageException, OSError) as e:
+                if config.ignore_errors:
+                    continue
+                raise ValueError(f"Could not analyze {path}: {e}") from e
+            if config.skip_empty and line_coverage.lines == 0:
+                continue
+
+            rel_name = cls._relative_name(reporter, source_paths)
+            dirname = '/'.join((os.path.dirname(rel_name) or '.').split('/')[:config.xml_package_depth])
+            code_dirpath = cls._parent_dirpath(rel_name)
+            code_filename = os.path.basename(rel_name)
+            if keep_lines:
+                node = CoverageNode(code_filename, node_type=CoverageNodeType.FILE, line_coverage=line_coverage)
+            else:
+                node = CoverageNode(code_filename, node_type=CoverageNodeType.FILE, summary=line_coverage.summary)
+            packages[dirname.replace('/', '.')][rel_name] = code_dirpath, node
+
+        for _, package in human_sorted_items(packages.items()):
+            for _, file_node in human_sorted_items(package.items()):
+                yield file_node
+
+    @classmethod
+    def _analyze_lines(cls, reporter: Any, executed_lines: Iterable[int]) -> LineCoverage:
+        """Get the per-line coverage of a file from its executed lines, in the same way as coverage.py."""
+        statements = reporter.lines()
+        return LineCoverage.from_lines(statements, reporter.translate_lines(executed_lines) & statements)
+
+    @classmethod
+    def _analyze_arcs(cls, reporter: Any, executed_arcs: Set[_Arc]) -> LineCoverage:
+        """Get the per-line coverage of a file from its executed arcs, in the same way as coverage.py."""
+        statements = reporter.lines()
+        executed_lines = {line for arc in executed_arcs for line in arc if line > 0}
+        executed = reporter.translate_lines(executed_lines) & statements
+
+        possible_arcs = reporter.arcs()
+        destinations = defaultdict(set)
+        for fromno, tono in possible_arcs:
+            destinations[fromno].add(tono)
+        single_destinations = {fromno: next(iter(tonos)) for fromno, tonos in destinations.items() if len(tonos) == 1}
+        arcs = set()
+        for fromno, tono in reporter.translate_arcs(executed_arcs):
+            if fromno != tono:
+                arcs.add((fromno, tono))
+            elif fromno in single_destinations:
+                arcs.add((fromno, single_destinations[fromno]))
+        arcs = reporter.translate_arcs(arcs)
+
+        no_branch = reporter.no_branch_lines()
+        excluded = reporter.excluded_lines()
+        missing = Counter(
+            fromno for fromno, tono in possible_arcs
+            if (fromno, tono) not in arcs and fromno not in no_branch and tono not in excluded
+        )
+        branches = [
+            (line, n_exits - missing[line], n_exits) for line, n_exits in reporter.exit_counts().items()
+            if n_exits > 1 and line in statements
+        ]
+        return LineCoverage.from_lines(statements, executed, branches)
+
+    @classmethod
+    def _source_paths(cls, config: Any) -> Set[str]:
+        """Get the configured source directories which files are named relative to."""
+        from coverage.files import canonical_filename  # pylint: disable=import-outside-toplevel
+
+        source_paths = set()
+        for source in config.source or []:
+            if os.path.exists(source):
+                if not config.relative_files:
+                    source = canonical_filename(source)
+                source_paths.add(source.rstrip('\\/').replace('\\', '/'))
+        return source_paths
+
+    @classmethod
+    def _relative_name(cls, reporter: Any, source_paths: Set[str]) -> str:
+        """Get the path of a file in the tree, relative to its source directory or to the current directory.
+
+        The source directory of each file is remembered for the files after it, as `coverage xml` does.
+        """
+        filename = reporter.filename.replace('\\', '/')
+        for source_path in source_paths:
+            if filename.startswith(source_path + '/'):
+                return filename[len(source_path) + 1:]
+
+        rel_name = reporter.relative_filename().replace('\\', '/')
+        source_paths.add(reporter.filename[:-len(rel_name)].rstrip('\\/').replace('\\', '/'))
+        return rel_name
@@ -0,0 +1,253 @@
+"""Comparison of coverage trees with a baseline."""
+
+import json
+
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_summary import CoverageSummary
+
+# Content hash of a directory, or key of a file, with the hashes of its child directories and keys of its child files
+# by name
+_HashTree = Tuple[bytes, Dict[str, '_HashTree'], Dict[str, bytes]]
+
+_DIGEST_SIZE = 16
+
+
+class CoverageChange:
+    """Change in the coverage of a file or directory between a baseline and a current coverage tree."""
+    __slots__ = ('path', 'node_type', 'baseline', 'current')
+
+    def __init__(
+        self,
+        path: str,
+        node_type: CoverageNodeType,
+        baseline: Optional[CoverageSummary],
+        current: Optional[CoverageSummary],
+    ):
+        """Construct CoverageChange.
+
+        :param path: Path of the node relative to the root of the trees, with '' for the root.
+        :param node_type: Type of the node, in the current tree if it is in both trees.
+        :param baseline: CoverageSummary of the node in the baseline, or None if the node was added.
+        :param current: CoverageSummary of the node in the current tree, or None if the node was removed.
+        """
+        self.path = path
+        self.node_type = node_type
+        self.baseline = baseline
+        self.current = current
+
+    def regressed(self, tolerance: float = 0.0) -> bool:
+        """Get whether the line or branch coverage of the node dropped from the baseline.
+
+        Added and removed nodes never regress, and neither do rates of nodes which no longer have lines or branches.
+
+        :param tolerance: Drop in percentage points allowed before the coverage is considered to have regressed.
+        """
+        if self.baseline is None or self.current is None:
+            return False
+        baseline, current = self.baseline, self.current
+        lines_dropped = _rate_dropped(baseline.n_lines, baseline.n_lines_covered, current.n_lines,
+                                      current.n_lines_covered, tolerance)
+        branches_dropped = _rate_dropped(baseline.n_branches, baseline.n_branches_covered, current.n_branches,
+                                         current.n_branches_covered, tolerance)
+        return lines_dropped or branches_dropped
+
+    def describe(self) -> str:
+        """Describe the change, such as "src/main.py: line coverage 80.00% -> 75.00%"."""
+        location = self.path + ('/' if self.node_type == CoverageNodeType.DIR else '') if self.path else '.'
+        if self.baseline is None:
+            return f"{location}: added"
+        if self.current is None:
+            return f"{location}: removed"
+        baseline, current = self.baseline, self.current
+        changes = []
+        if (baseline.n_lines, baseline.n_lines_covered) != (current.n_lines, current.n_lines_covered):
+            changes.append(f"line coverage {baseline.line_rate * 100:.2f}% -> {current.line_rate * 100:.2f}%")
+        if (baseline.n_branches, baseline.n_branches_covered) != (current.n_branches, current.n_branches_covered):
+            changes.append(f"branch coverage {baseline.branch_rate * 100:.2f}% -> {current.branch_rate * 100:.2f}%")
+        return f"{location}: {', '.join(changes)}"
+
+
+class CoverageDiff:
+    """Comparison of a coverage tree with a baseline, such as the JSON output of a previous run.
+
+    Each subtree is hashed from the names and summaries of its files, so subtrees with the same hash in both trees are
+    skipped without visiting their nodes. Once the trees are hashed, the cost of the comparison depends on the number
+    of changed files rather than on the size of the trees.
+    """
+    @classmethod
+    def compare(cls, baseline: BaseCoverageNode, current: BaseCoverageNode) -> List[CoverageChange]:
+        """Find the files and directories whose coverage changed from a baseline.
+
+        :param baseline: Root of the baseline coverage tree.
+        :param current: Root of the current coverage tree.
+        :return: CoverageChange of each changed, added and removed node, ordered by path. Nodes within added and
+            removed directories are not listed.
+        """
+        return cls._diff(baseline, cls._hash_tree(baseline), current, cls._hash_tree(current))
+
+    @classmethod
+    def _diff(
+        cls,
+        baseline: BaseCoverageNode,
+        baseline_hashes: _HashTree,
+        current: BaseCoverageNode,
+        current_hashes: _HashTree,
+    ) -> List[CoverageChange]:
+        """Find the changes between two hashed trees, descending only into directories whose hashes differ."""
+        changes: List[CoverageChange] = []
+        stack = [('', baseline, baseline_hashes, current, current_hashes)]
+        while stack:
+            path, baseline_node, baseline_hashes, current_node, current_hashes = stack.pop()
+            if baseline_hashes[0] == current_hashes[0]:
+                continue
+            if _counts(baseline_node.summary) != _counts(current_node.summary):
+                changes.append(CoverageChange(path, current_node.node_type, baseline_node.summary,
+                                              current_node.summary))
+            prefix = f'{path}/' if path else ''
+
+            # Only the nodes of changed files are looked up
+            baseline_files, current_files = baseline_hashes[2], current_hashes[2]
+            for name, key in current_files.items():
+                if baseline_files.get(name) != key:
+                    baseline_summary = _child_summary(baseline_node, name) if name in baseline_files else None
+                    changes.append(CoverageChange(prefix + name, CoverageNodeType.FILE, baseline_summary,
+                                                  _child_summary(current_node, name)))
+            for name in baseline_files.keys() - current_files.keys():
+                changes.append(CoverageChange(prefix + name, CoverageNodeType.FILE,
+                                              _child_summary(baseline_node, name), None))
+
+            baseline_directories, current_directories = baseline_hashes[1], current_hashes[1]
+            for name, child_hashes in current_directories.items():
+                baseline_child_hashes = baseline_directories.get(name)
+                if baseline_child_hashes is None:
+                    changes.append(CoverageChange(prefix + name, CoverageNodeType.DIR, None,
+                                                  _child_summary(current_node, name)))
+                    continue
+                baseline_child, current_child = baseline_node.child(name), current_node.child(name)
+                if baseline_child_hashes[0] == child_hashes[0] or baseline_child is None or current_child is None:
+                    continue
+                stack.append((prefix + name, baseline_child, baseline_child_hashes, current_child, child_hashes))
+            for name in baseline_directories.keys() - current_directories.keys():
+                changes.append(CoverageChange(prefix + name, CoverageNodeType.DIR,
+                                              _child_summary(baseline_node, name), None))
+
+        return sorted(changes, key=lambda change: change.path)
+
+    @classmethod
+    def read_output(cls, filepath: Union[str, Path]) -> CoverageNode:
+        """Read a coverage tree from a JSON output file of covcheck, in any output format.
+
+        :param filepath: Path on disk to a file written with --output.
+        :return: Root of the coverage tree.
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                first_line = f.readline()
+                try:
+                    first_object: Optional[Dict[str, Any]] = json.loads(first_line)
+                except json.JSONDecodeError:
+                    first_object = None
+                if first_object is not None and 'path' in first_object:
+                    return cls._read_ndjson(first_object, f)
+                if first_object is not None and f.readline() == '':
+                    return CoverageNode.deserialize(first_object)
+                f.seek(0)
+                return CoverageNode.deserialize(json.load(f))
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Could not read covcheck output {filepath}: {e!r}") from e
+
+    @classmethod
+    def _read_ndjson(cls, first_object: Dict[str, Any], f: IO[str]) -> CoverageNode:
+        """Build a coverage tree from the objects of an 'ndjson' output file, one per node in depth-first pre-order."""
+        file_nodes: List[Tuple[Optional[str], CoverageNode]] = []
+        root_name = first_object['name']
+        row: Optional[Dict[str, Any]] = first_object
+        while row is not None:
+            if row['node_type'] == CoverageNodeType.FILE.value:
+                summary = CoverageSummary(row['n_lines'], row['n_lines_covered'], row['n_branches'],
+                                          row['n_branches_covered'])
+                node = CoverageNode(row['name'], node_type=CoverageNodeType.FILE, summary=summary)
+                if row['parent'] is None:
+                    return node
+                file_nodes.append((row['parent'] or None, node))
+            line = f.readline()
+            row = json.loads(line) if line.strip() else None
+        return CoverageNode.from_paths(file_nodes, name=root_name)
+
+    @classmethod
+    def _hash_tree(cls, root: BaseCoverageNode) -> _HashTree:
+        """Hash each subtree of a tree from the names and summaries of its files and directories.
+
+        Files are keyed by their name and counts, which are cheaper to compare than to hash, and each directory is
+        hashed from its name and the keys and hashes of its children in order of name, so that the hash does not
+        depend on the order files were added. Directories are hashed after their children, with an explicit stack so
+        that deep trees do not hit the recursion limit.
+        """
+        # Only imported when trees are compared, as hashlib takes a while to import
+        from hashlib import blake2b  # pylint: disable=import-outside-toplevel
+
+        if root.node_type != CoverageNodeType.DIR:
+            return _file_key(root), {}, {}
+
+        # Directories to hash, with their children and number of child directories once those are pushed, and the
+        # hashes of finished directories by name
+        stack: List[Tuple[BaseCoverageNode, Optional[List[BaseCoverageNode]], int]] = [(root, None, 0)]
+        hashed: List[Tuple[str, _HashTree]] = []
+        while stack:
+            node, children, n_directories = stack.pop()
+            if children is None:
+                children = list(node.children())
+                directories = [child for child in children if child.node_type == CoverageNodeType.DIR]
+                stack.append((node, children, len(directories)))
+                stack.extend((directory, None, 0) for directory in directories)
+                continue
+
+            directory_hashes: Dict[str, _HashTree] = {}
+            if n_directories > 0:
+                directory_hashes.update(hashed[-n_directories:])
+                del hashed[-n_directories:]
+            file_keys = {child.name: _file_key(child) for child in children
+                         if child.node_type != CoverageNodeType.DIR}
+
+            parts = [node.name.encode('utf-8')]
+            parts.extend(file_keys[name] for name in sorted(file_keys))
+            parts.extend(directory_hashes[name][0] for name in sorted(directory_hashes))
+            digest = blake2b(b'\0'.join(parts), digest_size=_DIGEST_SIZE).digest()
+            hashed.append((node.name, (digest, directory_hashes, file_keys)))
+
+        return hashed[0][1]
+
+
+def _file_key(node: BaseCoverageNode) -> bytes:
+    """Get the key of a file node in the hash of its directory, from its name and counts."""
+    summary = node.summary
+    return (f"{node.name}\0{summary.n_lines},{summary.n_lines_covered},{summary.n_branches},"
+            f"{summary.n_branches_covered}").encode('utf-8')
+
+
+def _child_summary(node: BaseCoverageNode, name: str) -> Optional[CoverageSummary]:
+    """Get the summary of a child of a node, or None if the node has no child with the name."""
+    child = node.child(name)
+    return child.summary if child is not None else None
+
+
+def _counts(summary: CoverageSummary) -> Tuple[int, int, int, int]:
+    """Get the counts of a summary, to compare summaries by value."""
+    return summary.n_lines, summary.n_lines_covered, summary.n_branches, summary.n_branches_covered
+
+
+def _rate_dropped(baseline_total: int, baseline_covered: int, current_total: int, current_covered: int,
+                  tolerance: float) -> bool:
+    """Get whether a coverage rate dropped by more than a tolerance in percentage points.
+
+    Rates are compared by cross-multiplying their counts, so that a drop of exactly the tolerance is not a regression
+    because of rounding. Rates of nodes without lines or branches do not drop.
+    """
+    if current_total == 0:
+        return False
+    return 100 * (baseline_covered * current_total - current_covered * baseline_total) > (
+        tolerance * baseline_total * current_total)
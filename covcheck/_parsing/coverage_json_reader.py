@@ -0,0 +1,178 @@
+"""Reader for the JSON reports of coverage.py."""
+
+import codecs
+import json
+
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterator, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_reader import CoverageReader, FileNode
+from covcheck._parsing.coverage_source import BinaryReader, CoverageSource
+from covcheck._parsing.coverage_summary import CoverageSummary
+from covcheck._parsing.line_coverage import LineCoverage
+
+_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+
+class CoverageJSONReader(CoverageReader):
+    """Reader of the JSON reports written by `coverage json`.
+
+    The report is decoded one entry of its "files" object at a time, so it is never held in memory as a whole, and
+    each file is added to the tree once its entry is decoded. The tree is the same as parsing the XML report of the
+    same coverage data, except for the order of files, which is that of the report.
+    """
+    name = 'json'
+
+    @classmethod
+    def sniff(cls, head: bytes) -> bool:
+        return head.lstrip(b'\xef\xbb\xbf').lstrip().startswith(b'{')
+
+    @classmethod
+    def read(cls, filepath: Union[str, Path], compact: bool = False, keep_lines: bool = False) -> BaseCoverageNode:
+        """Read a coverage.py JSON report into a covcheck tree.
+
+        :param filepath: Path on disk to a JSON report, which may be compressed with gzip or zstd, or '-' for stdin.
+        :param compact: Whether to store the tree in a CompactCoverageTree.
+        :param keep_lines: Whether to keep the per-line coverage of each file as the LineCoverage of its node.
+        """
+        if compact and keep_lines:
+            raise ValueError("Compact trees do not keep per-line coverage")
+
+        with CoverageSource.open(filepath) as f:
+            file_nodes = (cls._file_node(path, entry, keep_lines) for path, entry in cls._iter_files(f))
+            return cls._build_tree(file_nodes, compact=compact)
+
+    @classmethod
+    def _iter_files(cls, f: BinaryReader) -> Iterator[Tuple[str, Any]]:
+        """Decode the path and entry of each file in the "files" object of a report, skipping other attributes."""
+        stream = _JSONStream(f)
+        files_seen = False
+        stream.expect('{')
+        while stream.peek() != '}':
+            key = stream.decode()
+            stream.expect(':')
+            if key == 'files' and not files_seen:
+                files_seen = True
+                stream.expect('{')
+                while stream.peek() != '}':
+                    path = stream.decode()
+                    stream.expect(':')
+                    yield path, stream.decode()
+                    if not stream.next_item():
+                        break
+                stream.expect('}')
+            else:
+                stream.decode()
+            if not stream.next_item():
+                break
+        stream.expect('}')
+
+        if not files_seen:
+            raise ValueError("Could not parse coverage JSON, no attribute 'files'")
+
+    @classmethod
+    def _file_node(cls, path: str, entry: Any, keep_lines: bool) -> FileNode:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Could not parse coverage JSON, invalid entry of {path}")
+        for attribute in ('executed_lines', 'missing_lines'):
+            if attribute not in entry:
+                raise ValueError(f"Could not parse coverage JSON, no attribute '{attribute}' in entry of {path}")
+
+        executed_lines = entry['executed_lines']
+        missing_lines = entry['missing_lines']
+        # Branches are listed as [from line, to line] pairs, from lines with several possible destinations
+        executed_branches = entry.get('executed_branches', [])
+        missing_branches = entry.get('missing_branches', [])
+
+        summary = CoverageSummary(
+            len(executed_lines) + len(missing_lines),
+            len(executed_lines),
+            len(executed_branches) + len(missing_branches),
+            len(executed_branches),
+        )
+        line_coverage = None
+        if keep_lines:
+            branches_covered = Counter(line for line, _ in executed_branches)
+            branches_total = branches_covered + Counter(line for line, _ in missing_branches)
+            line_coverage = LineCoverage.from_lines(
+                executed_lines + missing_lines,
+                executed_lines,
+                ((line, branches_covered[line], total) for line, total in branches_total.items()),
+            )
+
+        node = CoverageNode(
+            Path(path).name,
+            node_type=CoverageNodeType.FILE,
+            summary=summary,
+            line_coverage=line_coverage,
+        )
+        return cls._parent_dirpath(path), node
+
+
+class _JSONStream:
+    """JSON document decoded incrementally from a binary file, a value at a time."""
+    def __init__(self, f: BinaryReader):
+        self._file = f
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._buffer = ''
+        self._position = 0
+        self._end_of_file = False
+
+    def peek(self) -> str:
+        """Get the next character other than whitespace without consuming it, or '' at the end of the file."""
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer) or not self._fill(_CHUNK_SIZE):
+                return self._buffer[self._position:self._position + 1]
+
+    def expect(self, character: str) -> None:
+        """Consume a structural character, such as '{' or ':'."""
+        if self.peek() != character:
+            raise ValueError(f"Could not parse coverage JSON, expected '{character}'")
+        self._position += 1
+
+    def next_item(self) -> bool:
+        """Consume the comma before the next item of an object, and get whether there is a next item."""
+        if self.peek() != ',':
+            return False
+        self._position += 1
+        return True
+
+    def decode(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as e:
+                if self._end_of_file:
+                    raise ValueError(f"Could not parse coverage JSON, {e}") from e
+            else:
+                # A number at the end of the buffer may continue in the rest of the file
+                if end < len(self._buffer) or self._end_of_file:
+                    self._position = end
+                    return value
+            # Values larger than the buffer are retried with twice as much data each time
+            self._fill(size)
+            size *= 2
+
+    def _fill(self, size: int) -> bool:
+        """Read more of the file into the buffer, dropping the consumed text.
+
+        :return: Whether any data was read.
+        """
+        if self._end_of_file:
+            return False
+        data = self._file.read(size)
+        self._end_of_file = not data
+        self._buffer = self._buffer[self._position:] + self._text_decoder.decode(data, final=not data)
+        self._position = 0
+        return bool(data)
@@ -1,87 +1,94 @@
 """Coverage node."""
 
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Generator, Optional, Union
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple, Union
 
 from covcheck._parsing.coverage_summary import CoverageSummary
 from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.line_coverage import LineCoverage
 
 
-class CoverageNode:
-    """Coverage node."""
-    def __init__(self, name: str, node_type: CoverageNodeType, summary: Optional[CoverageSummary] = None):
-        """Construct CoverageNode.
+class BaseCoverageNode(ABC):
+    """Base class of coverage nodes, implementing the read-only API on top of the accessors of each kind of node.
 
-        :param name: Name of the coverage node.
-        :param node_type: Type of the coverage node.
-        :param summary: Summary of coverage for the node.
-        """
-        self._name = name
-        self._node_type = node_type
-        self._summary = summary
-        self._children = {}  # type: Dict[str, CoverageNode]
+    The base class holds no fields, so that nodes which store their data elsewhere, such as the views of
+    CompactCoverageNode, do not carry the fields of CoverageNode.
+    """
+    __slots__ = ()
 
     @property
+    @abstractmethod
     def name(self) -> str:
         """Get the CoverageNode name.
 
         :return: CoverageNode name.
         """
-        return self._name
 
     @property
+    @abstractmethod
     def node_type(self) -> CoverageNodeType:
         """Get the CoverageNode type.
 
         :return: CoverageNode type.
         """
-        return self._node_type
 
-    def add_child(self, node: 'CoverageNode', dirpath: Optional[Union[Path, str]] = None) -> None:
-        """Add a child node to the current node's children.
+    @property
+    @abstractmethod
+    def line_coverage(self) -> Optional[LineCoverage]:
+        """Get the per-line coverage of a file node.
 
-        :param node: CoverageNode to add as a child.
-        :param path: Relative path to the parent of the child to add.
+        :return: LineCoverage of the node, or None if per-line coverage was not kept.
         """
-        self._summary = None
 
-        if dirpath is None:
-            if node.name in self._children:
-                raise ValueError(f"A node with the name {node.name} was already added as a child")
-            self._children[node.name] = node
-            return
-
-        path = Path(dirpath)
-
-        if len(path.parts) == 0:
-            raise ValueError(f"Invalid child dirpath: '{path}'")
-
-        directory_name = path.parts[0]
-        remaining_path = Path(*path.parts[1:]) if len(path.parts) > 1 else None
-
-        if directory_name not in self._children:
-            directory_node = CoverageNode(directory_name, node_type=CoverageNodeType.DIR)
-            self._children[directory_name] = directory_node
+    @property
+    @abstractmethod
+    def parent(self) -> Optional['BaseCoverageNode']:
+        """Get the parent of the CoverageNode.
 
-        self._children[directory_name].add_child(node, dirpath=remaining_path)
+        :return: Parent CoverageNode, or None for the root of a tree.
+        """
 
     @property
+    @abstractmethod
     def summary(self) -> CoverageSummary:
         """Get a CoverageSummary for the node.
 
         :return: CoverageSummary for the node.
         """
-        if self._summary is not None:
-            return self._summary
 
-        summary = CoverageSummary(0, 0, 0, 0)
-        for child in self.children():
-            summary.n_lines += child.summary.n_lines
-            summary.n_lines_covered += child.summary.n_lines_covered
-            summary.n_branches += child.summary.n_branches
-            summary.n_branches_covered += child.summary.n_branches_covered
-        self._summary = summary
-        return self._summary
+    @abstractmethod
+    def add_child(
+        self,
+        node: 'CoverageNode',
+        dirpath: Optional[Union[Path, str]] = None,
+        replace: bool = False,
+    ) -> None:
+        """Add a child node to the current node's children.
+
+        :param node: CoverageNode to add as a child.
+        :param path: Relative path to the parent of the child to add.
+        :param replace: Whether to replace an existing child with the same name, rather than raising an error.
+        """
+
+    @abstractmethod
+    def set_summary(self, summary: CoverageSummary) -> None:
+        """Set the CoverageSummary of a node without children.
+
+        :param summary: New summary of coverage for the node.
+        """
+
+    @abstractmethod
+    def children(self) -> Generator['BaseCoverageNode', None, None]:
+        """Iterate over CoverageNode children."""
+
+    @abstractmethod
+    def child(self, name: str) -> Optional['BaseCoverageNode']:
+        """Get a direct child by name.
+
+        :param name: Name of the child.
+        :return: Child CoverageNode, or None if the node has no child with the name.
+        """
 
     def serialize(self) -> Dict[str, Any]:
         """Serialize a tree of CoverageNodes to a tree of Python dictionaries.
@@ -105,7 +112,318 @@ class CoverageNode:
         }
         return node
 
+    def walk(self) -> Generator[Tuple[str, 'BaseCoverageNode'], None, None]:
+        """Iterate over the node and its descendants in depth-first pre-order, without recursion.
+
+        :return: Generator of the path of each node relative to this node, with '' for this node, and the node.
+        """
+        stack: List[Tuple[str, BaseCoverageNode]] = [('', self)]
+        while stack:
+            path, node = stack.pop()
+            yield path, node
+            children = list(node.children())
+            stack.extend((f'{path}/{child.name}' if path else child.name, child) for child in reversed(children))
+
+    def find(self, path: Union[Path, str]) -> Optional['BaseCoverageNode']:
+        """Get a descendant by its path relative to the node, looking up one child per path component.
+
+        :param path: Relative path to the descendant, such as 'covcheck/_cli/main.py'.
+        :return: Descendant CoverageNode, or None if the node has no descendant at the path.
+        """
+        node: Optional[BaseCoverageNode] = self
+        for name in Path(path).parts:
+            if node is None:
+                break
+            node = node.child(name)
+        return node
+
+
+class CoverageNode(BaseCoverageNode):
+    """Coverage node."""
+    __slots__ = ('_name', '_node_type', '_summary', '_children', '_parent', '_line_coverage')
+
+    def __init__(
+        self,
+        name: str,
+        node_type: CoverageNodeType,
+        summary: Optional[CoverageSummary] = None,
+        line_coverage: Optional[LineCoverage] = None,
+    ):
+        """Construct CoverageNode.
+
+        The summary of a node with children is kept up to date with the aggregated summaries of its children as
+        children are added and replaced, so it is never recomputed.
+
+        :param name: Name of the coverage node.
+        :param node_type: Type of the coverage node.
+        :param summary: Summary of coverage for the node, used while the node has no children. Defaults to the summary
+            of line_coverage if it is given.
+        :param line_coverage: Per-line coverage of a file node.
+        """
+        if summary is None and line_coverage is not None:
+            summary = line_coverage.summary
+
+        self._name = name
+        self._node_type = node_type
+        self._summary = summary if summary is not None else CoverageSummary(0, 0, 0, 0)
+        self._children = {}  # type: Dict[str, CoverageNode]
+        self._parent = None  # type: Optional[CoverageNode]
+        self._line_coverage = line_coverage
+
+    @classmethod
+    def from_paths(
+        cls,
+        file_nodes: Iterable[Tuple[Optional[Union[Path, str]], 'CoverageNode']],
+        name: str = 'root',
+    ) -> 'CoverageNode':
+        """Build a tree from file nodes in bulk.
+
+        The tree is the same as adding each file node to a new directory node with add_child, in order. Directory
+        nodes are looked up by their path, rather than one path component at a time, and summaries are aggregated
+        once all file nodes are added rather than pushed up to the root on every insertion.
+
+        :param file_nodes: File nodes and the paths of their parent directories, relative to the root of the tree.
+        :param name: Name of the root node.
+        :return: Root directory node.
+        """
+        # pylint: disable=protected-access
+        root = cls(name, node_type=CoverageNodeType.DIR)
+        directories: Dict[Optional[Union[Path, str]], CoverageNode] = {None: root}
+        # Directory nodes in the order they are created, which is after their parents
+        created: List[CoverageNode] = [root]
+
+        for dirpath, node in file_nodes:
+            directory = directories.get(dirpath)
+            if directory is None:
+                directory = root
+                for directory_name in (dirpath_parts(dirpath) if dirpath is not None else ()):
+                    child = directory._children.get(directory_name)
+                    if child is None:
+                        child = cls(directory_name, node_type=CoverageNodeType.DIR)
+                        child._parent = directory
+                        directory._children[directory_name] = child
+                        created.append(child)
+                    elif child._node_type != CoverageNodeType.DIR:
+                        raise ValueError(f"A file node with the name {directory_name} was already added as a child")
+                    directory = child
+                directories[dirpath] = directory
+
+            if node.name in directory._children:
+                raise ValueError(f"A node with the name {node.name} was already added as a child")
+            if node._parent is not None:
+                raise ValueError(f"The node {node.name} was already added as a child of {node._parent.name}")
+            directory._children[node.name] = node
+            node._parent = directory
+
+        # Each directory's summary is the sum of its children's, which are all complete when the directories are
+        # visited in reverse order of creation
+        for directory in reversed(created):
+            if not directory._children:
+                continue
+            summary = CoverageSummary(0, 0, 0, 0)
+            for child in directory._children.values():
+                child_summary = child._summary
+                summary.n_lines += child_summary.n_lines
+                summary.n_lines_covered += child_summary.n_lines_covered
+                summary.n_branches += child_summary.n_branches
+                summary.n_branches_covered += child_summary.n_branches_covered
+            directory._summary = summary
+
+        return root
+
+    @property
+    def name(self) -> str:
+        """Get the CoverageNode name.
+
+        :return: CoverageNode name.
+        """
+        return self._name
+
+    @property
+    def node_type(self) -> CoverageNodeType:
+        """Get the CoverageNode type.
+
+        :return: CoverageNode type.
+        """
+        return self._node_type
+
+    @property
+    def line_coverage(self) -> Optional[LineCoverage]:
+        """Get the per-line coverage of a file node.
+
+        :return: LineCoverage of the node, or None if per-line coverage was not kept.
+        """
+        return self._line_coverage
+
+    @property
+    def parent(self) -> Optional['CoverageNode']:
+        """Get the parent of the CoverageNode.
+
+        :return: Parent CoverageNode, or None if the node has not been added as a child.
+        """
+        return self._parent
+
+    def add_child(
+        self,
+        node: 'CoverageNode',
+        dirpath: Optional[Union[Path, str]] = None,
+        replace: bool = False,
+    ) -> None:
+        """Add a child node to the current node's children.
+
+        The summaries of the node the child is added to and of its ancestors are updated in O(depth).
+
+        :param node: CoverageNode to add as a child.
+        :param path: Relative path to the parent of the child to add.
+        :param replace: Whether to replace an existing child with the same name, rather than raising an error.
+        """
+        if dirpath is None:
+            if node.name in self._children and not replace:
+                raise ValueError(f"A node with the name {node.name} was already added as a child")
+            self._attach(node)
+            return
+
+        # pylint: disable=protected-access
+        directory = self
+        for directory_name in dirpath_parts(dirpath):
+            if directory_name not in directory._children:
+                directory._attach(CoverageNode(directory_name, node_type=CoverageNodeType.DIR))
+            directory = directory._children[directory_name]
+        directory.add_child(node, replace=replace)
+
+    def set_summary(self, summary: CoverageSummary) -> None:
+        """Set the CoverageSummary of a node without children, updating the summaries of its ancestors in O(depth).
+
+        Summaries should be updated through this method rather than modified in place, which would leave the summaries
+        of ancestors out of date.
+
+        :param summary: New summary of coverage for the node.
+        """
+        if self._children:
+            raise ValueError(f"Cannot set the summary of {self.name}, it is aggregated from its children")
+
+        previous = self._summary
+        self._summary = summary
+        if self._parent is not None:
+            self._parent._add_counts(  # pylint: disable=protected-access
+                summary.n_lines - previous.n_lines,
+                summary.n_lines_covered - previous.n_lines_covered,
+                summary.n_branches - previous.n_branches,
+                summary.n_branches_covered - previous.n_branches_covered,
+            )
+
+    @property
+    def summary(self) -> CoverageSummary:
+        """Get a CoverageSummary for the node.
+
+        :return: CoverageSummary for the node.
+        """
+        return self._summary
+
+    @classmethod
+    def deserialize(cls, data: Dict[str, Any]) -> 'CoverageNode':
+        """Build a tree of CoverageNodes from the dictionaries of serialize, such as a JSON output file of covcheck.
+
+        Summaries of directories are aggregated from their files rather than read, and directories without files are
+        left out, as in trees built from coverage files.
+
+        :param data: Dictionary representation of the coverage tree.
+        :return: Root CoverageNode.
+        """
+        if data['node_type'] == CoverageNodeType.FILE.value:
+            return cls(data['name'], node_type=CoverageNodeType.FILE, summary=_deserialize_summary(data['summary']))
+
+        # Files are collected in depth-first pre-order without recursion, so that directories are created in order
+        file_nodes: List[Tuple[Optional[str], CoverageNode]] = []
+        stack: List[Tuple[Optional[str], Dict[str, Any]]] = [(None, child) for child in reversed(data['children'])]
+        while stack:
+            dirpath, child_data = stack.pop()
+            name = child_data['name']
+            if child_data['node_type'] == CoverageNodeType.FILE.value:
+                summary = _deserialize_summary(child_data['summary'])
+                file_nodes.append((dirpath, cls(name, node_type=CoverageNodeType.FILE, summary=summary)))
+                continue
+            child_dirpath = f'{dirpath}/{name}' if dirpath is not None else name
+            stack.extend((child_dirpath, grandchild_data) for grandchild_data in reversed(child_data['children']))
+
+        return cls.from_paths(file_nodes, name=data['name'])
+
     def children(self) -> Generator['CoverageNode', None, None]:
         """Iterate over CoverageNode children."""
         for _, child in self._children.items():
             yield child
+
+    def child(self, name: str) -> Optional['CoverageNode']:
+        """Get a direct child by name.
+
+        :param name: Name of the child.
+        :return: Child CoverageNode, or None if the node has no child with the name.
+        """
+        return self._children.get(name)
+
+    def _attach(self, node: 'CoverageNode') -> None:
+        """Attach a node as a direct child, replacing any child with the same name, and push the change in counts up
+        to the root.
+        """
+        # pylint: disable=protected-access
+        if node.parent is not None:
+            raise ValueError(f"The node {node.name} was already added as a child of {node.parent.name}")
+
+        previous = self._children.get(node.name)
+        if previous is not None:
+            previous._parent = None
+            removed = previous.summary
+        elif not self._children:
+            # A node's own summary is replaced by the aggregated summaries of its children once it has any. The summary
+            # is copied so that a summary passed to the constructor is never modified.
+            removed = self._summary
+            self._summary = CoverageSummary(removed.n_lines, removed.n_lines_covered, removed.n_branches,
+                                            removed.n_branches_covered)
+        else:
+            removed = CoverageSummary(0, 0, 0, 0)
+
+        self._children[node.name] = node
+        node._parent = self
+
+        added = node.summary
+        self._add_counts(
+            added.n_lines - removed.n_lines,
+            added.n_lines_covered - removed.n_lines_covered,
+            added.n_branches - removed.n_branches,
+            added.n_branches_covered - removed.n_branches_covered,
+        )
+
+    def _add_counts(self, n_lines: int, n_lines_covered: int, n_branches: int, n_branches_covered: int) -> None:
+        """Add changes in counts to the summaries of the node and its ancestors."""
+        node: Optional[CoverageNode] = self
+        while node is not None:
+            summary = node._summary
+            summary.n_lines += n_lines
+            summary.n_lines_covered += n_lines_covered
+            summary.n_branches += n_branches
+            summary.n_branches_covered += n_branches_covered
+            node = node._parent  # pylint: disable=protected-access
+
+
+def dirpath_parts(dirpath: Union[Path, str]) -> Tuple[str, ...]:
+    """Split a relative directory path into its components, in the same way as Path(dirpath).parts.
+
+    Paths are split on '/' without constructing a Path, unless they contain empty or '.' components or backslashes,
+    which Path normalizes.
+
+    :param dirpath: Relative path to a directory, such as 'covcheck/_cli'.
+    :return: Names of the directories on the path.
+    """
+    if isinstance(dirpath, str):
+        parts = tuple(dirpath.split('/'))
+        if '' not in parts and '.' not in parts and '\\' not in dirpath:
+            return parts
+    parts = Path(dirpath).parts
+    if len(parts) == 0:
+        raise ValueError(f"Invalid child dirpath: '{Path(dirpath)}'")
+    return parts
+
+
+def _deserialize_summary(data: Dict[str, Any]) -> CoverageSummary:
+    """Get the CoverageSummary of the dictionary of a summary from CoverageNode.serialize."""
+    return CoverageSummary(data['n_lines'], data['n_lines_covered'], data['n_branches'], data['n_branches_covered'])
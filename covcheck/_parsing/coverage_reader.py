@@ -0,0 +1,72 @@
+"""Base class of the readers of coverage file formats."""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple, Union
+
+from covcheck._parsing.compact_coverage_tree import CompactCoverageTree
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
+
+# File node and the path of its parent directory relative to the root of the tree
+FileNode = Tuple[Optional[Union[Path, str]], CoverageNode]
+
+
+class CoverageReader(ABC):
+    """Reader of a coverage file format into a covcheck tree.
+
+    Readers are registered in COVERAGE_READERS, which detects the format of a file from its first bytes.
+    """
+    name = ''
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        # Readers are used through their classmethods without being instantiated, so abstract methods are checked
+        # when a reader is defined
+        super().__init_subclass__(**kwargs)
+        missing = [name for name in dir(cls) if getattr(getattr(cls, name, None), '__isabstractmethod__', False)]
+        if missing:
+            raise TypeError(f"Coverage reader {cls.__name__} does not implement {', '.join(missing)}")
+
+    @classmethod
+    @abstractmethod
+    def sniff(cls, head: bytes) -> bool:
+        """Get whether a file is in the format of the reader.
+
+        :param head: First bytes of the uncompressed file, which may be fewer than requested for short files.
+        """
+
+    @classmethod
+    @abstractmethod
+    def read(cls, filepath: Union[str, Path], compact: bool = False, keep_lines: bool = False) -> BaseCoverageNode:
+        """Read a coverage file into a covcheck tree.
+
+        :param filepath: Path on disk to a coverage file, which may be compressed with gzip or zstd, or '-' for stdin,
+            if the format supports it.
+        :param compact: Whether to store the tree in a CompactCoverageTree.
+        :param keep_lines: Whether to keep the per-line coverage of each file as the LineCoverage of its node.
+        """
+
+    @classmethod
+    def _build_tree(cls, file_nodes: Iterable[FileNode], compact: bool = False) -> BaseCoverageNode:
+        """Build a tree of file nodes, added in order.
+
+        :param file_nodes: File nodes and the paths of their parent directories, relative to the root of the tree.
+        :param compact: Whether to store the tree in a CompactCoverageTree.
+        """
+        if compact:
+            return CompactCoverageTree.from_file_nodes(file_nodes).root
+
+        return CoverageNode.from_paths(file_nodes)
+
+    @classmethod
+    def _parent_dirpath(cls, filepath: str) -> Optional[str]:
+        """Get the path of the parent directory of a file, as str(Path(filepath).parent) without constructing a Path.
+
+        :param filepath: Path to a file, relative to the root of the tree.
+        :return: Path to the parent directory, or None for files at the root of the tree.
+        """
+        if '/' not in filepath:
+            return None
+        dirpath, _, filename = filepath.rpartition('/')
+        if not dirpath or filename in ('', '.'):
+            return str(Path(filepath).parent)
+        return dirpath
@@ -0,0 +1,49 @@
+"""Registry of the readers of coverage file formats."""
+
+from pathlib import Path
+from typing import Dict, Type, Union
+
+from covcheck._parsing.coverage_db_reader import CoverageDBReader
+from covcheck._parsing.coverage_json_reader import CoverageJSONReader
+from covcheck._parsing.coverage_reader import CoverageReader
+from covcheck._parsing.coverage_source import CoverageSource
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+from covcheck._parsing.lcov_reader import LCOVReader
+
+# Readers by format name, in the order their formats are sniffed. XML is the default for files no reader recognizes.
+COVERAGE_READERS: Dict[str, Type[CoverageReader]] = {
+    reader.name: reader for reader in (CoverageXMLParser, CoverageJSONReader, LCOVReader, CoverageDBReader)
+}
+
+# Number of bytes read from the start of a file to detect its format
+_HEAD_SIZE = 64
+
+
+def detect_format(filepath: Union[str, Path]) -> str:
+    """Detect the format of a coverage file from its first bytes.
+
+    Files in no known format are assumed to be XML, so that they fail to parse with an XML error. Compressed coverage
+    read from stdin cannot be sniffed without consuming it, so it is assumed to be XML too.
+
+    :param filepath: Path on disk to a coverage file, which may be compressed with gzip or zstd, or '-' for stdin.
+    :return: Name of the format, see COVERAGE_READERS.
+    """
+    head = CoverageSource.read_head(filepath, _HEAD_SIZE)
+    return next((name for name, reader in COVERAGE_READERS.items() if reader.sniff(head)), CoverageXMLParser.name)
+
+
+def get_reader(file_format: str = 'auto', filepath: Union[str, Path, None] = None) -> Type[CoverageReader]:
+    """Get the reader of a coverage file format.
+
+    :param file_format: Name of the format, or 'auto' to detect the format of filepath.
+    :param filepath: Path to the coverage file, needed to detect its format.
+    :return: Reader class.
+    """
+    if file_format == 'auto':
+        if filepath is None:
+            raise ValueError("Detecting the format of a coverage file requires its path")
+        file_format = detect_format(filepath)
+
+    if file_format not in COVERAGE_READERS:
+        raise ValueError(f"Invalid format ({file_format}). Must be one of: auto, {', '.join(COVERAGE_READERS)}.")
+    return COVERAGE_READERS[file_format]
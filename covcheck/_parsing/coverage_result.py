@@ -1,28 +1,295 @@
 """Coverage result."""
 
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from covcheck._parsing.coverage_node import CoverageNode
+from covcheck._parsing.coverage_cache import CoverageCache
+from covcheck._parsing.coverage_db_reader import CoverageDBReader
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_readers import get_reader
+from covcheck._parsing.coverage_source import CoverageSource
 from covcheck._parsing.coverage_summary import CoverageSummary
 from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+from covcheck._parsing.instrumentation import Instrumentation, tree_counts
+from covcheck._parsing.path_index import PathIndex
 
 
 class CoverageResult:
     """Coverage result."""
-    def __init__(self, tree: CoverageNode):
+    def __init__(self, tree: BaseCoverageNode):
         self.tree = tree
+        self._index: Optional[PathIndex] = None
 
     @property
     def summary(self) -> CoverageSummary:
         """Get the result CoverageSummary."""
         return self.tree.summary
 
+    @property
+    def index(self) -> PathIndex:
+        """Get the PathIndex of the tree, building it on first use.
+
+        The tree should not be modified once the index is built.
+        """
+        if self._index is None:
+            self._index = PathIndex(self.tree)
+        return self._index
+
+    def get(self, path: str) -> Optional[BaseCoverageNode]:
+        """Get the node of a file or directory by its path, such as 'covcheck/_cli/main.py'.
+
+        :param path: Path relative to the root of the tree.
+        :return: CoverageNode at the path, or None if there is no node at the path.
+        """
+        return self.index.get(path)
+
+    def glob(self, pattern: str) -> CoverageSummary:
+        """Get the aggregated CoverageSummary of the files and directories matching a glob pattern.
+
+        :param pattern: Glob pattern relative to the root of the tree, such as 'services/*/handlers' or 'src/**/*.py'.
+        :return: Aggregated CoverageSummary of the matching nodes.
+        """
+        return self.index.glob(pattern)
+
+    def prefix(self, prefix: str) -> CoverageSummary:
+        """Get the aggregated CoverageSummary of the files and directories whose paths start with a prefix.
+
+        :param prefix: Prefix of paths relative to the root of the tree.
+        :return: Aggregated CoverageSummary of the matching nodes.
+        """
+        return self.index.prefix(prefix)
+
+    def diff_summary(self, changed_lines: Dict[str, int]) -> CoverageSummary:
+        """Get the CoverageSummary of only the changed lines of a diff.
+
+        Changed files are looked up by path, so the cost depends on the size of the diff rather than of the tree.
+        Changed files that are not in the result, such as files that are not measured, are skipped, see
+        unmatched_paths, and paths relative to the root of a repository are rewritten with resolve_diff_paths first.
+        The result must keep per-line coverage, see keep_lines of from_xml.
+
+        :param changed_lines: Bitmap of the changed line numbers of each changed file, keyed by path, as returned by
+            UnifiedDiffParser.
+        :return: CoverageSummary of the changed lines.
+        """
+        n_lines = n_lines_covered = n_branches = n_branches_covered = 0
+        for path, mask in changed_lines.items():
+            node = self._find_file(path)
+            if node is None:
+                continue
+            if node.line_coverage is None:
+                raise ValueError(f"Per-line coverage of {path} was not kept")
+
+            summary = node.line_coverage.restrict(mask).summary
+            n_lines += summary.n_lines
+            n_lines_covered += summary.n_lines_covered
+            n_branches += summary.n_branches
+            n_branches_covered += summary.n_branches_covered
+
+        return CoverageSummary(n_lines, n_lines_covered, n_branches, n_branches_covered)
+
+    def unmatched_paths(self, changed_lines: Dict[str, int]) -> List[str]:
+        """Get the changed files of a diff which are not files in the result, and are skipped by diff_summary.
+
+        These are files that are not measured, such as documentation, or files whose paths in the diff are not relative
+        to the same directory as the paths in the coverage file, see resolve_diff_paths.
+
+        :param changed_lines: Bitmap of the changed line numbers of each changed file, keyed by path.
+        :return: Paths of the changed files without a file node, in the order of the diff.
+        """
+        return [path for path in changed_lines if self._find_file(path) is None]
+
+    def resolve_diff_paths(
+        self,
+        changed_lines: Dict[str, int],
+        source_dirpaths: Sequence[str],
+        root: Optional[Union[str, Path]] = None,
+    ) -> Dict[str, int]:
+        """Rewrite the paths of the changed files of a diff to the paths of the same files in the result.
+
+        Paths in a diff are relative to the root of the repository, while the filenames of XML coverage files written
+        by coverage.py are relative to its source directories, such as 'src' for a src layout. A changed file under a
+        source directory within the root is looked up by its path relative to that source directory. Other paths, and
+        paths with no file in the result, are kept as they are.
+
+        :param changed_lines: Bitmap of the changed line numbers of each changed file, keyed by path relative to root.
+        :param source_dirpaths: Source directories of the coverage file, see sources_from_xml. Relative directories are
+            relative to root.
+        :param root: Directory which the paths of the diff are relative to, defaulting to the working directory.
+        :return: Bitmap of the changed line numbers of each changed file, keyed by its path in the result if found.
+        """
+        root_dirpath = Path(root if root is not None else '.').resolve()
+        prefixes = []
+        for source_dirpath in source_dirpaths:
+            try:
+                relative_dirpath = (root_dirpath / source_dirpath).resolve().relative_to(root_dirpath)
+            except ValueError:
+                # Source directories outside the root, such as those of a report written on another machine
+                continue
+            prefixes.append('' if relative_dirpath == Path('.') else f'{relative_dirpath.as_posix()}/')
+
+        resolved: Dict[str, int] = {}
+        for path, mask in changed_lines.items():
+            for prefix in prefixes:
+                if prefix and path.startswith(prefix) and self._find_file(path[len(prefix):]) is not None:
+                    path = path[len(prefix):]
+                    break
+            resolved[path] = resolved.get(path, 0) | mask
+        return resolved
+
+    def _find_file(self, path: str) -> Optional[BaseCoverageNode]:
+        node = self.tree.find(path)
+        if node is None or node.node_type != CoverageNodeType.FILE:
+            return None
+        return node
+
     @classmethod
-    def from_xml(cls, filepath: Union[str, Path]) -> 'CoverageResult':
+    def from_file(
+        cls,
+        filepath: Union[str, Path],
+        file_format: str = 'auto',
+        compact: bool = False,
+        keep_lines: bool = False,
+    ) -> 'CoverageResult':
+        """Create a CoverageResult by reading a coverage file in any supported format.
+
+        :param filepath: Path on disk to a coverage file, which may be compressed with gzip or zstd, or '-' for stdin.
+        :param file_format: Name of the format, such as 'xml', 'lcov', 'json' for coverage.py JSON reports or
+            'coverage-db' for .coverage data files, or 'auto' to detect it from the first bytes of the file.
+        :param compact: Whether to store the tree in a read-only CompactCoverageTree to reduce memory use.
+        :param keep_lines: Whether to keep the per-line coverage of each file on its node.
+        """
+        reader = get_reader(file_format, filepath)
+        with Instrumentation.phase('read') as counts:
+            tree = reader.read(filepath, compact=compact, keep_lines=keep_lines)
+            if Instrumentation.enabled():
+                counts.update(tree_counts(tree))
+        return cls(tree)
+
+    @classmethod
+    def from_xml(  # pylint: disable=too-many-arguments
+        cls,
+        filepath: Union[str, Path],
+        streaming: bool = False,
+        trust_header: bool = False,
+        jobs: int = 1,
+        compact: bool = False,
+        keep_lines: bool = False,
+        cache: Optional[CoverageCache] = None,
+        parser: str = 'auto',
+    ) -> 'CoverageResult':
         """Create a CoverageResult by parsing an XML coverage file.
 
-        :param filepath: Path on disk to an XML coverage file.
+        :param filepath: Path on disk to an XML coverage file, which may be compressed with gzip or zstd, or '-' for
+            stdin.
+        :param streaming: Whether to parse the file incrementally to keep memory use flat.
+        :param trust_header: Whether to use the aggregate attributes of <class> elements instead of counting <line>s.
+        :param jobs: Number of processes to parse the file with.
+        :param compact: Whether to store the tree in a read-only CompactCoverageTree to reduce memory use.
+        :param keep_lines: Whether to keep the per-line coverage of each file on its node.
+        :param cache: Cache of parsed trees to load the tree from, or to store it in once parsed. Trees loaded from the
+            cache are read-only CompactCoverageTrees. Trees with per-line coverage, and trees read from stdin, are not
+            cached.
+        :param parser: Name of the XML parser backend, such as 'expat' or 'lxml', or 'auto' for the fastest installed.
         """
-        tree = CoverageXMLParser.parse(filepath)
+        cacheable = cache is not None and not keep_lines and not CoverageSource.is_stdin(filepath)
+        key = cache.key(filepath, trust_header=trust_header) if cache is not None and cacheable else None
+        if cache is not None and key is not None:
+            with Instrumentation.phase('cache.load') as counts:
+                cached_tree = cache.load(key)
+                counts['hits'] = int(cached_tree is not None)
+            if cached_tree is not None:
+                return cls(cached_tree.root)
+
+        tree = CoverageXMLParser.parse(
+            filepath,
+            streaming=streaming,
+            trust_header=trust_header,
+            jobs=jobs,
+            compact=compact,
+            keep_lines=keep_lines,
+            parser=parser,
+        )
+        if cache is not None and key is not None:
+            with Instrumentation.phase('cache.store'):
+                cache.store(key, tree)
         return cls(tree)
+
+    @classmethod
+    def from_coverage_db(
+        cls,
+        filepath: Union[str, Path],
+        compact: bool = False,
+        keep_lines: bool = False,
+    ) -> 'CoverageResult':
+        """Create a CoverageResult by reading a .coverage data file of coverage.py, without running `coverage xml`.
+
+        Requires the coverage package, and the source files measured in the data file.
+
+        :param filepath: Path on disk to a .coverage data file.
+        :param compact: Whether to store the tree in a read-only CompactCoverageTree to reduce memory use.
+        :param keep_lines: Whether to keep the per-line coverage of each file on its node.
+        """
+        return cls(CoverageDBReader.read(filepath, compact=compact, keep_lines=keep_lines))
+
+    @classmethod
+    def merge(
+        cls,
+        filepaths: Sequence[Union[str, Path]],
+        jobs: int = 1,
+        compact: bool = False,
+        keep_lines: bool = False,
+        parser: str = 'auto',
+    ) -> 'CoverageResult':
+        """Create a CoverageResult by merging XML coverage files from separate runs over the same code.
+
+        A line is covered if it is covered in any of the files.
+
+        :param filepaths: Paths on disk to XML coverage files.
+        :param jobs: Number of files to parse concurrently.
+        :param compact: Whether to store the tree in a read-only CompactCoverageTree to reduce memory use.
+        :param keep_lines: Whether to keep the merged per-line coverage of each file on its node.
+        :param parser: Name of the XML parser backend, or 'auto' for the fastest installed.
+        """
+        tree = CoverageXMLParser.merge(filepaths, jobs=jobs, compact=compact, keep_lines=keep_lines, parser=parser)
+        return cls(tree)
+
+    @classmethod
+    def summary_from_xml(cls, filepath: Union[str, Path]) -> CoverageSummary:
+        """Read the CoverageSummary of an XML coverage file from the aggregate attributes of its root element.
+
+        :param filepath: Path on disk to an XML coverage file, which may be compressed, or '-' for stdin.
+        """
+        return CoverageXMLParser.parse_header(filepath)
+
+    @classmethod
+    def sources_from_xml(cls, filepath: Union[str, Path]) -> List[str]:
+        """Read the source directories which the filenames of an XML coverage file are relative to.
+
+        :param filepath: Path on disk to an XML coverage file, which may be compressed.
+        """
+        return CoverageXMLParser.parse_sources(filepath)
+
+    @classmethod
+    def verify_xml(
+        cls,
+        filepath: Union[str, Path],
+        streaming: bool = False,
+        keep_lines: bool = False,
+        parser: str = 'auto',
+    ) -> Tuple['CoverageResult', List[str]]:
+        """Create a CoverageResult by counting <line>s, and check the aggregate attributes of the file against it.
+
+        :param filepath: Path on disk to an XML coverage file, which may be compressed, or '-' for stdin.
+        :param streaming: Whether to parse the file incrementally to keep memory use flat.
+        :param keep_lines: Whether to keep the per-line coverage of each file on its node.
+        :param parser: Name of the XML parser backend, or 'auto' for the fastest installed.
+        :return: CoverageResult, and a description of each aggregate attribute that does not match the count.
+        """
+        tree, mismatches = CoverageXMLParser.verify_header(
+            filepath,
+            streaming=streaming,
+            keep_lines=keep_lines,
+            parser=parser,
+        )
+        return cls(tree), mismatches
@@ -0,0 +1,198 @@
+"""Per-path coverage threshold rules."""
+
+import re
+
+from fnmatch import translate
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Pattern, Tuple
+
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_summary import CoverageSummary
+
+_MAGIC_CHARACTERS = '*?['
+
+
+class CoverageRule:
+    """Minimum line and branch coverage of the files and directories matching a glob pattern."""
+    __slots__ = ('pattern', 'line', 'branch')
+
+    def __init__(self, pattern: str, line: Optional[float] = None, branch: Optional[float] = None):
+        """Construct CoverageRule.
+
+        :param pattern: Glob pattern relative to the root of the tree, such as 'src/payments/**'. Each path component
+            is matched with fnmatch, and '**' matches any number of components.
+        :param line: Threshold for line coverage.
+        :param branch: Threshold for branch coverage.
+        """
+        for coverage_type, threshold in (('line', line), ('branch', branch)):
+            if threshold is not None and (threshold < 0 or threshold > 100):
+                raise ValueError(f"Invalid threshold for {coverage_type} coverage ({threshold}) of rule {pattern}. "
+                                 "Must be between 0 and 100.")
+
+        self.pattern = pattern
+        self.line = line
+        self.branch = branch
+
+
+class _State:
+    """State of the automaton matching all rule patterns, after matching a prefix of the components of a path."""
+    __slots__ = ('literals', 'wildcards', 'globstar', 'is_globstar', 'rules')
+
+    def __init__(self, is_globstar: bool = False):
+        self.literals: Dict[str, _State] = {}
+        self.wildcards: List[Tuple[str, Pattern[str], _State]] = []
+        self.globstar: Optional[_State] = None
+        self.is_globstar = is_globstar
+        self.rules: List[int] = []
+
+
+class CoverageRules:
+    """Set of CoverageRules, compiled once and evaluated against a coverage tree in a single traversal.
+
+    The patterns of all rules are compiled into one automaton over path components, with patterns sharing prefixes
+    sharing states. Children are matched against the literal components of the active states with dict lookups, so the
+    cost of a traversal grows with the number of nodes visited rather than with the number of rules. Subtrees that no
+    pattern can match are skipped.
+    """
+    __slots__ = ('rules', '_start')
+
+    def __init__(self, rules: List[CoverageRule]):
+        """Compile a set of rules.
+
+        :param rules: Rules to evaluate.
+        """
+        self.rules = rules
+        self._start = _State()
+        for index, rule in enumerate(rules):
+            state = self._start
+            for part in _pattern_parts(rule.pattern):
+                state = self._add_transition(state, part)
+            state.rules.append(index)
+
+    @classmethod
+    def from_config(cls, rules: Mapping[str, Mapping[str, Any]]) -> 'CoverageRules':
+        """Create CoverageRules from a mapping of glob patterns to thresholds, as in [tool.covcheck.rules].
+
+        :param rules: Mapping of glob patterns to mappings with 'line' and/or 'branch' thresholds.
+        """
+        coverage_rules = []
+        for pattern, thresholds in rules.items():
+            if not isinstance(thresholds, Mapping):
+                raise ValueError(f"Invalid rule {pattern}. Must be a table of thresholds, such as {{line = 90}}.")
+            unknown_keys = set(thresholds) - {'line', 'branch'}
+            if unknown_keys:
+                raise ValueError(f"Invalid rule {pattern}. Unknown thresholds: {', '.join(sorted(unknown_keys))}.")
+            coverage_rules.append(CoverageRule(pattern, line=thresholds.get('line'), branch=thresholds.get('branch')))
+        return cls(coverage_rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def summaries(self, root: BaseCoverageNode) -> List[Optional[CoverageSummary]]:
+        """Get the aggregated summary of the nodes matching each rule, in a single traversal of the tree.
+
+        Nodes under a node matching the same rule are not counted twice.
+
+        :param root: Root of the coverage tree.
+        :return: Aggregated CoverageSummary of each rule, or None for rules that match no node.
+        """
+        summaries: List[Optional[CoverageSummary]] = [None] * len(self.rules)
+
+        stack: List[Tuple[BaseCoverageNode, FrozenSet[_State], FrozenSet[int]]] = [
+            (root, _closure([self._start]), frozenset()),
+        ]
+        while stack:
+            node, states, matched_above = stack.pop()
+
+            matched = matched_above
+            for state in states:
+                for index in state.rules:
+                    if index not in matched_above:
+                        _add_summary(summaries, index, node.summary)
+                        matched = matched | {index}
+
+            for child in node.children():
+                child_states = _step(states, child.name)
+                if child_states:
+                    stack.append((child, child_states, matched))
+
+        return summaries
+
+    def check(self, root: BaseCoverageNode) -> List[str]:
+        """Check every rule against a coverage tree.
+
+        :param root: Root of the coverage tree.
+        :return: Description of each violated rule.
+        """
+        violations = []
+        for rule, summary in zip(self.rules, self.summaries(root)):
+            if summary is None:
+                violations.append(f"Rule {rule.pattern} matches no files")
+                continue
+            checks = ((rule.line, 'Line', summary.n_lines, summary.line_rate),
+                      (rule.branch, 'Branch', summary.n_branches, summary.branch_rate))
+            for threshold, coverage_name, total, rate in checks:
+                if threshold is not None and total > 0 and rate * 100 < threshold:
+                    violations.append(f"{coverage_name} coverage of {rule.pattern} ({rate * 100:.2f}%) below "
+                                      f"threshold ({threshold}%)")
+        return violations
+
+    @classmethod
+    def _add_transition(cls, state: _State, part: str) -> _State:
+        if part == '**':
+            if state.globstar is None:
+                state.globstar = _State(is_globstar=True)
+            return state.globstar
+
+        if not any(character in part for character in _MAGIC_CHARACTERS):
+            return state.literals.setdefault(part, _State())
+
+        for wildcard, _, target in state.wildcards:
+            if wildcard == part:
+                return target
+        target = _State()
+        state.wildcards.append((part, re.compile(translate(part)), target))
+        return target
+
+
+def _pattern_parts(pattern: str) -> List[str]:
+    parts = [part for part in pattern.replace('\\', '/').split('/') if part and part != '.']
+    # Consecutive '**' components match the same paths as one
+    return [part for index, part in enumerate(parts) if part != '**' or index == 0 or parts[index - 1] != '**']
+
+
+def _closure(states: List[_State]) -> FrozenSet[_State]:
+    """Add the states reached by '**' components matching no path components."""
+    closed = set()
+    pending = list(states)
+    while pending:
+        state = pending.pop()
+        if state not in closed:
+            closed.add(state)
+            if state.globstar is not None:
+                pending.append(state.globstar)
+    return frozenset(closed)
+
+
+def _step(states: FrozenSet[_State], name: str) -> FrozenSet[_State]:
+    """Get the states after matching one more path component."""
+    next_states = []
+    for state in states:
+        target = state.literals.get(name)
+        if target is not None:
+            next_states.append(target)
+        for _, regex, wildcard_target in state.wildcards:
+            if regex.match(name):
+                next_states.append(wildcard_target)
+        if state.is_globstar:
+            next_states.append(state)
+    return _closure(next_states) if next_states else frozenset()
+
+
+def _add_summary(summaries: List[Optional[CoverageSummary]], index: int, summary: CoverageSummary) -> None:
+    total = summaries[index]
+    if total is None:
+        total = summaries[index] = CoverageSummary(0, 0, 0, 0)
+    total.n_lines += summary.n_lines
+    total.n_lines_covered += summary.n_lines_covered
+    total.n_branches += summary.n_branches
+    total.n_branches_covered += summary.n_branches_covered
@@ -0,0 +1,207 @@
+"""Sources of coverage files: files on disk, compressed or not, and stdin."""
+
+import gzip
+import mmap
+import os
+import sys
+
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from importlib.util import find_spec
+from pathlib import Path
+from typing import IO, Deque, Iterable, Iterator, List, Protocol, Tuple, Union
+
+ZSTANDARD_INSTALLED = find_spec('zstandard') is not None
+
+# Path standing for stdin
+STDIN = '-'
+
+# Contents of an uncompressed coverage file mapped into memory, or empty bytes for an empty file, which can't be mapped
+MappedFile = Union[mmap.mmap, bytes]
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class BinaryReader(Protocol):
+    """Binary file which can be read from, such as an open file, a decompressing reader or a ReplayReader."""
+    def read(self, size: int = -1) -> bytes:
+        """Read at most size bytes, or until the end of the file if size is negative."""
+
+
+class CoverageSource:
+    """Opener of coverage files, decompressing gzip and zstd files as they are read.
+
+    Compression is detected from the first bytes of the file rather than its extension, so compressed reports piped
+    to stdin are decompressed too. Decompressed data is only produced as the parser reads it, in the chunk sizes the
+    parser asks for, so the uncompressed file never exists on disk or in memory as a whole.
+    """
+    @classmethod
+    @contextmanager
+    def open(cls, filepath: Union[str, Path]) -> Iterator[BinaryReader]:
+        """Open a coverage file for reading.
+
+        :param filepath: Path on disk to a coverage file, which may be compressed with gzip or zstd, or '-' for stdin.
+        :return: Context manager of the binary file of the uncompressed coverage file. Stdin is not closed on exit.
+        """
+        with ExitStack() as stack:
+            if cls.is_stdin(filepath):
+                raw_file: IO[bytes] = sys.stdin.buffer
+            else:
+                raw_file = stack.enter_context(open(filepath, 'rb'))
+
+            magic = cls._peek(raw_file)
+            if magic.startswith(_GZIP_MAGIC):
+                yield stack.enter_context(gzip.GzipFile(fileobj=raw_file, mode='rb'))
+            elif magic.startswith(_ZSTD_MAGIC):
+                if not ZSTANDARD_INSTALLED:
+                    raise ImportError("Reading zstd-compressed coverage files requires the zstandard package. "
+                                      "Please 'pip install zstandard'.")
+                import zstandard  # pylint: disable=import-outside-toplevel
+                decompressor = zstandard.ZstdDecompressor()
+                # The raw file is closed by the stack unless it is stdin, so the reader must not close it
+                yield stack.enter_context(decompressor.stream_reader(raw_file, read_across_frames=True, closefd=False))
+            else:
+                yield raw_file
+
+    @classmethod
+    @contextmanager
+    def map(cls, filepath: Union[str, Path]) -> Iterator[MappedFile]:
+        """Memory-map an uncompressed coverage file on disk read-only.
+
+        The contents are paged in from the page cache as they are accessed rather than copied into the process, so
+        processes mapping the same file share its pages.
+
+        :param filepath: Path on disk to an uncompressed coverage file.
+        :return: Context manager of the mapped contents of the file. Slicing them copies only the slice.
+        """
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with mapping:
+            yield mapping
+
+    @classmethod
+    def read_head(cls, filepath: Union[str, Path], size: int = 64) -> bytes:
+        """Read the first bytes of a coverage file, such as to detect its format, without consuming stdin.
+
+        :param filepath: Path on disk to a coverage file, which may be compressed with gzip or zstd, or '-' for stdin.
+        :param size: Number of bytes to read.
+        :return: First bytes of the uncompressed file. For stdin, these are only the bytes already buffered, and are
+            empty if stdin is compressed, since decompressing it would consume it.
+        """
+        if cls.is_stdin(filepath):
+            head = cls._peek(sys.stdin.buffer, size)
+            return b'' if head.startswith(_GZIP_MAGIC) or head.startswith(_ZSTD_MAGIC) else head
+        with cls.open(filepath) as f:
+            return f.read(size)
+
+    @classmethod
+    def is_stdin(cls, filepath: Union[str, Path]) -> bool:
+        """Get whether a path stands for stdin.
+
+        :param filepath: Path to a coverage file.
+        """
+        return isinstance(filepath, str) and filepath == STDIN
+
+    @classmethod
+    def is_plain_file(cls, filepath: Union[str, Path]) -> bool:
+        """Get whether a coverage file is an uncompressed file on disk, which can be read more than once.
+
+        :param filepath: Path to a coverage file.
+        """
+        if cls.is_stdin(filepath):
+            return False
+        with open(filepath, 'rb') as f:
+            magic = cls._peek(f)
+        return not magic.startswith(_GZIP_MAGIC) and not magic.startswith(_ZSTD_MAGIC)
+
+    @classmethod
+    def _peek(cls, f: IO[bytes], size: int = len(_ZSTD_MAGIC)) -> bytes:
+        """Get the first bytes of a buffered binary file without consuming them."""
+        if not hasattr(f, 'peek'):
+            return b''
+        return f.peek(size)[:size]  # type: ignore[attr-defined]
+
+
+class ReplayReader:
+    """Binary file wrapper recording the data read from it, so that it can be read again from the start once.
+
+    This lets the start of a stream which cannot be reopened, such as stdin, be read by two parsers in turn.
+    """
+    def __init__(self, f: BinaryReader):
+        """Construct ReplayReader.
+
+        :param f: Binary file to read from.
+        """
+        self._file = f
+        self._recorded: List[bytes] = []
+        self._recording = True
+        self._replay = b''
+
+    def read(self, size: int = -1) -> bytes:
+        """Read data, first from the recorded data after rewind, then from the file.
+
+        :param size: Maximum number of bytes to read, or -1 to read until the end of the file.
+        """
+        if self._recording:
+            data = self._file.read(size)
+            self._recorded.append(data)
+            return data
+
+        if not self._replay:
+            return self._file.read(size)
+        if size < 0:
+            data, self._replay = self._replay + self._file.read(), b''
+        else:
+            data, self._replay = self._replay[:size], self._replay[size:]
+        return data
+
+    def rewind(self) -> None:
+        """Stop recording, and read the recorded data again before the rest of the file."""
+        self._recording = False
+        self._replay = b''.join(self._recorded)
+        self._recorded = []
+
+
+class SpanReader:
+    """Binary file reading byte ranges of a buffer in turn, such as the <class> elements of a memory-mapped file.
+
+    Only the data returned by each read is copied out of the buffer.
+    """
+    def __init__(self, buffer: MappedFile, spans: Iterable[Tuple[int, int]], prefix: bytes = b'',
+                 suffix: bytes = b''):
+        """Construct SpanReader.
+
+        :param buffer: Buffer to read from.
+        :param spans: Start and end offsets of each byte range of the buffer to read.
+        :param prefix: Data to read before the byte ranges.
+        :param suffix: Data to read after the byte ranges.
+        """
+        self._buffer = buffer
+        self._pieces: Deque[Union[bytes, Tuple[int, int]]] = deque([prefix, *spans, suffix])
+
+    def read(self, size: int = -1) -> bytes:
+        """Read data from the byte ranges in turn.
+
+        :param size: Maximum number of bytes to read, or -1 to read until the end of the last byte range.
+        """
+        chunks = []
+        remaining = size if size >= 0 else sys.maxsize
+        while remaining > 0 and self._pieces:
+            piece = self._pieces.popleft()
+            if isinstance(piece, bytes):
+                chunk = piece[:remaining]
+                rest: Union[bytes, Tuple[int, int], None] = piece[remaining:] or None
+            else:
+                start, end = piece
+                chunk = self._buffer[start:min(end, start + remaining)]
+                rest = (start + len(chunk), end) if start + len(chunk) < end else None
+            if rest is not None:
+                self._pieces.appendleft(rest)
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
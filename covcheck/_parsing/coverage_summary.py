@@ -3,6 +3,8 @@
 
 class CoverageSummary:
     """Coverage summary."""
+    __slots__ = ('n_lines', 'n_lines_covered', 'n_branches', 'n_branches_covered')
+
     def __init__(
         self,
         n_lines: int,
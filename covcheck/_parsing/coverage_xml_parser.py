@@ -2,63 +2,590 @@
 
 import re
 
+from collections import deque
+from itertools import repeat
 from pathlib import Path
-from typing import Union
+from typing import (TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Type,
+                    Union)
 from xml.etree import ElementTree
-from xml.etree.ElementTree import Element
 
-from covcheck._parsing.coverage_node import CoverageNode
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
 from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_reader import CoverageReader, FileNode
+from covcheck._parsing.coverage_source import BinaryReader, CoverageSource, MappedFile, ReplayReader, SpanReader
 from covcheck._parsing.coverage_summary import CoverageSummary
+from covcheck._parsing.instrumentation import Instrumentation, Stopwatch, TimedReader, tree_counts
+from covcheck._parsing.line_coverage import LineCoverage
+from covcheck._parsing.xml_backends import ClassData, XMLBackend, get_backend
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
-class CoverageXMLParser:
+
+# Aggregate attributes written by Cobertura reporters, mapped to the CoverageSummary fields they correspond to
+HEADER_ATTRIBUTES: Dict[str, str] = {
+    'lines-valid': 'n_lines',
+    'lines-covered': 'n_lines_covered',
+    'branches-valid': 'n_branches',
+    'branches-covered': 'n_branches_covered',
+}
+
+# Patterns matching the opening tags of elements which parallel parsing splits reports on
+_PACKAGE_TAG = re.compile(rb'<package[\s/>]')
+_CLASSES_TAG = re.compile(rb'<classes[\s/>]')
+_CLASS_TAG = re.compile(rb'<class[\s/>]')
+
+# Pattern matching the opening tag of <packages>, skipping comments, processing instructions and document type
+# declarations before it. Any other markup starting with '<!' is matched on its own, to parse the file serially.
+_PACKAGES_TAG = re.compile(rb'<!--.*?-->|<\?.*?\?>|<!DOCTYPE[^\[>]*>|(<packages[\s/>])|<!', re.DOTALL)
+
+# Pattern matching the rest of an opening tag from the end of its name, skipping quoted attribute values
+_TAG_END = re.compile(rb'''(?:[^>"']+|"[^"]*"|'[^']*')*>''')
+
+# Pattern matching the XML declaration of a file, which is kept in each shard so that shards have the same encoding
+_XML_DECLARATION = re.compile(rb'(?:\xef\xbb\xbf)?(<\?xml\s.*?\?>)', re.DOTALL)
+
+_CONDITION = re.compile(r"^\d+% \((\d+)\/(\d+)\)$")
+
+# Patterns validating the condition-coverage attributes of a class joined by NUL characters, which cannot occur in XML
+# attributes, and extracting their covered and total branch counts in bulk. Only ASCII digits are matched in bulk.
+_CONDITIONS = re.compile(r"(?:[0-9]+% \([0-9]+/[0-9]+\)\n?\0)*")
+_CONDITIONS_COVERED = re.compile(r"\(([0-9]+)/")
+_CONDITIONS_TOTAL = re.compile(r"/([0-9]+)\)")
+
+_BYTE_ORDER_MARK = b'\xef\xbb\xbf'
+
+# Elements wrapping the <class> elements of a shard in parallel parsing, so that shards parse as coverage files
+_SHARD_START = b'<coverage><packages><package><classes>'
+_SHARD_END = b'</classes></package></packages></coverage>'
+
+# Number of shards per job when parsing in parallel, so that shards of uneven cost balance out across jobs
+_SHARDS_PER_JOB = 4
+
+# Filename and file node of a parsed <class> element, as sent back from parallel parsing jobs
+_ClassRecord = Tuple[str, CoverageNode]
+
+# Filename, name and per-line coverage of a parsed <class> element
+_LineRecord = Tuple[str, str, LineCoverage]
+
+
+class CoverageXMLParser(CoverageReader):
     """XML parser for coverage files."""
+    name = 'xml'
+
     @classmethod
-    def parse(cls, filepath: Union[str, Path]) -> CoverageNode:
+    def sniff(cls, head: bytes) -> bool:
+        return head.lstrip(_BYTE_ORDER_MARK).lstrip().startswith(b'<')
+
+    @classmethod
+    def read(cls, filepath: Union[str, Path], compact: bool = False, keep_lines: bool = False) -> BaseCoverageNode:
+        return cls.parse(filepath, compact=compact, keep_lines=keep_lines)
+
+    @classmethod
+    def parse(
+        cls,
+        filepath: Union[str, Path],
+        streaming: bool = False,
+        trust_header: bool = False,
+        jobs: int = 1,
+        compact: bool = False,
+        keep_lines: bool = False,
+        parser: str = 'auto',
+    ) -> BaseCoverageNode:
         """Parse an XML coverage file into a covcheck tree.
 
-        :param filepath: Path on disk to an XML coverage file.
+        :param filepath: Path on disk to an XML coverage file, which may be compressed with gzip or zstd, or '-' for
+            stdin. Compressed files are decompressed as they are parsed.
+        :param streaming: Whether to parse the file incrementally, discarding each <class> element once it has been
+            added to the tree. Memory use then stays flat regardless of the size of the file.
+        :param trust_header: Whether to take file summaries from the aggregate attributes of <class> elements when
+            they are present, rather than counting their <line> elements.
+        :param jobs: Number of processes to parse the file with. When greater than 1, the <class> elements of the file
+            are split into shards which are parsed in parallel. The resulting tree is identical to a serial parse.
+        :param compact: Whether to store the tree in a CompactCoverageTree, which uses far less memory than a tree of
+            CoverageNode objects but cannot be modified.
+        :param keep_lines: Whether to keep the per-line coverage of each file as the LineCoverage of its node. The
+            <line> elements of every file are then parsed, even with trust_header.
+        :param parser: Name of the XML parser backend, see XML_BACKENDS, or 'auto' for the fastest installed backend
+            which supports streaming if needed.
         """
-        xml_tree = ElementTree.parse(filepath)
-        xml_root = xml_tree.getroot()
+        if jobs < 1:
+            raise ValueError(f"Invalid number of jobs ({jobs}). Must be at least 1.")
+        if compact and keep_lines:
+            raise ValueError("Compact trees do not keep per-line coverage")
+        if jobs > 1 and streaming:
+            raise ValueError("Parallel parsing does not support streaming")
+
+        with Instrumentation.phase('parse') as counts:
+            if jobs > 1:
+                file_nodes = cls._iter_file_nodes_parallel(filepath, jobs, trust_header, keep_lines, parser)
+                root_node = cls._build_tree(file_nodes, compact=compact)
+            elif Instrumentation.enabled():
+                backend = get_backend(parser, streaming=streaming)
+                root_node = cls._parse_measured(filepath, backend, trust_header, keep_lines, compact, counts)
+            else:
+                xml_classes = cls._iter_classes(filepath, get_backend(parser, streaming=streaming))
+                file_nodes = (
+                    cls._parse_class(class_data, trust_header=trust_header, keep_lines=keep_lines)
+                    for class_data in xml_classes
+                )
+                root_node = cls._build_tree(file_nodes, compact=compact)
+            if Instrumentation.enabled():
+                counts.update(tree_counts(root_node))
+
+        return root_node
 
-        root_node = CoverageNode('root', node_type=CoverageNodeType.DIR)
+    @classmethod
+    def parse_header(cls, filepath: Union[str, Path]) -> CoverageSummary:
+        """Read the aggregate coverage summary from the root <coverage> element of an XML coverage file.
 
-        xml_packages = cls._try_get_child(xml_root, 'packages')
-        for xml_package in xml_packages:
-            xml_classes = cls._try_get_child(xml_package, 'classes')
-            for xml_class in xml_classes:
-                code_filename = xml_class.attrib['name']
-                full_filepath = xml_class.attrib['filename']
-                code_dirpath = Path(full_filepath).parent if '/' in full_filepath else None
+        Only the start of the file is read, so this is fast regardless of the size of the file.
 
-                summary = CoverageSummary(0, 0, 0, 0)
-                xml_lines = cls._try_get_child(xml_class, 'lines')
-                for xml_line in xml_lines:
-                    summary.n_lines += 1
-                    if xml_line.attrib['hits'] == '1':
-                        summary.n_lines_covered += 1
+        :param filepath: Path on disk to an XML coverage file, which may be compressed, or '-' for stdin.
+        """
+        with CoverageSource.open(filepath) as f:
+            return cls._read_header(f)
 
-                    if 'branch' in xml_line.attrib and xml_line.attrib['branch']:
-                        branch_condition = xml_line.attrib['condition-coverage']
-                        pattern = r"^\d+% \((\d+)\/(\d+)\)$"
-                        match = re.match(pattern, branch_condition)
+    @classmethod
+    def parse_sources(cls, filepath: Union[str, Path]) -> List[str]:
+        """Read the source directories which the filenames of an XML coverage file are relative to.
 
-                        if match is None:
-                            raise ValueError(f"Failed to parse condition-coverage XML: {branch_condition}")
+        Only the start of the file, up to the <packages> element, is read.
 
-                        summary.n_branches_covered += int(match.group(1))
-                        summary.n_branches += int(match.group(2))
+        :param filepath: Path on disk to an XML coverage file, which may be compressed.
+        :return: Text of each <source> element, in the order of the file.
+        """
+        sources = []
+        with CoverageSource.open(filepath) as f:
+            for event, xml_element in ElementTree.iterparse(f, events=('start', 'end')):
+                if event == 'start' and xml_element.tag == 'packages':
+                    break
+                if event == 'end' and xml_element.tag == 'source' and xml_element.text:
+                    sources.append(xml_element.text.strip())
+        return sources
 
-                node = CoverageNode(code_filename, node_type=CoverageNodeType.FILE, summary=summary)
-                root_node.add_child(node, dirpath=code_dirpath)
+    @classmethod
+    def merge(
+        cls,
+        filepaths: Sequence[Union[str, Path]],
+        jobs: int = 1,
+        compact: bool = False,
+        keep_lines: bool = False,
+        parser: str = 'auto',
+    ) -> BaseCoverageNode:
+        """Merge XML coverage files from separate runs over the same code, such as test shards, into a covcheck tree.
+
+        A line is covered in the merged tree if it is covered in any of the files. Files are parsed incrementally,
+        so memory use is bounded by the per-line coverage of the files being parsed and of the merged tree.
+
+        :param filepaths: Paths on disk to XML coverage files.
+        :param jobs: Number of files to parse concurrently, each in a separate process.
+        :param compact: Whether to store the tree in a CompactCoverageTree.
+        :param keep_lines: Whether to keep the merged per-line coverage of each file as the LineCoverage of its node.
+        :param parser: Name of the XML parser backend, or 'auto' for the fastest installed streaming backend.
+        """
+        if jobs < 1:
+            raise ValueError(f"Invalid number of jobs ({jobs}). Must be at least 1.")
+        if compact and keep_lines:
+            raise ValueError("Compact trees do not keep per-line coverage")
+        if len(filepaths) == 0:
+            raise ValueError("No coverage files to merge")
+
+        with Instrumentation.phase('merge') as counts:
+            # Files are merged in order as they are parsed, so the tree is the same regardless of the number of jobs.
+            # Classes are keyed by the path of the node parse builds for them, so that the several <class> elements of
+            # a file, such as nested Java classes, are kept as separate nodes as they are by parse.
+            merged: Dict[Tuple[Optional[str], str], LineCoverage] = {}
+            for records in cls._iter_parsed_lines(filepaths, jobs, parser):
+                for full_filepath, code_filename, line_coverage in records:
+                    key = (cls._class_dirpath(full_filepath), code_filename)
+                    merged_line_coverage = merged.get(key)
+                    merged[key] = (merged_line_coverage.union(line_coverage) if merged_line_coverage is not None
+                                   else line_coverage)
+
+            file_nodes = ((
+                code_dirpath,
+                CoverageNode(
+                    code_filename,
+                    node_type=CoverageNodeType.FILE,
+                    summary=line_coverage.summary,
+                    line_coverage=line_coverage if keep_lines else None,
+                ),
+            ) for (code_dirpath, code_filename), line_coverage in merged.items())
+
+            root_node = cls._build_tree(file_nodes, compact=compact)
+            if Instrumentation.enabled():
+                counts.update(tree_counts(root_node), inputs=len(filepaths))
 
         return root_node
 
     @classmethod
-    def _try_get_child(cls, xml_element: Element, tag: str) -> Element:
-        for xml_child in xml_element:
-            if xml_child.tag == tag:
-                return xml_child
-        raise ValueError(f"Could not parse coverage XML, no attribute '{tag}'")
+    def _iter_parsed_lines(cls, filepaths: Sequence[Union[str, Path]], jobs: int,
+                           parser: str) -> Iterator[List[_LineRecord]]:
+        if jobs == 1:
+            for filepath in filepaths:
+                yield list(cls.parse_lines(filepath, parser=parser))
+            return
+
+        # At most one parsed file per job is held in memory waiting to be merged
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            pending: Deque['Future'] = deque()
+            for filepath in filepaths:
+                pending.append(executor.submit(_parse_lines, filepath, parser))
+                if len(pending) == jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    @classmethod
+    def parse_lines(cls, filepath: Union[str, Path], parser: str = 'auto') -> Iterator[Tuple[str, str, LineCoverage]]:
+        """Incrementally parse the per-line coverage of each file in an XML coverage file.
+
+        :param filepath: Path on disk to an XML coverage file, which may be compressed, or '-' for stdin.
+        :param parser: Name of the XML parser backend, or 'auto' for the fastest installed streaming backend.
+        :return: Iterator over the filename, name and LineCoverage of each <class> element.
+        """
+        # Unless a backend is chosen, files are parsed incrementally
+        backend = get_backend(parser, streaming=parser == 'auto')
+        for class_attrib, lines in cls._iter_classes(filepath, backend):
+            line_coverage = cls._parse_line_coverage(cls._require_lines(lines))
+            yield class_attrib['filename'], class_attrib['name'], line_coverage
+
+    @classmethod
+    def verify_header(
+        cls,
+        filepath: Union[str, Path],
+        streaming: bool = False,
+        keep_lines: bool = False,
+        parser: str = 'auto',
+    ) -> Tuple[BaseCoverageNode, List[str]]:
+        """Parse an XML coverage file, checking the aggregate attributes in the file against the counted <line>s.
+
+        :param filepath: Path on disk to an XML coverage file, which may be compressed, or '-' for stdin.
+        :param streaming: Whether to parse the file incrementally.
+        :param keep_lines: Whether to keep the per-line coverage of each file as the LineCoverage of its node.
+        :param parser: Name of the XML parser backend, or 'auto' for the fastest installed backend.
+        :return: Counted covcheck tree, and a description of each aggregate attribute that does not match the count.
+        """
+        backend = get_backend(parser, streaming=streaming)
+        with Instrumentation.phase('verify') as counts, CoverageSource.open(filepath) as f:
+            # The start of the file is read again by the backend, so that stdin can be verified too
+            reader = ReplayReader(f)
+            header = cls._read_header(reader)
+            reader.rewind()
+
+            mismatches: List[str] = []
+            xml_classes = backend.iter_classes(reader)
+            root_node = cls._build_tree(cls._iter_verified_file_nodes(xml_classes, mismatches, keep_lines))
+            if Instrumentation.enabled():
+                counts.update(tree_counts(root_node), mismatches=len(mismatches))
+        mismatches.extend(cls._compare_summaries('<coverage>', header, root_node.summary))
+
+        return root_node, mismatches
+
+    @classmethod
+    def _read_header(cls, f: BinaryReader) -> CoverageSummary:
+        for _, xml_root in ElementTree.iterparse(f, events=('start', )):
+            summary = cls._parse_header_attributes(xml_root.attrib)
+            if summary is None:
+                missing = [name for name in HEADER_ATTRIBUTES if name not in xml_root.attrib]
+                raise ValueError(f"Could not parse coverage XML, no attribute '{missing[0]}'")
+            return summary
+        raise ValueError("Could not parse coverage XML, no root element")
+
+    @classmethod
+    def _iter_verified_file_nodes(cls, xml_classes: Iterable[ClassData], mismatches: List[str],
+                                  keep_lines: bool) -> Iterator[FileNode]:
+        for class_data in xml_classes:
+            code_dirpath, node = cls._parse_class(class_data, keep_lines=keep_lines)
+            class_attrib = class_data[0]
+            header = cls._parse_header_attributes(class_attrib)
+            if header is not None:
+                mismatches.extend(cls._compare_summaries(class_attrib['filename'], header, node.summary))
+            yield code_dirpath, node
+
+    @classmethod
+    def _iter_file_nodes_parallel(cls, filepath: Union[str, Path], jobs: int, trust_header: bool,
+                                  keep_lines: bool, parser: str) -> Iterator[FileNode]:
+        get_backend(parser)
+        if not CoverageSource.is_plain_file(filepath):
+            raise ValueError("Parallel parsing requires an uncompressed coverage file on disk")
+        # The file is mapped rather than read, so that locating the <class> elements does not copy it into memory,
+        # and jobs are only sent the byte ranges of their shard, which they read from their own mapping of the file
+        with CoverageSource.map(filepath) as data:
+            class_spans = cls._find_class_spans(data)
+            declaration_match = _XML_DECLARATION.match(data)
+            shard_start = (declaration_match.group(1) if declaration_match is not None else b'') + _SHARD_START
+            shard_size = max(1, len(data) // (jobs * _SHARDS_PER_JOB))
+
+        if class_spans is None:
+            for class_data in cls._iter_classes(filepath, get_backend(parser)):
+                yield cls._parse_class(class_data, trust_header=trust_header, keep_lines=keep_lines)
+            return
+
+        shards = []
+        shard: List[Tuple[int, int]] = []
+        current_size = 0
+        for start, end in class_spans:
+            shard.append((start, end))
+            current_size += end - start
+            if current_size >= shard_size:
+                shards.append(shard)
+                shard = []
+                current_size = 0
+        if shard:
+            shards.append(shard)
+
+        # Shard results are returned in order, so the tree is built in the same order as a serial parse
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            shard_records = executor.map(_parse_shard, repeat(filepath), shards, repeat(shard_start),
+                                         repeat(trust_header), repeat(keep_lines), repeat(parser))
+            for records in shard_records:
+                for full_filepath, node in records:
+                    yield cls._class_dirpath(full_filepath), node
+
+    @classmethod
+    def _find_class_spans(cls, data: MappedFile) -> Optional[List[Tuple[int, int]]]:
+        """Find the byte ranges of the <class> elements of an XML coverage file, without parsing the file.
+
+        The nesting of <packages>, <package> and <classes> elements is checked in the same way as a full parse.
+
+        :return: Start and end offsets of each <class> element, or None if the file has comments, CDATA sections,
+            processing instructions or an internal DTD which the scan cannot skip, and must be parsed serially.
+        """
+        packages_match = None
+        for match in _PACKAGES_TAG.finditer(data):
+            if match.group() == b'<!':
+                return None
+            if match.group(1) is not None:
+                packages_match = match
+                break
+        if packages_match is None:
+            raise ValueError("Could not parse coverage XML, no attribute 'packages'")
+        packages_start, packages_end = cls._find_element_content(data, packages_match, b'</packages>', len(data))
+        if any(data.find(markup, packages_start, packages_end) != -1 for markup in (b'<!', b'<?')):
+            return None
+
+        spans = []
+        package_match = _PACKAGE_TAG.search(data, packages_start, packages_end)
+        while package_match is not None:
+            package_start, package_end = cls._find_element_content(data, package_match, b'</package>', packages_end)
+            classes_match = _CLASSES_TAG.search(data, package_start, package_end)
+            if classes_match is None:
+                raise ValueError("Could not parse coverage XML, no attribute 'classes'")
+            classes_start, classes_end = cls._find_element_content(data, classes_match, b'</classes>', package_end)
+
+            class_match = _CLASS_TAG.search(data, classes_start, classes_end)
+            while class_match is not None:
+                _, class_end = cls._find_element_content(data, class_match, b'</class>', classes_end)
+                class_end = data.find(b'>', class_end) + 1
+                spans.append((class_match.start(), class_end))
+                class_match = _CLASS_TAG.search(data, class_end, classes_end)
+
+            package_match = _PACKAGE_TAG.search(data, data.find(b'>', package_end) + 1, packages_end)
+
+        return spans
+
+    @classmethod
+    def _find_element_content(cls, data: MappedFile, tag_match: 're.Match[bytes]', end_tag: bytes,
+                              limit: int) -> Tuple[int, int]:
+        """Find the byte range of the content of an element, given a match of its opening tag.
+
+        :return: Start and end offsets of the element content. The end offset is the start of the closing tag, or
+            the end of the opening tag if the element has no closing tag.
+        """
+        tag_end_match = _TAG_END.match(data, tag_match.end() - 1, limit)
+        if tag_end_match is None:
+            raise ValueError(f"Could not parse coverage XML, unterminated tag at offset {tag_match.start()}")
+        content_start = tag_end_match.end()
+        if data[content_start - 2:content_start] == b'/>':
+            return content_start, content_start - 1
+
+        content_end = data.find(end_tag, content_start, limit)
+        if content_end == -1:
+            raise ValueError(f"Could not parse coverage XML, unterminated tag at offset {tag_match.start()}")
+        return content_start, content_end
+
+    @classmethod
+    def _parse_measured(cls, filepath: Union[str, Path], backend: Type[XMLBackend], trust_header: bool,
+                        keep_lines: bool, compact: bool, counts: Dict[str, int]) -> BaseCoverageNode:
+        """Parse serially as parse does, sending the time spent reading the file, parsing its XML, counting the
+        <line>s of each <class> and building the tree to the instrumentation hooks as phases within the parse.
+        """
+        read, xml, count, total = Stopwatch(), Stopwatch(), Stopwatch(), Stopwatch()
+        with total, CoverageSource.open(filepath) as f:
+            reader = TimedReader(f, read)
+            # The file nodes are still built as they are parsed, so that streaming parses keep memory use flat
+            file_nodes = cls._iter_measured_file_nodes(backend.iter_classes(reader), xml, count, trust_header,
+                                                       keep_lines, counts)
+            root_node = cls._build_tree(file_nodes, compact=compact)
+
+        counts['bytes'] = reader.n_bytes
+        Instrumentation.emit(read.metrics('parse.read', {'bytes': reader.n_bytes}))
+        Instrumentation.emit(xml.metrics('parse.xml', {'classes': counts['classes']}, excluding=[read]))
+        Instrumentation.emit(count.metrics('parse.count', {'classes': counts['classes']}))
+        Instrumentation.emit(total.metrics('parse.build', excluding=[xml, count]))
+        return root_node
+
+    @classmethod
+    def _iter_measured_file_nodes(cls, xml_classes: Iterable[ClassData], xml: Stopwatch, count: Stopwatch,
+                                  trust_header: bool, keep_lines: bool, counts: Dict[str, int]) -> Iterator[FileNode]:
+        counts['classes'] = 0
+        xml_classes = iter(xml_classes)
+        while True:
+            with xml:
+                class_data = next(xml_classes, None)
+            if class_data is None:
+                return
+            with count:
+                file_node = cls._parse_class(class_data, trust_header=trust_header, keep_lines=keep_lines)
+            counts['classes'] += 1
+            yield file_node
+
+    @classmethod
+    def _iter_classes(cls, filepath: Union[str, Path], backend: Type[XMLBackend]) -> Iterator[ClassData]:
+        with CoverageSource.open(filepath) as f:
+            yield from backend.iter_classes(f)
+
+    @classmethod
+    def _parse_class(cls, class_data: ClassData, trust_header: bool = False, keep_lines: bool = False) -> FileNode:
+        class_attrib, lines = class_data
+        code_filename = class_attrib['name']
+        code_dirpath = cls._class_dirpath(class_attrib['filename'])
+
+        if keep_lines:
+            line_coverage = cls._parse_line_coverage(cls._require_lines(lines))
+            node = CoverageNode(code_filename, node_type=CoverageNodeType.FILE, line_coverage=line_coverage)
+            return code_dirpath, node
+
+        header = cls._parse_header_attributes(class_attrib) if trust_header else None
+        summary = header if header is not None else cls._count_lines(cls._require_lines(lines))
+
+        node = CoverageNode(code_filename, node_type=CoverageNodeType.FILE, summary=summary)
+        return code_dirpath, node
+
+    @classmethod
+    def _class_dirpath(cls, full_filepath: str) -> Optional[str]:
+        return cls._parent_dirpath(full_filepath)
+
+    @classmethod
+    def _count_lines(cls, lines: Iterable[Mapping[str, str]]) -> CoverageSummary:
+        # The attributes of all lines are gathered first, so that they are counted in bulk rather than line by line
+        line_attribs = list(lines)
+        hits = [line_attrib['hits'] for line_attrib in line_attribs]
+        conditions = [line_attrib['condition-coverage'] for line_attrib in line_attribs if line_attrib.get('branch')]
+
+        n_branches_covered, n_branches = cls._sum_conditions(conditions)
+        # Lines are covered if they were hit any number of times, as Cobertura reports other than coverage.py's
+        # record the number of hits rather than 0 or 1
+        return CoverageSummary(len(hits), len(hits) - hits.count('0'), n_branches, n_branches_covered)
+
+    @classmethod
+    def _sum_conditions(cls, conditions: List[str]) -> Tuple[int, int]:
+        """Sum the covered and total branch counts of condition-coverage attributes, such as '50% (1/2)'."""
+        if not conditions:
+            return 0, 0
+
+        joined = '\0'.join(conditions) + '\0'
+        if _CONDITIONS.fullmatch(joined) is None:
+            # Parse each condition to raise an error for the first invalid one
+            counts = [cls._parse_condition(condition) for condition in conditions]
+            return sum(covered for covered, _ in counts), sum(total for _, total in counts)
+
+        covered = _CONDITIONS_COVERED.findall(joined)
+        total = _CONDITIONS_TOTAL.findall(joined)
+        return sum(map(int, covered)), sum(map(int, total))
+
+    @classmethod
+    def _parse_line_coverage(cls, lines: Iterable[Mapping[str, str]]) -> LineCoverage:
+        line_numbers = []
+        covered_line_numbers = []
+        branches = []
+        for line_attrib in lines:
+            line_number = int(line_attrib['number'])
+            line_numbers.append(line_number)
+            if line_attrib['hits'] != '0':
+                covered_line_numbers.append(line_number)
+
+            if line_attrib.get('branch'):
+                n_branches_covered, n_branches = cls._parse_condition(line_attrib['condition-coverage'])
+                branches.append((line_number, n_branches_covered, n_branches))
+
+        return LineCoverage.from_lines(line_numbers, covered_line_numbers, branches)
+
+    @classmethod
+    def _require_lines(cls, lines: Optional[Iterable[Mapping[str, str]]]) -> Iterable[Mapping[str, str]]:
+        if lines is None:
+            raise ValueError("Could not parse coverage XML, no attribute 'lines'")
+        return lines
+
+    @classmethod
+    def _parse_condition(cls, branch_condition: str) -> Tuple[int, int]:
+        match = _CONDITION.match(branch_condition)
+
+        if match is None:
+            raise ValueError(f"Failed to parse condition-coverage XML: {branch_condition}")
+
+        return int(match.group(1)), int(match.group(2))
+
+    @classmethod
+    def _parse_header_attributes(cls, attrib: Mapping[str, str]) -> Optional[CoverageSummary]:
+        if any(name not in attrib for name in HEADER_ATTRIBUTES):
+            return None
+
+        counts = {field: cls._parse_count(attrib, name) for name, field in HEADER_ATTRIBUTES.items()}
+        return CoverageSummary(**counts)
+
+    @classmethod
+    def _parse_count(cls, attrib: Mapping[str, str], name: str) -> int:
+        try:
+            return int(attrib[name])
+        except ValueError as e:
+            raise ValueError(f"Failed to parse {name} XML: {attrib[name]}") from e
+
+    @classmethod
+    def _compare_summaries(cls, location: str, header: CoverageSummary, counted: CoverageSummary) -> List[str]:
+        mismatches = []
+        for name, field in HEADER_ATTRIBUTES.items():
+            header_value = getattr(header, field)
+            counted_value = getattr(counted, field)
+            if header_value != counted_value:
+                mismatches.append(f"{location}: {name}={header_value}, counted {counted_value}")
+        return mismatches
+
+
+def _parse_shard(filepath: Union[str, Path], spans: List[Tuple[int, int]], shard_start: bytes, trust_header: bool,
+                 keep_lines: bool, parser: str) -> List[_ClassRecord]:
+    """Parse a shard of consecutive <class> elements in a parallel parsing job.
+
+    :param filepath: Path on disk to the uncompressed XML coverage file.
+    :param spans: Start and end offsets of the <class> elements of the shard in the file.
+    :param shard_start: XML declaration of the file and opening tags wrapping the <class> elements.
+    :param trust_header: Whether to use the aggregate attributes of <class> elements instead of counting <line>s.
+    :param keep_lines: Whether to keep the per-line coverage of each file.
+    :param parser: Name of the XML parser backend.
+    :return: Filename and file node of each <class> element.
+    """
+    records = []
+    with CoverageSource.map(filepath) as data:
+        shard = SpanReader(data, spans, prefix=shard_start, suffix=_SHARD_END)
+        for class_data in get_backend(parser).iter_classes(shard):
+            _, node = CoverageXMLParser._parse_class(  # pylint: disable=protected-access
+                class_data,
+                trust_header=trust_header,
+                keep_lines=keep_lines,
+            )
+            records.append((class_data[0]['filename'], node))
+    return records
+
+
+def _parse_lines(filepath: Union[str, Path], parser: str) -> List[_LineRecord]:
+    """Parse the per-line coverage of an XML coverage file in a concurrent merging job.
+
+    :param filepath: Path on disk to an XML coverage file.
+    :param parser: Name of the XML parser backend.
+    :return: Filename, name and LineCoverage of each <class> element.
+    """
+    return list(CoverageXMLParser.parse_lines(filepath, parser=parser))
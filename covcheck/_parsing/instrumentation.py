@@ -0,0 +1,232 @@
+"""Instrumentation of the phases of reading and checking coverage."""
+
+import sys
+import time
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_source import BinaryReader
+
+# Hook receiving the metrics of each phase once it ends
+PhaseHook = Callable[['PhaseMetrics'], None]
+
+
+class PhaseMetrics:
+    """Metrics of a phase, such as parsing a coverage file or writing the output file."""
+    __slots__ = ('name', 'wall_seconds', 'cpu_seconds', 'peak_memory', 'max_rss', 'counts')
+
+    def __init__(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float,
+        peak_memory: Optional[int] = None,
+        max_rss: Optional[int] = None,
+        counts: Optional[Dict[str, int]] = None,
+    ):
+        """Construct PhaseMetrics.
+
+        :param name: Name of the phase. Phases within another phase are named after it, such as 'parse.xml'.
+        :param wall_seconds: Wall time of the phase.
+        :param cpu_seconds: CPU time of the process during the phase.
+        :param peak_memory: Peak memory allocated by Python during the phase in bytes, if tracemalloc is tracing.
+        :param max_rss: Peak resident set size of the process at the end of the phase in bytes, where available.
+        :param counts: Counts of what the phase processed, such as 'files', 'directories' or 'lines'.
+        """
+        self.name = name
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.peak_memory = peak_memory
+        self.max_rss = max_rss
+        self.counts = counts if counts is not None else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the metrics as a dictionary which can be serialized to JSON.
+
+        :return: Dictionary of the metrics.
+        """
+        return {
+            'name': self.name,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'peak_memory': self.peak_memory,
+            'max_rss': self.max_rss,
+            'counts': self.counts,
+        }
+
+
+class Instrumentation:
+    """Hooks receiving the metrics of the phases of covcheck, such as to forward them to telemetry.
+
+    Phases are only measured while at least one hook is added, so instrumentation costs nothing otherwise. Hooks are
+    called as each phase ends, so phases within another phase are received before it.
+    """
+    _hooks: List[PhaseHook] = []
+    # Peak traced memory of each running phase, updated as phases within it end
+    _peaks: List[int] = []
+
+    @classmethod
+    def add_hook(cls, hook: PhaseHook) -> None:
+        """Add a hook receiving the metrics of each phase.
+
+        :param hook: Function called with the PhaseMetrics of each phase once it ends.
+        """
+        cls._hooks.append(hook)
+
+    @classmethod
+    def remove_hook(cls, hook: PhaseHook) -> None:
+        """Remove a hook added with add_hook.
+
+        :param hook: Hook to remove.
+        """
+        cls._hooks.remove(hook)
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """Get whether phases are measured, which is when at least one hook is added."""
+        return len(cls._hooks) > 0
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str) -> Iterator[Dict[str, int]]:
+        """Measure a phase, and send its metrics to the hooks once it ends.
+
+        :param name: Name of the phase.
+        :return: Context manager giving the counts of the phase, which the phase can fill in.
+        """
+        counts: Dict[str, int] = {}
+        if not cls._hooks:
+            yield counts
+            return
+
+        tracing = _start_peak(cls._peaks)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield counts
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+            peak_memory = _end_peak(cls._peaks) if tracing else None
+            cls.emit(PhaseMetrics(name, wall_seconds, cpu_seconds, peak_memory, _max_rss(), counts))
+
+    @classmethod
+    def emit(cls, metrics: PhaseMetrics) -> None:
+        """Send the metrics of a phase measured by the caller to the hooks.
+
+        :param metrics: Metrics of the phase.
+        """
+        for hook in list(cls._hooks):
+            hook(metrics)
+
+
+def _start_peak(peaks: List[int]) -> bool:
+    """Start measuring the peak traced memory of a phase, if tracemalloc is tracing.
+
+    :return: Whether tracemalloc is tracing.
+    """
+    tracemalloc = sys.modules.get('tracemalloc')
+    if tracemalloc is None or not tracemalloc.is_tracing():
+        return False
+    current, peak = tracemalloc.get_traced_memory()
+    # The peak so far belongs to the enclosing phase, and the peak of this phase starts from the current memory
+    if peaks:
+        peaks[-1] = max(peaks[-1], peak)
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+        peak = current
+    peaks.append(peak)
+    return True
+
+
+def _end_peak(peaks: List[int]) -> Optional[int]:
+    """Get the peak traced memory of the phase that is ending."""
+    tracemalloc = sys.modules['tracemalloc']
+    if not peaks or not tracemalloc.is_tracing():
+        return None
+    peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+    if peaks:
+        peaks[-1] = max(peaks[-1], peak)
+    return peak
+
+
+def _max_rss() -> Optional[int]:
+    """Get the peak resident set size of the process in bytes, or None where it is not available."""
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class Stopwatch:
+    """Wall and CPU time accumulated over several intervals, such as each read of a file during a parse."""
+    __slots__ = ('wall_seconds', 'cpu_seconds', '_wall_start', '_cpu_start')
+
+    def __init__(self) -> None:
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+
+    def __enter__(self) -> 'Stopwatch':
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.wall_seconds += time.perf_counter() - self._wall_start
+        self.cpu_seconds += time.process_time() - self._cpu_start
+
+    def metrics(self, name: str, counts: Optional[Dict[str, int]] = None,
+                excluding: Sequence['Stopwatch'] = ()) -> PhaseMetrics:
+        """Get the metrics of a phase timed by the stopwatch.
+
+        :param name: Name of the phase.
+        :param counts: Counts of what the phase processed.
+        :param excluding: Stopwatches timing phases within the intervals of this stopwatch, whose time is not part of
+            the phase.
+        """
+        wall_seconds = self.wall_seconds - sum(stopwatch.wall_seconds for stopwatch in excluding)
+        cpu_seconds = self.cpu_seconds - sum(stopwatch.cpu_seconds for stopwatch in excluding)
+        return PhaseMetrics(name, max(wall_seconds, 0.0), max(cpu_seconds, 0.0), counts=counts)
+
+
+class TimedReader:
+    """Binary file whose reads are timed by a stopwatch."""
+    def __init__(self, f: BinaryReader, stopwatch: Stopwatch):
+        self._file = f
+        self._stopwatch = stopwatch
+        self.n_bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the file, adding the time taken to the stopwatch."""
+        with self._stopwatch:
+            data = self._file.read(size)
+        self.n_bytes += len(data)
+        return data
+
+
+def tree_counts(root: BaseCoverageNode) -> Dict[str, int]:
+    """Count the files, directories, lines and branches of a tree, for the counts of a phase.
+
+    :param root: Root of the tree.
+    :return: Counts of the tree.
+    """
+    n_files = n_directories = 0
+    for _, node in root.walk():
+        if node.node_type == CoverageNodeType.FILE:
+            n_files += 1
+        else:
+            n_directories += 1
+    return {
+        'files': n_files,
+        'directories': n_directories,
+        'lines': root.summary.n_lines,
+        'branches': root.summary.n_branches,
+    }
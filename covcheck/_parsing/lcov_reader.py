@@ -0,0 +1,136 @@
+"""Reader for LCOV tracefiles."""
+
+import re
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+from covcheck._parsing.coverage_node import BaseCoverageNode, CoverageNode
+from covcheck._parsing.coverage_node_type import CoverageNodeType
+from covcheck._parsing.coverage_reader import CoverageReader, FileNode
+from covcheck._parsing.coverage_source import BinaryReader, CoverageSource
+from covcheck._parsing.line_coverage import LineCoverage
+
+_CHUNK_SIZE = 1 << 20
+
+_BYTE_ORDER_MARK = b'\xef\xbb\xbf'
+_END_OF_RECORD = b'end_of_record'
+
+# Patterns matching the first line of a tracefile, and the lines of a record which covcheck reads. DA lines may end
+# with a checksum, and the block of BRDA lines may be prefixed with 'e' for exception branches.
+_FIRST_LINE = re.compile(rb'\s*(?:TN|SF):')
+_SOURCE_FILE = re.compile(rb'^SF:(.*?)\r?$', re.MULTILINE)
+_LINE = re.compile(rb'^DA:([0-9]+),(-?[0-9]+)', re.MULTILINE)
+_BRANCH = re.compile(rb'^BRDA:([0-9]+),[^,\n]*,[^,\n]*,(-|[0-9]+)', re.MULTILINE)
+
+
+class LCOVReader(CoverageReader):
+    """Reader of LCOV tracefiles, as written by lcov, llvm-cov export, c8, nyc and other JavaScript and C++ tools.
+
+    The file is read in chunks which are split into records at end_of_record lines, so the file is never held in
+    memory as a whole. The DA and BRDA lines of each record are matched in bulk rather than line by line. Records of
+    the same source file, such as those of separate tests, are combined in the same way as merging coverage files.
+    Absolute paths of source files under the current directory are made relative to it.
+    """
+    name = 'lcov'
+
+    @classmethod
+    def sniff(cls, head: bytes) -> bool:
+        return _FIRST_LINE.match(head.lstrip(_BYTE_ORDER_MARK)) is not None
+
+    @classmethod
+    def read(cls, filepath: Union[str, Path], compact: bool = False, keep_lines: bool = False) -> BaseCoverageNode:
+        """Read an LCOV tracefile into a covcheck tree.
+
+        :param filepath: Path on disk to an LCOV tracefile, which may be compressed with gzip or zstd, or '-' for
+            stdin.
+        :param compact: Whether to store the tree in a CompactCoverageTree.
+        :param keep_lines: Whether to keep the per-line coverage of each file as the LineCoverage of its node.
+        """
+        if compact and keep_lines:
+            raise ValueError("Compact trees do not keep per-line coverage")
+
+        merged: Dict[str, LineCoverage] = {}
+        with CoverageSource.open(filepath) as f:
+            for record in cls._iter_records(f):
+                source_file, line_coverage = cls._parse_record(record)
+                if source_file in merged:
+                    line_coverage = merged[source_file].union(line_coverage)
+                merged[source_file] = line_coverage
+
+        file_nodes = (cls._file_node(source_file, line_coverage, keep_lines)
+                      for source_file, line_coverage in merged.items())
+        return cls._build_tree(file_nodes, compact=compact)
+
+    @classmethod
+    def _iter_records(cls, f: BinaryReader) -> Iterator[bytes]:
+        """Split a tracefile into records, without their end_of_record lines."""
+        # Chunks are cut after their last newline, so that an end_of_record line is never split between chunks, and
+        # the data before the last end_of_record is only joined once it is found
+        pending: List[bytes] = []
+        partial_line = b''
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            data = partial_line + chunk
+            split = data.rfind(b'\n') + 1
+            data, partial_line = data[:split], data[split:]
+
+            end = data.rfind(_END_OF_RECORD)
+            if end < 0:
+                pending.append(data)
+                continue
+            end += len(_END_OF_RECORD)
+            pending.append(data[:end])
+            yield from b''.join(pending).split(_END_OF_RECORD)[:-1]
+            pending = [data[end:]]
+
+        pending.append(partial_line)
+        rest = b''.join(pending)
+        end = rest.rfind(_END_OF_RECORD)
+        if end >= 0:
+            yield from rest[:end].split(_END_OF_RECORD)
+            rest = rest[end + len(_END_OF_RECORD):]
+        if rest.strip():
+            raise ValueError("Could not parse LCOV, no end_of_record after the last record")
+
+    @classmethod
+    def _parse_record(cls, record: bytes) -> Tuple[str, LineCoverage]:
+        """Parse the source file and per-line coverage of a record."""
+        source_file_match = _SOURCE_FILE.search(record)
+        if source_file_match is None:
+            raise ValueError("Could not parse LCOV, no SF line in record")
+        source_file = source_file_match.group(1).decode()
+
+        lines = _LINE.findall(record)
+        if len(lines) != record.count(b'\nDA:') + record.startswith(b'DA:'):
+            raise ValueError(f"Could not parse LCOV, invalid DA line in record of {source_file}")
+        branches = _BRANCH.findall(record)
+        if len(branches) != record.count(b'\nBRDA:') + record.startswith(b'BRDA:'):
+            raise ValueError(f"Could not parse LCOV, invalid BRDA line in record of {source_file}")
+
+        line_numbers = [int(line) for line, _ in lines]
+        covered_line_numbers = [int(line) for line, hits in lines if hits != b'0' and not hits.startswith(b'-')]
+        branches_total = Counter(int(line) for line, _ in branches)
+        branches_covered = Counter(int(line) for line, taken in branches if taken not in (b'-', b'0'))
+
+        line_coverage = LineCoverage.from_lines(
+            line_numbers,
+            covered_line_numbers,
+            ((line, branches_covered[line], total) for line, total in branches_total.items()),
+        )
+        return source_file, line_coverage
+
+    @classmethod
+    def _file_node(cls, source_file: str, line_coverage: LineCoverage, keep_lines: bool) -> FileNode:
+        path = Path(source_file)
+        if path.is_absolute():
+            cwd = Path.cwd()
+            path = path.relative_to(cwd) if cwd in path.parents else path.relative_to(path.anchor)
+
+        node = CoverageNode(
+            path.name,
+            node_type=CoverageNodeType.FILE,
+            summary=line_coverage.summary,
+            line_coverage=line_coverage if keep_lines else None,
+        )
+        return (path.parent if len(path.parts) > 1 else None), node
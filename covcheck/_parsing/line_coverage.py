@@ -0,0 +1,194 @@
+"""Per-line coverage of a file."""
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+from covcheck._parsing.coverage_summary import CoverageSummary
+
+
+class LineCoverage:
+    """Per-line coverage of a file.
+
+    Measured and covered lines are stored as bitmaps in Python ints, where bit n is set for line number n, so set
+    operations on lines run over whole machine words at a time. Lines with branches are stored in a sorted array,
+    with parallel arrays of covered and total branch counts.
+    """
+    __slots__ = ('lines', 'covered', 'branch_lines', 'branches_covered', 'branches_total')
+
+    def __init__(
+        self,
+        lines: int = 0,
+        covered: int = 0,
+        branch_lines: Optional['array[int]'] = None,
+        branches_covered: Optional['array[int]'] = None,
+        branches_total: Optional['array[int]'] = None,
+    ):
+        """Construct LineCoverage.
+
+        :param lines: Bitmap of measured line numbers.
+        :param covered: Bitmap of covered line numbers.
+        :param branch_lines: Sorted line numbers of lines with branches.
+        :param branches_covered: Number of covered branches of each line in branch_lines.
+        :param branches_total: Number of branches of each line in branch_lines.
+        """
+        self.lines = lines
+        self.covered = covered
+        self.branch_lines = branch_lines if branch_lines is not None else array('l')
+        self.branches_covered = branches_covered if branches_covered is not None else array('l')
+        self.branches_total = branches_total if branches_total is not None else array('l')
+
+    @classmethod
+    def from_lines(
+        cls,
+        line_numbers: Iterable[int],
+        covered_line_numbers: Iterable[int],
+        branches: Iterable[Tuple[int, int, int]] = (),
+    ) -> 'LineCoverage':
+        """Create LineCoverage from line numbers.
+
+        :param line_numbers: Measured line numbers.
+        :param covered_line_numbers: Covered line numbers.
+        :param branches: Line number, covered branch count and total branch count of each line with branches.
+        """
+        sorted_branches = sorted(branches)
+        return cls(
+            _bitmap(line_numbers),
+            _bitmap(covered_line_numbers),
+            array('l', (line for line, _, _ in sorted_branches)),
+            array('l', (covered for _, covered, _ in sorted_branches)),
+            array('l', (total for _, _, total in sorted_branches)),
+        )
+
+    @property
+    def summary(self) -> CoverageSummary:
+        """Get a CoverageSummary of the lines.
+
+        :return: CoverageSummary of the lines.
+        """
+        return CoverageSummary(
+            bin(self.lines).count('1'),
+            bin(self.covered).count('1'),
+            sum(self.branches_total),
+            sum(self.branches_covered),
+        )
+
+    @property
+    def line_numbers(self) -> List[int]:
+        """Get the sorted measured line numbers.
+
+        :return: Measured line numbers.
+        """
+        return _line_numbers(self.lines)
+
+    @property
+    def covered_line_numbers(self) -> List[int]:
+        """Get the sorted covered line numbers.
+
+        :return: Covered line numbers.
+        """
+        return _line_numbers(self.covered)
+
+    @property
+    def missing_line_numbers(self) -> List[int]:
+        """Get the sorted measured line numbers that are not covered.
+
+        :return: Missing line numbers.
+        """
+        return _line_numbers(self.lines & ~self.covered)
+
+    def union(self, other: 'LineCoverage') -> 'LineCoverage':
+        """Combine with the coverage of the same file from another run.
+
+        A line is covered if it was covered in either run. Individual branches are not identified by line counts, so
+        the covered branches of a line in either run are assumed to include those of the other run.
+
+        :param other: LineCoverage of the same file from another run.
+        :return: Combined LineCoverage.
+        """
+        branches = dict(zip(self.branch_lines, zip(self.branches_covered, self.branches_total)))
+        for line, covered, total in zip(other.branch_lines, other.branches_covered, other.branches_total):
+            if line in branches:
+                existing_covered, existing_total = branches[line]
+                branches[line] = (max(covered, existing_covered), max(total, existing_total))
+            else:
+                branches[line] = (covered, total)
+
+        branch_lines = sorted(branches)
+        return LineCoverage(
+            self.lines | other.lines,
+            self.covered | other.covered,
+            array('l', branch_lines),
+            array('l', (branches[line][0] for line in branch_lines)),
+            array('l', (branches[line][1] for line in branch_lines)),
+        )
+
+    def intersection(self, other: 'LineCoverage') -> 'LineCoverage':
+        """Keep the coverage of the lines that are also measured in other.
+
+        :param other: LineCoverage of the lines to keep.
+        :return: LineCoverage of the common lines.
+        """
+        return self.restrict(other.lines)
+
+    def in_range(self, start: int, end: int) -> 'LineCoverage':
+        """Keep the coverage of the lines in a range.
+
+        :param start: First line number of the range.
+        :param end: Line number after the end of the range.
+        :return: LineCoverage of the lines in the range.
+        """
+        if end <= start:
+            return LineCoverage()
+
+        mask = ((1 << (end - start)) - 1) << start
+        low = bisect_left(self.branch_lines, start)
+        high = bisect_left(self.branch_lines, end)
+        return LineCoverage(
+            self.lines & mask,
+            self.covered & mask,
+            self.branch_lines[low:high],
+            self.branches_covered[low:high],
+            self.branches_total[low:high],
+        )
+
+    def restrict(self, mask: int) -> 'LineCoverage':
+        """Keep the coverage of the lines set in a bitmap.
+
+        :param mask: Bitmap of the line numbers to keep.
+        :return: LineCoverage of the lines in mask.
+        """
+        kept_lines = set(_line_numbers(_bitmap(self.branch_lines) & mask))
+        kept = [index for index, line in enumerate(self.branch_lines) if line in kept_lines]
+        return LineCoverage(
+            self.lines & mask,
+            self.covered & mask,
+            array('l', (self.branch_lines[index] for index in kept)),
+            array('l', (self.branches_covered[index] for index in kept)),
+            array('l', (self.branches_total[index] for index in kept)),
+        )
+
+
+def _bitmap(line_numbers: Iterable[int]) -> int:
+    """Build a bitmap with bit n set for each line number n."""
+    bits = bytearray()
+    for line_number in line_numbers:
+        index = line_number >> 3
+        if index >= len(bits):
+            bits.extend(bytes(index + 1 - len(bits)))
+        bits[index] |= 1 << (line_number & 7)
+    return int.from_bytes(bits, 'little')
+
+
+# Bit offsets set in each byte value, for decoding bitmaps a byte at a time
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def _line_numbers(bitmap: int) -> List[int]:
+    """Decode the sorted line numbers set in a bitmap."""
+    line_numbers: List[int] = []
+    for index, value in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+        if value:
+            offset = index << 3
+            line_numbers.extend(offset + bit for bit in _BYTE_BITS[value])
+    return line_numbers
@@ -0,0 +1,147 @@
+"""Path index of a coverage tree."""
+
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from covcheck._parsing.coverage_node import BaseCoverageNode
+from covcheck._parsing.coverage_summary import CoverageSummary
+
+_MAGIC_CHARACTERS = '*?['
+
+
+class PathIndex:
+    """Index of the nodes of a coverage tree by their paths relative to the root, such as 'covcheck/_cli/main.py'.
+
+    The index is a snapshot of the tree, so the tree should not be modified after the index is built.
+    """
+    __slots__ = ('_nodes', '_sorted_paths')
+
+    def __init__(self, root: BaseCoverageNode):
+        """Build the index of a coverage tree in a single traversal.
+
+        :param root: Root of the coverage tree, which has the path ''.
+        """
+        nodes: Dict[str, BaseCoverageNode] = {'': root}
+        stack: List[Tuple[str, BaseCoverageNode]] = [('', root)]
+        while stack:
+            path, node = stack.pop()
+            for child in node.children():
+                child_path = _join(path, child.name)
+                nodes[child_path] = child
+                stack.append((child_path, child))
+
+        self._nodes = nodes
+        self._sorted_paths: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, path: str) -> Optional[BaseCoverageNode]:
+        """Get the node at a path.
+
+        :param path: Path relative to the root of the tree.
+        :return: CoverageNode at the path, or None if there is no node at the path.
+        """
+        return self._nodes.get(_normalize(path))
+
+    def glob(self, pattern: str) -> CoverageSummary:
+        """Get the aggregated summary of the nodes matching a glob pattern.
+
+        Each path component is matched with fnmatch, and '**' matches any number of components. Only the components
+        after the first one with wildcards are matched against the children of nodes, and nodes under a matching node
+        are not counted twice.
+
+        :param pattern: Glob pattern relative to the root of the tree, such as 'services/*/handlers'.
+        :return: Aggregated CoverageSummary of the matching nodes.
+        """
+        parts = [part for part in _normalize(pattern).split('/') if part]
+
+        # Look up the components before the first wildcard directly
+        n_literal = 0
+        while n_literal < len(parts) and not any(character in parts[n_literal] for character in _MAGIC_CHARACTERS):
+            n_literal += 1
+        start_path = '/'.join(parts[:n_literal])
+        start = self._nodes.get(start_path)
+        if start is None:
+            return CoverageSummary(0, 0, 0, 0)
+
+        return _sum_summaries(_outermost(_match(start_path, start, parts[n_literal:])))
+
+    def prefix(self, prefix: str) -> CoverageSummary:
+        """Get the aggregated summary of the nodes whose paths start with a string prefix.
+
+        For example, the prefix 'services/pay' matches both 'services/payments' and 'services/payroll'. Nodes under a
+        matching node are not counted twice.
+
+        :param prefix: Prefix of paths relative to the root of the tree.
+        :return: Aggregated CoverageSummary of the matching nodes.
+        """
+        prefix = _normalize(prefix)
+        if self._sorted_paths is None:
+            self._sorted_paths = sorted(self._nodes)
+        sorted_paths = self._sorted_paths
+
+        matches = []
+        for index in range(bisect_left(sorted_paths, prefix), len(sorted_paths)):
+            path = sorted_paths[index]
+            if not path.startswith(prefix):
+                break
+            matches.append((path, self._nodes[path]))
+
+        return _sum_summaries(_outermost(matches))
+
+
+def _match(path: str, node: BaseCoverageNode, parts: List[str]) -> Iterator[Tuple[str, BaseCoverageNode]]:
+    """Yield the paths and nodes of the descendants of a node matching the remaining components of a glob pattern."""
+    if not parts:
+        yield path, node
+        return
+
+    part = parts[0]
+    if part == '**':
+        # '**' matches no components, or one more component followed by '**' again
+        yield from _match(path, node, parts[1:])
+        for child in node.children():
+            yield from _match(_join(path, child.name), child, parts)
+        return
+
+    for child in node.children():
+        if fnmatchcase(child.name, part):
+            yield from _match(_join(path, child.name), child, parts[1:])
+
+
+def _outermost(matches: Iterable[Tuple[str, BaseCoverageNode]]) -> List[BaseCoverageNode]:
+    """Get the matching nodes that are not under another matching node, whose summaries already include them."""
+    nodes = dict(matches)
+    if '' in nodes:
+        return [nodes['']]
+
+    outermost = []
+    for path in nodes:
+        if not any(path[:index] in nodes for index, character in enumerate(path) if character == '/'):
+            outermost.append(nodes[path])
+    return outermost
+
+
+def _join(path: str, name: str) -> str:
+    return f'{path}/{name}' if path else name
+
+
+def _normalize(path: str) -> str:
+    """Normalize a relative path to the form used as keys of the index."""
+    path = path.replace('\\', '/').strip('/')
+    while path.startswith('./'):
+        path = path[2:]
+    return '' if path == '.' else path
+
+
+def _sum_summaries(nodes: Iterable[BaseCoverageNode]) -> CoverageSummary:
+    summary = CoverageSummary(0, 0, 0, 0)
+    for node in nodes:
+        node_summary = node.summary
+        summary.n_lines += node_summary.n_lines
+        summary.n_lines_covered += node_summary.n_lines_covered
+        summary.n_branches += node_summary.n_branches
+        summary.n_branches_covered += node_summary.n_branches_covered
+    return summary
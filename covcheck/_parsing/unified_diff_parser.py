@@ -0,0 +1,127 @@
+"""Unified diff parser."""
+
+import re
+
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+_HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+# Escape sequences of paths quoted by git, such as "b/caf\303\251.py", which are octal bytes or C escapes
+_QUOTED_ESCAPE = re.compile(rb'\\([0-7]{3}|.)', re.DOTALL)
+_C_ESCAPES = {b'a': b'\a', b'b': b'\b', b't': b'\t', b'n': b'\n', b'v': b'\v', b'f': b'\f', b'r': b'\r'}
+
+
+class UnifiedDiffParser:
+    """Parser for the changed lines of unified diffs, such as the output of git diff."""
+    @classmethod
+    def parse(cls, filepath: Union[str, Path]) -> Dict[str, int]:
+        """Parse the changed lines of a unified diff file.
+
+        :param filepath: Path on disk to a unified diff file.
+        :return: Bitmap of the changed line numbers of each changed file, keyed by its path in the new version.
+        """
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            return cls.parse_lines(f)
+
+    @classmethod
+    def parse_git(cls, revision_range: str, cwd: Optional[Union[str, Path]] = None) -> Dict[str, int]:
+        """Parse the changed lines of a git revision range, such as 'main...HEAD', in a local git repository.
+
+        :param revision_range: Revision or revision range to pass to git diff.
+        :param cwd: Directory within the git repository, defaulting to the working directory.
+        :return: Bitmap of the changed line numbers of each changed file, keyed by its path in the new version.
+        """
+        import subprocess  # pylint: disable=import-outside-toplevel
+
+        # Prefixes are passed explicitly, as the diff.noprefix and diff.mnemonicPrefix settings change them
+        command = ['git', 'diff', '--no-color', '--no-ext-diff', '--unified=0', '--src-prefix=a/', '--dst-prefix=b/',
+                   revision_range, '--']
+        try:
+            process = subprocess.run(command, cwd=cwd, capture_output=True, check=False)
+        except OSError as e:
+            raise ValueError(f"Could not run git diff: {e}") from e
+        if process.returncode != 0:
+            error = process.stderr.decode('utf-8', errors='replace').strip()
+            raise ValueError(f"Could not run git diff {revision_range}: {error}")
+        return cls.parse_lines(process.stdout.decode('utf-8', errors='replace').splitlines())
+
+    @classmethod
+    def parse_lines(cls, lines: Iterable[str]) -> Dict[str, int]:
+        """Parse the changed lines of the lines of a unified diff.
+
+        Only added and modified lines are changed lines of the new version, so files that are deleted, or from which
+        lines are only removed, are left out.
+
+        :param lines: Lines of a unified diff.
+        :return: Bitmap of the changed line numbers of each changed file, keyed by its path in the new version.
+        """
+        changed_lines: Dict[str, int] = {}
+        filepath = None  # type: Optional[str]
+        n_old_remaining = n_new_remaining = 0
+        line_number = 0
+
+        # Runs of consecutive added lines are added to the bitmap at once
+        run_start = run_end = 0
+
+        for line in lines:
+            line = line.rstrip('\r\n')
+
+            if n_old_remaining > 0 or n_new_remaining > 0:
+                if line.startswith('+'):
+                    if line_number != run_end:
+                        cls._add_run(changed_lines, filepath, run_start, run_end)
+                        run_start = line_number
+                    line_number += 1
+                    run_end = line_number
+                    n_new_remaining -= 1
+                elif line.startswith('-'):
+                    n_old_remaining -= 1
+                elif not line.startswith('\\'):
+                    line_number += 1
+                    n_old_remaining -= 1
+                    n_new_remaining -= 1
+                continue
+
+            if line.startswith('+++ '):
+                cls._add_run(changed_lines, filepath, run_start, run_end)
+                run_start = run_end = 0
+                filepath = cls._new_filepath(line[4:])
+            elif line.startswith('@@'):
+                match = _HUNK_HEADER.match(line)
+                if match is None:
+                    raise ValueError(f"Could not parse diff hunk header: {line}")
+                old_count, new_start, new_count = match.groups()
+                n_old_remaining = int(old_count) if old_count is not None else 1
+                n_new_remaining = int(new_count) if new_count is not None else 1
+                line_number = int(new_start)
+
+        cls._add_run(changed_lines, filepath, run_start, run_end)
+        return changed_lines
+
+    @classmethod
+    def _new_filepath(cls, header: str) -> Optional[str]:
+        """Get the path of the new version of a file from a '+++' header, or None for deleted files."""
+        filepath = header.split('\t', 1)[0]
+        if filepath == '/dev/null':
+            return None
+        if filepath.startswith('"') and filepath.endswith('"'):
+            filepath = cls._unquote(filepath[1:-1])
+        return filepath[2:] if filepath.startswith('b/') else filepath
+
+    @classmethod
+    def _unquote(cls, quoted: str) -> str:
+        """Unescape a path quoted by git, whose non-ASCII bytes are escaped in octal unless core.quotePath is false."""
+        def unescape(match: 're.Match[bytes]') -> bytes:
+            escape = match.group(1)
+            if len(escape) == 3:
+                return bytes([int(escape, 8)])
+            return _C_ESCAPES.get(escape, escape)
+
+        return _QUOTED_ESCAPE.sub(unescape, quoted.encode('utf-8')).decode('utf-8', errors='replace')
+
+    @classmethod
+    def _add_run(cls, changed_lines: Dict[str, int], filepath: Optional[str], start: int, end: int) -> None:
+        if filepath is None or end <= start:
+            return
+        changed_lines[filepath] = changed_lines.get(filepath, 0) | ((1 << (end - start)) - 1) << start
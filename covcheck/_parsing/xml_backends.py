@@ -0,0 +1,336 @@
+"""XML parser backends for coverage files."""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from importlib.util import find_spec
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Type
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element, ParseError
+from xml.parsers import expat
+
+from covcheck._parsing.coverage_source import BinaryReader
+
+LXML_INSTALLED = find_spec('lxml') is not None
+
+# Attributes of a <class> element, and the attributes of each child of its <lines> element, or None if it has none
+ClassData = Tuple[Mapping[str, str], Optional[Iterable[Mapping[str, str]]]]
+
+_CHUNK_SIZE = 1 << 20
+
+
+class XMLBackend(ABC):
+    """Parser of the <class> elements of XML coverage files.
+
+    Backends yield the attributes of each <class> element nested under the first <packages> element of the file, and
+    the first <classes> element of each <package>, along with the attributes of the children of its first <lines>
+    element. Every backend yields the same classes for the same file, and raises the same errors for files that are
+    missing any of these elements. Malformed XML raises xml.etree.ElementTree.ParseError.
+    """
+    name = ''
+    # Whether memory use stays flat regardless of the size of the file
+    streaming = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        # Backends are used through their classmethods without being instantiated, so abstract methods are checked
+        # when a backend is defined
+        super().__init_subclass__(**kwargs)
+        missing = [name for name in dir(cls) if getattr(getattr(cls, name, None), '__isabstractmethod__', False)]
+        if missing:
+            raise TypeError(f"XML backend {cls.__name__} does not implement {', '.join(missing)}")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Get whether the dependencies of the backend are installed."""
+        return True
+
+    @classmethod
+    @abstractmethod
+    def iter_classes(cls, f: BinaryReader) -> Iterator[ClassData]:
+        """Parse the <class> elements of an XML coverage file.
+
+        The lines of each class must be read before the next class is parsed.
+
+        :param f: Binary file to parse.
+        :return: Iterator over the attributes and lines of each <class> element.
+        """
+
+
+class EtreeBackend(XMLBackend):
+    """Backend parsing the whole file into an ElementTree."""
+    name = 'etree'
+
+    @classmethod
+    def iter_classes(cls, f: BinaryReader) -> Iterator[ClassData]:
+        xml_root = ElementTree.parse(f).getroot()
+        for xml_package in try_get_child(xml_root, 'packages'):
+            for xml_class in try_get_child(xml_package, 'classes'):
+                yield _element_class_data(xml_class)
+
+
+class IterparseBackend(XMLBackend):
+    """Backend parsing the file incrementally with ElementTree.iterparse, discarding each <class> once parsed."""
+    name = 'iterparse'
+    streaming = True
+
+    @classmethod
+    def iter_classes(cls, f: BinaryReader) -> Iterator[ClassData]:
+        return _iter_classes_streaming(ElementTree.iterparse(f, events=('start', 'end')))
+
+
+class LxmlBackend(XMLBackend):
+    """Backend parsing the file incrementally with lxml.etree.iterparse, discarding each <class> once parsed.
+
+    Only the end events of <package> and <class> elements reach Python, and the nesting of each is checked by walking
+    up the tree, so <line> elements are only visited when their class is parsed.
+    """
+    name = 'lxml'
+    streaming = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return LXML_INSTALLED
+
+    @classmethod
+    def iter_classes(cls, f: BinaryReader) -> Iterator[ClassData]:
+        if not LXML_INSTALLED:
+            raise ImportError("The lxml parser requires the lxml package. Please 'pip install lxml'.")
+        import lxml.etree  # pylint: disable=import-outside-toplevel
+
+        xml_events = lxml.etree.iterparse(
+            f,
+            events=('end', ),
+            tag=('package', 'class'),
+            remove_comments=True,
+            remove_pis=True,
+            resolve_entities=False,
+            huge_tree=True,
+        )
+        xml_packages = None
+        xml_classes = None
+        try:
+            for _, xml_element in xml_events:
+                xml_parent = xml_element.getparent()
+                if xml_element.tag == 'class':
+                    if xml_parent is not xml_classes:
+                        xml_classes = cls._find_classes(xml_parent)
+                    if xml_classes is not None:
+                        yield _element_class_data(xml_element)
+                elif xml_parent is not None:
+                    if xml_packages is None:
+                        xml_packages = _find_packages(xml_parent)
+                    if xml_parent is not xml_packages:
+                        continue
+                    if xml_element.find('classes') is None:
+                        raise ValueError("Could not parse coverage XML, no attribute 'classes'")
+                else:
+                    continue
+
+                # Drop the finished element, and any preceding it, from the partially built XML tree
+                xml_element.clear()
+                while xml_element.getprevious() is not None:
+                    del xml_parent[0]
+        except lxml.etree.XMLSyntaxError as e:
+            raise ParseError(str(e)) from e
+
+        try_get_child(xml_events.root, 'packages')
+
+    @classmethod
+    def _find_classes(cls, xml_classes: Any) -> Any:
+        """Get a <classes> element if it is the first of its package, under the first <packages> of the file."""
+        if xml_classes is None or xml_classes.tag != 'classes':
+            return None
+        xml_package = xml_classes.getparent()
+        if xml_package is None or xml_package.find('classes') is not xml_classes:
+            return None
+        xml_packages = xml_package.getparent()
+        if xml_packages is None or _find_packages(xml_packages) is not xml_packages:
+            return None
+        return xml_classes
+
+
+def _find_packages(xml_element: Any) -> Any:
+    """Get the first <packages> element of the file, given an element at depth 2."""
+    xml_root = xml_element.getparent()
+    if xml_root is None or xml_root.getparent() is not None:
+        return None
+    return xml_root.find('packages')
+
+
+class ExpatBackend(XMLBackend):
+    """Backend parsing the file with expat callbacks, without building Element objects.
+
+    The attributes of each element are the dictionaries created by expat, and only those of <class> elements and of
+    their lines are kept, until the class is parsed.
+    """
+    name = 'expat'
+    streaming = True
+
+    @classmethod
+    def iter_classes(cls, f: BinaryReader) -> Iterator[ClassData]:
+        handler = _ExpatHandler()
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = handler.start
+        parser.EndElementHandler = handler.end
+
+        try:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                parser.Parse(chunk, False)
+                while handler.classes:
+                    yield handler.classes.popleft()
+            parser.Parse(b'', True)
+        except expat.ExpatError as e:
+            error = ParseError(str(e))
+            error.code = e.code
+            error.position = (e.lineno, e.offset)
+            raise error from e
+        yield from handler.classes
+
+        if not handler.packages_seen:
+            raise ValueError("Could not parse coverage XML, no attribute 'packages'")
+
+
+class _ExpatHandler:  # pylint: disable=too-many-instance-attributes
+    """Expat callbacks tracking the nesting of the elements of an XML coverage file."""
+    __slots__ = ('classes', 'depth', 'packages_seen', 'in_packages', 'in_package', 'package_classes_seen',
+                 'in_classes', 'class_attrib', 'lines', 'in_lines')
+
+    def __init__(self) -> None:
+        self.classes: Deque[ClassData] = deque()
+        self.depth = 0
+        self.packages_seen = False
+        self.in_packages = False
+        self.in_package = False
+        self.package_classes_seen = False
+        self.in_classes = False
+        self.class_attrib: Optional[Dict[str, str]] = None
+        self.lines: Optional[List[Dict[str, str]]] = None
+        self.in_lines = False
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        """Handle the opening tag of an element."""
+        self.depth += 1
+        depth = self.depth
+        # Lines are by far the most common elements, so they are checked first
+        if depth == 7:
+            if self.in_lines:
+                self.lines.append(attrib)  # type: ignore[union-attr]
+        elif depth == 6:
+            if self.class_attrib is not None and self.lines is None and tag == 'lines':
+                self.lines = []
+                self.in_lines = True
+        elif depth == 5:
+            if self.in_classes:
+                self.class_attrib = attrib
+        elif depth == 4:
+            if self.in_package and not self.package_classes_seen and tag == 'classes':
+                self.package_classes_seen = True
+                self.in_classes = True
+        elif depth == 3:
+            if self.in_packages:
+                self.in_package = True
+                self.package_classes_seen = False
+        elif depth == 2 and not self.packages_seen and tag == 'packages':
+            self.packages_seen = True
+            self.in_packages = True
+
+    def end(self, _: str) -> None:
+        """Handle the closing tag of an element."""
+        depth = self.depth
+        self.depth -= 1
+        if depth == 6:
+            self.in_lines = False
+        elif depth == 5:
+            if self.class_attrib is not None:
+                self.classes.append((self.class_attrib, self.lines))
+                self.class_attrib = None
+                self.lines = None
+        elif depth == 4:
+            self.in_classes = False
+        elif depth == 3:
+            if self.in_package and not self.package_classes_seen:
+                raise ValueError("Could not parse coverage XML, no attribute 'classes'")
+            self.in_package = False
+        elif depth == 2:
+            self.in_packages = False
+
+
+# Backends by name, in order of preference for automatic selection, fastest first in benchmarks.bench_parsers
+XML_BACKENDS: Dict[str, Type[XMLBackend]] = {
+    backend.name: backend for backend in (LxmlBackend, ExpatBackend, EtreeBackend, IterparseBackend)
+}
+
+
+def get_backend(name: str = 'auto', streaming: bool = False) -> Type[XMLBackend]:
+    """Get an XML parser backend by name.
+
+    :param name: Name of the backend, or 'auto' for the fastest installed backend.
+    :param streaming: Whether the backend must keep memory use flat regardless of the size of the file.
+    :return: Backend class.
+    """
+    if name == 'auto':
+        return next(backend for backend in XML_BACKENDS.values()
+                    if backend.is_available() and (backend.streaming or not streaming))
+
+    if name not in XML_BACKENDS:
+        raise ValueError(f"Invalid parser ({name}). Must be one of: auto, {', '.join(XML_BACKENDS)}.")
+    backend = XML_BACKENDS[name]
+    if not backend.is_available():
+        raise ImportError(f"The {name} parser requires the {name} package. Please 'pip install {name}'.")
+    if streaming and not backend.streaming:
+        raise ValueError(f"The {name} parser does not support streaming")
+    return backend
+
+
+def try_get_child(xml_element: Element, tag: str) -> Element:
+    """Get the first child of an element with a tag.
+
+    :param xml_element: Parent element.
+    :param tag: Tag of the child.
+    :return: First child with the tag.
+    """
+    for xml_child in xml_element:
+        if xml_child.tag == tag:
+            return xml_child
+    raise ValueError(f"Could not parse coverage XML, no attribute '{tag}'")
+
+
+def _element_class_data(xml_class: Element) -> ClassData:
+    xml_lines = next((xml_child for xml_child in xml_class if xml_child.tag == 'lines'), None)
+    if xml_lines is None:
+        return xml_class.attrib, None
+    return xml_class.attrib, (xml_line.attrib for xml_line in xml_lines)
+
+
+def _iter_classes_streaming(xml_events: Iterable[Tuple[str, Any]]) -> Iterator[ClassData]:
+    # Elements are only complete once their end event is seen, so the path from the root to the current element
+    # is tracked to recognize <class> elements nested under the first <packages> and <classes> elements.
+    xml_path: List[Element] = []
+    xml_packages: Optional[Element] = None
+    xml_classes: Optional[Element] = None
+
+    for event, xml_element in xml_events:
+        if event == 'start':
+            xml_path.append(xml_element)
+            depth = len(xml_path)
+            if depth == 2 and xml_packages is None and xml_element.tag == 'packages':
+                xml_packages = xml_element
+            elif depth == 3 and xml_path[1] is xml_packages:
+                xml_classes = None
+            elif depth == 4 and xml_path[1] is xml_packages and xml_element.tag == 'classes':
+                if xml_classes is None:
+                    xml_classes = xml_element
+            continue
+
+        depth = len(xml_path)
+        if depth == 5 and xml_classes is not None and xml_path[3] is xml_classes:
+            yield _element_class_data(xml_element)
+            # Drop the finished <class> element, and any preceding it, from the partially built XML tree
+            xml_classes.clear()
+        elif depth == 3 and xml_packages is not None and xml_path[1] is xml_packages:
+            if xml_classes is None:
+                raise ValueError("Could not parse coverage XML, no attribute 'classes'")
+            xml_packages.clear()
+        xml_path.pop()
+
+    if xml_packages is None:
+        raise ValueError("Could not parse coverage XML, no attribute 'packages'")
@@ -2,6 +2,8 @@ from pathlib import Path
 
 import pytest
 
+from utilities.coverage_utilities import write_project
+
 
 @pytest.fixture(scope='session')
 def coverage_filepath() -> Path:
@@ -11,3 +13,17 @@ def coverage_filepath() -> Path:
 @pytest.fixture(scope='session')
 def invalid_coverage_filepath() -> Path:
     return Path(__file__).parent / 'coverage_xml' / 'invalid-coverage.xml'
+
+
+@pytest.fixture(autouse=True)
+def fixture_cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Keep the cache of parsed coverage trees of each test separate
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+
+@pytest.fixture(name='project_path')
+def fixture_project_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Project measured with coverage.py, in the current directory like coverage.py reports are written
+    write_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
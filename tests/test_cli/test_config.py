@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 from typing import Any, Dict
 
@@ -96,7 +97,9 @@ class TestConfig:
         coverage_filepath: Path,
         monkeypatch: pytest.MonkeyPatch,
     ) -> None:
-        monkeypatch.setattr(config_module, 'TOML_INSTALLED', False, raising=True)
+        # Python versions before 3.11 read config files with the toml package
+        monkeypatch.setattr(sys, 'version_info', (3, 10, 0, 'final', 0))
+        monkeypatch.setitem(sys.modules, 'toml', None)
 
         message = ("--config was passed, but the toml package was not installed. "
                    "Please 'pip install toml' before running with --config.")
@@ -152,3 +155,45 @@ class TestConfig:
         captured = capsys.readouterr()
         expected = "Group fake-group not found in config"
         assert expected in captured.err
+
+    def test_create_groups(
+        self,
+        example_group_config_filepath: Path,
+        coverage_filepath: Path,
+    ) -> None:
+        configs = config_module.Config.create_groups(
+            coverage_filepath,
+            example_group_config_filepath,
+            'all',
+            branch=8.0,
+        )
+        assert list(configs) == ['unit']
+        assert configs['unit'].line == 6.0
+        assert configs['unit'].branch == 8.0
+
+        configs = config_module.Config.create_groups(coverage_filepath, example_group_config_filepath, 'unit,')
+        assert list(configs) == ['unit']
+
+    def test_create_groups_missing(
+        self,
+        example_config_filepath: Path,
+        example_group_config_filepath: Path,
+        coverage_filepath: Path,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        with pytest.raises(SystemExit):
+            config_module.Config.create_groups(coverage_filepath, example_config_filepath, 'all')
+        assert "No groups found in config" in capsys.readouterr().err
+
+        with pytest.raises(SystemExit):
+            config_module.Config.create_groups(coverage_filepath, example_group_config_filepath, 'unit,fake-group')
+        assert "Group fake-group not found in config" in capsys.readouterr().err
+
+    def test_create_groups_no_config(self, coverage_filepath: Path, capsys: pytest.CaptureFixture) -> None:
+        with pytest.raises(SystemExit):
+            config_module.Config.create_groups(coverage_filepath, None, 'all')
+        assert "No groups found in config" in capsys.readouterr().err
+
+        with pytest.raises(SystemExit):
+            config_module.Config.create_groups(coverage_filepath, None, 'unit,service', line=50.0)
+        assert "Group unit not found in config" in capsys.readouterr().err
@@ -1,15 +1,24 @@
+import gzip
+import io
 import json
+import pstats
+import subprocess
+import sys
+import tracemalloc
 from pathlib import Path
+from typing import Any, Dict, List
 
 import pytest
 
 from utilities.process_utilities import run_command
 
-from covcheck._cli.main import validate_coverage
+from covcheck import CoverageNodeType, CoverageResult, CoverageSummary
+from covcheck._cli.main import run
+from covcheck._cli.validate import validate_coverage, validate_groups
 from covcheck._cli.config import Config
 
 
-class TestMain:
+class TestMain:  # pylint: disable=too-many-public-methods
     def test_run(self) -> None:
         command = ["covcheck", "--help"]
         output = run_command(command)
@@ -17,6 +26,27 @@ class TestMain:
         assert len(output.stderr) == 0
         assert "usage: covcheck" in output.stdout
 
+    @pytest.mark.parametrize('args, unexpected', [
+        (['--help'], ['covcheck._cli.validate', 'covcheck._parsing', 'xml', 'json', 'lxml', 'toml', 'tomllib']),
+        (['{coverage_filepath}', '--line', '0', '--no-cache'],
+         ['concurrent.futures', 'sqlite3', 'csv', 'subprocess', 'tempfile', 'coverage', 'pyarrow', 'zstandard',
+          'toml', 'cProfile', 'tracemalloc']),
+    ])
+    def test_run_imports(self, coverage_filepath: Path, args: List[str], unexpected: List[str]) -> None:
+        # Modules which the CLI does not need for these arguments must not be imported, to keep startup fast
+        script = ("import sys\nfrom covcheck._cli.main import run\nsys.argv[0] = 'covcheck'\n"
+                  "try:\n    run()\nexcept SystemExit:\n    pass\nprint(' '.join(sys.modules))")
+        args = [arg.format(coverage_filepath=coverage_filepath) for arg in args]
+        output = run_command([sys.executable, '-c', script, *args])
+
+        modules = output.stdout.splitlines()[-1].split()
+        assert 'covcheck._cli.main' in modules
+        # Modules imported at interpreter startup, such as by .pth files of the environment, are not covcheck's
+        startup_output = run_command([sys.executable, '-c', "import sys\nprint(' '.join(sys.modules))"])
+        startup_modules = set(startup_output.stdout.split())
+        for module in set(modules) - startup_modules:
+            assert not any(module == name or module.startswith(f'{name}.') for name in unexpected), module
+
     def test_validate_coverage_silent(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
         validate_coverage(Config(coverage_filepath, line=0, branch=0, silent=True))
 
@@ -30,6 +60,76 @@ class TestMain:
         assert "Line coverage passed: 75.62" in captured.out
         assert "Branch coverage passed: 50.57%" in captured.out
 
+    def test_validate_coverage_streaming(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        validate_coverage(Config.create(coverage_filepath, line=0, branch=0, streaming=True))
+
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62" in captured.out
+        assert "Branch coverage passed: 50.57%" in captured.out
+
+    def test_validate_coverage_trust_header(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        validate_coverage(Config.create(coverage_filepath, line=0, branch=0, trust_header=True))
+
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62" in captured.out
+        assert "Branch coverage passed: 50.57%" in captured.out
+
+    def test_validate_coverage_verify_header_fail(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                                  coverage_filepath: Path) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(coverage_filepath, 'r', encoding='utf-8') as f:
+            xml = f.read()
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(xml.replace('lines-valid="283"', 'lines-valid="284"'))
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(filepath, line=0, verify_header=True))
+
+        captured = capsys.readouterr()
+        assert "Coverage header mismatch in <coverage>: lines-valid=284, counted 283" in captured.err
+        assert "Line coverage passed: 75.62" in captured.out
+
+    def test_validate_coverage_jobs(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        validate_coverage(Config.create(coverage_filepath, line=0, jobs=2))
+
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62" in captured.out
+
+    def test_validate_coverage_jobs_streaming(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, jobs=2, streaming=True))
+
+        captured = capsys.readouterr()
+        assert "--jobs cannot be combined with --streaming." in captured.err
+
+    def test_json_output_compact(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        output_filepath = tmp_path / 'coverage.json'
+        compact_output_filepath = tmp_path / 'coverage-compact.json'
+        validate_coverage(Config(coverage_filepath, output=output_filepath))
+        validate_coverage(Config.create(coverage_filepath, output=compact_output_filepath, compact=True))
+
+        with open(output_filepath, 'r', encoding='utf-8') as f, \
+                open(compact_output_filepath, 'r', encoding='utf-8') as f_compact:
+            assert json.load(f_compact) == json.load(f)
+
+    def test_validate_coverage_merge(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                     coverage_filepath: Path) -> None:
+        for i in range(3):
+            (tmp_path / f'coverage-{i}.xml').write_bytes(coverage_filepath.read_bytes())
+
+        validate_coverage(Config([coverage_filepath, str(tmp_path / 'coverage-*.xml')], line=0, branch=0))
+
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62" in captured.out
+        assert "Branch coverage passed: 50.57%" in captured.out
+
+    def test_validate_coverage_merge_no_match(self, capsys: pytest.CaptureFixture, tmp_path: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config(str(tmp_path / 'coverage-*.xml'), line=0))
+
+        captured = capsys.readouterr()
+        assert "No coverage files match" in captured.err
+
     def test_validate_coverage_verbose_line(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
         validate_coverage(Config(coverage_filepath, line=0))
 
@@ -48,7 +148,8 @@ class TestMain:
             validate_coverage(Config(coverage_filepath))
 
         captured = capsys.readouterr()
-        expected = "Must specify --line, --branch, or --output_filepath."
+        expected = ("Must specify --line, --branch, --output, --export, --baseline, "
+                    "or [tool.covcheck.rules] in the config.")
         assert expected in captured.err
 
     def test_validate_coverage_fail(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
@@ -67,9 +168,404 @@ class TestMain:
         expected = "Invalid threshold for line coverage (101). Must be between 0 and 100."
         assert expected in captured.err
 
+    @pytest.mark.parametrize('settings, expected', [
+        ({'output': 'coverage.json', 'output_format': 'yaml'}, "Invalid output format (yaml)."),
+        ({'export': 'coverage.xlsx', 'export_format': 'xlsx'}, "Invalid export format (xlsx)."),
+        ({'diff': 'changes.diff', 'compact': True}, "--diff and --diff-range cannot be combined with --compact."),
+        ({'rules': {'covcheck/**': {'line': 101}}}, "Invalid threshold for line coverage (101) of rule covcheck/**."),
+        ({'cache_size': -1}, "Invalid cache size (-1). Must be at least 0."),
+        ({'cache_key': 'mtime'}, "Invalid cache key (mtime). Must be 'content' or 'stat'."),
+        ({'jobs': 0}, "Invalid number of jobs (0). Must be at least 1."),
+    ])
+    def test_validate_coverage_invalid_settings(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                                monkeypatch: pytest.MonkeyPatch, coverage_filepath: Path,
+                                                settings: Dict[str, Any], expected: str) -> None:
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, **settings))
+        assert expected in capsys.readouterr().err
+
+    def test_validate_coverage_invalid_inputs(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create('-', line=0, jobs=2))
+        assert "--jobs cannot be combined with coverage read from stdin." in capsys.readouterr().err
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create([coverage_filepath, coverage_filepath], line=0, trust_header=True))
+        expected = "--trust-header and --verify-header cannot be used with multiple coverage files."
+        assert expected in capsys.readouterr().err
+
+        with pytest.raises(SystemExit):
+            validate_groups({})
+        assert "No groups to check." in capsys.readouterr().err
+
     def test_json_output(self, tmp_path: Path, coverage_filepath: Path) -> None:
         output_filepath = tmp_path / 'coverage.json'
         validate_coverage(Config(coverage_filepath, output=output_filepath))
 
         with open(output_filepath, 'r', encoding='utf-8') as f:
             json.load(f)
+
+    def test_validate_coverage_diff(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                    coverage_filepath: Path) -> None:
+        diff_filepath = tmp_path / 'changes.diff'
+        diff_filepath.write_text('--- a/covcheck/_cli/main.py\n+++ b/covcheck/_cli/main.py\n@@ -3,0 +3,1 @@\n+added\n'
+                                 '@@ -20,0 +28,3 @@\n+added\n+added\n+added\n', encoding='utf-8')
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=60, branch=0, diff=diff_filepath))
+
+        captured = capsys.readouterr()
+        assert "Diff line coverage (33.33%) below threshold (60%)" in captured.err
+        assert "Diff branch coverage passed: no measured branches changed" in captured.out
+
+    def test_validate_coverage_diff_unmatched(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                              coverage_filepath: Path) -> None:
+        diff_filepath = tmp_path / 'changes.diff'
+        diff_filepath.write_text('+++ b/README.md\n@@ -3,0 +3,1 @@\n+added\n'
+                                 '+++ b/covcheck/_cli/main.py\n@@ -3,0 +3,1 @@\n+added\n', encoding='utf-8')
+        validate_coverage(Config.create(coverage_filepath, line=0, diff=diff_filepath))
+        assert "Changed files not in the coverage file: README.md" in capsys.readouterr().out
+
+        diff_filepath.write_text('+++ b//abs/covcheck/_cli/main.py\n@@ -3,0 +3,1 @@\n+added\n', encoding='utf-8')
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=100, diff=diff_filepath))
+        captured = capsys.readouterr()
+        expected = "None of the 1 changed files are in the coverage file, such as /abs/covcheck/_cli/main.py"
+        assert expected in captured.err
+        assert "Diff line coverage passed" not in captured.out
+
+    def test_validate_coverage_diff_source(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                           monkeypatch: pytest.MonkeyPatch) -> None:
+        # Report of a src layout, with filenames relative to the src directory rather than the root of the repository
+        filepath = tmp_path / 'coverage.xml'
+        filepath.write_text(f'<coverage><sources><source>{tmp_path / "src"}</source></sources><packages><package>'
+                            '<classes><class name="mod.py" filename="pkg/mod.py"><lines><line number="1" hits="1"/>'
+                            '<line number="2" hits="0"/></lines></class></classes></package></packages></coverage>',
+                            encoding='utf-8')
+        diff_filepath = tmp_path / 'changes.diff'
+        diff_filepath.write_text('+++ b/src/pkg/mod.py\n@@ -1,0 +1,1 @@\n+changed\n', encoding='utf-8')
+        monkeypatch.chdir(tmp_path)
+
+        validate_coverage(Config.create(filepath, line=100, diff=diff_filepath))
+        captured = capsys.readouterr()
+        assert "Diff line coverage passed: 100.00%" in captured.out
+        assert "Changed files not in the coverage file" not in captured.out
+
+    def test_validate_coverage_diff_invalid(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                            coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, diff=tmp_path / 'missing.diff'))
+        assert "Could not load diff" in capsys.readouterr().err
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, diff='changes.diff', diff_range='HEAD'))
+        assert "--diff cannot be combined with --diff-range." in capsys.readouterr().err
+
+    def test_validate_coverage_diff_range(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                          monkeypatch: pytest.MonkeyPatch) -> None:
+        def git(*args: str) -> None:
+            subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args], cwd=tmp_path,
+                           check=True, capture_output=True)
+
+        # Diff of LCOV coverage, where line 2 has one of its two branches covered and line 5 is not measured
+        git('init')
+        (tmp_path / 'main.c').write_text('a\nb\nc\nd\ne\n', encoding='utf-8')
+        git('add', 'main.c')
+        git('commit', '-m', 'Add main.c')
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text('SF:main.c\nDA:1,1\nDA:2,1\nDA:3,0\nBRDA:2,0,0,1\nBRDA:2,0,1,0\nend_of_record\n')
+        monkeypatch.chdir(tmp_path)
+
+        (tmp_path / 'main.c').write_text('a\nchanged\nc\nd\ne\n', encoding='utf-8')
+        validate_coverage(Config.create(filepath, line=100, branch=50, diff_range='HEAD'))
+        captured = capsys.readouterr()
+        assert "Diff line coverage passed: 100.00%" in captured.out
+        assert "Diff branch coverage passed: 50.00%" in captured.out
+
+        (tmp_path / 'main.c').write_text('a\nb\nc\nd\nchanged\n', encoding='utf-8')
+        validate_coverage(Config.create(filepath, line=100, branch=100, diff_range='HEAD'))
+        captured = capsys.readouterr()
+        assert "Diff line coverage passed: no measured lines changed" in captured.out
+        assert "Diff branch coverage passed: no measured branches changed" in captured.out
+
+    def test_validate_coverage_rules(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                     coverage_filepath: Path) -> None:
+        config_filepath = tmp_path / 'pyproject.toml'
+        config_filepath.write_text('[tool.covcheck.rules]\n'
+                                   '"covcheck/**" = {line = 90}\n'
+                                   '"covcheck/_cli/*.py" = {line = 10, branch = 50}\n'
+                                   '"tests/**" = {line = 50}\n', encoding='utf-8')
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, config_filepath=config_filepath, line=0))
+
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62" in captured.out
+        assert "Line coverage of covcheck/** (64.25%) below threshold (90%)" in captured.err
+        assert "Branch coverage of covcheck/_cli/*.py (6.90%) below threshold (50%)" in captured.err
+        assert "tests/**" not in captured.err
+
+    def test_validate_coverage_rules_passed(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        validate_coverage(Config.create(coverage_filepath, rules={'covcheck/**': {'line': 50}}))
+        assert "Coverage rules passed: 1 rules" in capsys.readouterr().out
+
+    def test_validate_groups(self, capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch,
+                             coverage_filepath: Path) -> None:
+        parse_calls = []
+        from_xml = CoverageResult.from_xml
+
+        def counting_from_xml(*args: Any, **kwargs: Any) -> CoverageResult:
+            parse_calls.append(args)
+            return from_xml(*args, **kwargs)
+
+        monkeypatch.setattr(CoverageResult, 'from_xml', counting_from_xml)
+        configs = {
+            'unit': Config.create(coverage_filepath, line=90),
+            'service': Config.create(coverage_filepath, line=50, rules={'covcheck/**': {'line': 50}}),
+            'integration': Config.create(coverage_filepath, branch=60),
+        }
+
+        with pytest.raises(SystemExit):
+            validate_groups(configs)
+
+        captured = capsys.readouterr()
+        assert len(parse_calls) == 1
+        assert "Group service:\nCoverage rules passed: 1 rules\nLine coverage passed: 75.62%" in captured.out
+        assert "Line coverage (75.62%) below threshold (90%)" in captured.err
+        assert "One or more quality checks failed in groups: unit, integration." in captured.err
+
+    def test_validate_groups_different_settings(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                                coverage_filepath: Path) -> None:
+        configs = {
+            'unit': Config.create(coverage_filepath, line=90),
+            'service': Config.create(coverage_filepath, line=50, diff_range='HEAD'),
+        }
+        with pytest.raises(SystemExit):
+            validate_groups(configs)
+        assert "Group service has a different diff_range than group unit." in capsys.readouterr().err
+
+        configs['service'] = Config.create(tmp_path / 'other.xml', line=50)
+        with pytest.raises(SystemExit):
+            validate_groups(configs)
+        assert "Group service has a different coverage_filepath than group unit." in capsys.readouterr().err
+
+    def test_run_groups(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        config_filepath = tmp_path / 'pyproject.toml'
+        config_filepath.write_text('[tool.covcheck.group.unit.coverage]\nline = 70\n'
+                                   '[tool.covcheck.group.service.coverage]\nbranch = 40\n', encoding='utf-8')
+
+        output = run_command(["covcheck", str(coverage_filepath), "--config", str(config_filepath), "--group", "all"])
+        assert output.stdout == ("Group unit:\nLine coverage passed: 75.62%\n"
+                                 "Group service:\nBranch coverage passed: 50.57%")
+
+    def test_run_in_process(self, capsys: pytest.CaptureFixture, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+                            coverage_filepath: Path) -> None:
+        config_filepath = tmp_path / 'pyproject.toml'
+        config_filepath.write_text('[tool.covcheck.group.unit.coverage]\nline = 70\n'
+                                   '[tool.covcheck.group.service.coverage]\nbranch = 40\n', encoding='utf-8')
+
+        monkeypatch.setattr(sys, 'argv', ['covcheck', str(coverage_filepath), '--line', '70', '--silent'])
+        run()
+        monkeypatch.setattr(sys, 'argv', ['covcheck', str(coverage_filepath), '--line', '80'])
+        with pytest.raises(SystemExit):
+            run()
+        assert "Line coverage (75.62%) below threshold (80.0%)" in capsys.readouterr().err
+
+        monkeypatch.setattr(sys, 'argv',
+                            ['covcheck', str(coverage_filepath), '--config', str(config_filepath), '--group', 'all'])
+        run()
+        assert capsys.readouterr().out == ("Group unit:\nLine coverage passed: 75.62%\n"
+                                           "Group service:\nBranch coverage passed: 50.57%\n")
+
+    def test_validate_coverage_cache(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                     coverage_filepath: Path) -> None:
+        validate_coverage(Config.create(coverage_filepath, line=0, cache=False))
+        validate_coverage(Config.create(coverage_filepath, line=0, cache_dir=tmp_path / 'no-cache', cache=False))
+        assert not (tmp_path / 'no-cache').exists()
+
+        for _ in range(2):
+            validate_coverage(Config.create(coverage_filepath, line=0, cache_dir=tmp_path / 'cache'))
+        assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+        captured = capsys.readouterr()
+        assert captured.out.count("Line coverage passed: 75.62") == 4
+
+    @pytest.mark.parametrize('output_format', ['compact', 'ndjson'])
+    def test_json_output_format(self, tmp_path: Path, coverage_filepath: Path, output_format: str) -> None:
+        output_filepath = tmp_path / 'coverage.json'
+        validate_coverage(Config.create(coverage_filepath, output=output_filepath, output_format=output_format))
+
+        with open(output_filepath, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == (1 if output_format == 'compact' else 28)
+        assert json.loads(lines[0])['name'] == 'root'
+
+    def test_export(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        export_filepath = tmp_path / 'coverage.csv'
+        validate_coverage(Config.create(coverage_filepath, export=export_filepath))
+
+        with open(export_filepath, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert lines[0] == 'path,node_type,depth,parent,n_lines,n_lines_covered,n_branches,n_branches_covered'
+        assert len(lines) == 1 + len(list(CoverageResult.from_xml(coverage_filepath).tree.walk()))
+
+    @pytest.mark.parametrize('parser', ['auto', 'etree', 'iterparse', 'expat'])
+    def test_validate_coverage_parser(self, capsys: pytest.CaptureFixture, coverage_filepath: Path,
+                                      parser: str) -> None:
+        validate_coverage(Config.create(coverage_filepath, line=0, branch=0, parser=parser, cache=False))
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62%" in captured.out
+
+    def test_validate_coverage_parser_invalid(self, capsys: pytest.CaptureFixture, coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, parser='etree', streaming=True))
+        captured = capsys.readouterr()
+        assert "The etree parser does not support streaming" in captured.err
+
+    def test_validate_coverage_compressed_stdin(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                                coverage_filepath: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        gzip_filepath = tmp_path / 'coverage.xml.gz'
+        with gzip.open(gzip_filepath, 'wb') as f:
+            f.write(coverage_filepath.read_bytes())
+
+        validate_coverage(Config.create(gzip_filepath, line=0))
+        monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip_filepath.read_bytes()))))
+        validate_coverage(Config.create('-', line=0))
+        captured = capsys.readouterr()
+        assert captured.out.count("Line coverage passed: 75.62%") == 2
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(gzip_filepath, line=0, jobs=2))
+        captured = capsys.readouterr()
+        assert "--jobs requires an uncompressed coverage file" in captured.err
+
+    def test_validate_coverage_lcov(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                    monkeypatch: pytest.MonkeyPatch) -> None:
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text('SF:src/main.c\nDA:1,1\nDA:2,1\nDA:3,0\nBRDA:2,0,0,1\nBRDA:2,0,1,0\nend_of_record\n')
+
+        validate_coverage(Config.create(filepath, line=60, branch=50))
+        validate_coverage(Config.create(str(filepath), line=60, file_format='lcov', compact=True))
+        monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BufferedReader(io.BytesIO(filepath.read_bytes()))))
+        validate_coverage(Config.create('-', line=60))
+        captured = capsys.readouterr()
+        assert captured.out.count("Line coverage passed: 66.67%") == 3
+        assert "Branch coverage passed: 50.00%" in captured.out
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create([filepath, filepath], line=60))
+        captured = capsys.readouterr()
+        assert "Only XML coverage files can be merged." in captured.err
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(filepath, line=60, trust_header=True))
+        captured = capsys.readouterr()
+        assert "are only supported for XML coverage files" in captured.err
+
+    def test_validate_coverage_format_invalid(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                              coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, file_format='yaml'))
+        captured = capsys.readouterr()
+        assert "Invalid format (yaml)" in captured.err
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(tmp_path / 'missing.xml', line=0))
+        captured = capsys.readouterr()
+        assert "Could not read coverage file" in captured.err
+
+    def test_validate_coverage_timings(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                       coverage_filepath: Path) -> None:
+        timings_filepath = tmp_path / 'timings.json'
+        validate_coverage(Config.create(coverage_filepath, line=0, output=tmp_path / 'coverage.json', cache=False,
+                                        timings=True, timings_output=timings_filepath))
+        captured = capsys.readouterr()
+        assert "Line coverage passed: 75.62%" in captured.out
+        assert captured.err.splitlines()[0].split()[:3] == ['phase', 'wall', 'ms']
+
+        with open(timings_filepath, 'r', encoding='utf-8') as f:
+            phases = {phase['name']: phase for phase in json.load(f)['phases']}
+        assert list(phases) == ['parse.read', 'parse.xml', 'parse.count', 'parse.build', 'parse', 'load', 'output',
+                                'validate']
+        assert phases['parse']['counts'] == {'classes': 20, 'bytes': coverage_filepath.stat().st_size, 'files': 20,
+                                             'directories': 8, 'lines': 283, 'branches': 87}
+        assert phases['validate']['wall_seconds'] >= phases['load']['wall_seconds'] >= phases['parse']['wall_seconds']
+        assert phases['parse']['peak_memory'] is None
+
+    def test_validate_coverage_timings_fail(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                            coverage_filepath: Path) -> None:
+        timings_filepath = tmp_path / 'timings.json'
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=100, cache=False, timings_output=timings_filepath))
+        captured = capsys.readouterr()
+        assert "phase" not in captured.err
+
+        with open(timings_filepath, 'r', encoding='utf-8') as f:
+            assert json.load(f)['phases'][-1]['name'] == 'validate'
+
+    @pytest.mark.parametrize('profile_type', ['cpu', 'memory'])
+    def test_validate_coverage_profile(self, tmp_path: Path, coverage_filepath: Path, profile_type: str) -> None:
+        profile_filepath = tmp_path / 'covcheck.prof'
+        timings_filepath = tmp_path / 'timings.json'
+        validate_coverage(Config.create(coverage_filepath, line=0, cache=False, profile=profile_filepath,
+                                        profile_type=profile_type, timings_output=timings_filepath))
+
+        with open(timings_filepath, 'r', encoding='utf-8') as f:
+            phases = {phase['name']: phase for phase in json.load(f)['phases']}
+        if profile_type == 'cpu':
+            stats = pstats.Stats(str(profile_filepath))
+            assert any(function[2] == 'parse' for function in stats.stats)  # type: ignore[attr-defined]
+            assert phases['parse']['peak_memory'] is None
+        else:
+            snapshot = tracemalloc.Snapshot.load(str(profile_filepath))
+            assert len(snapshot.traces) > 0
+            assert phases['validate']['peak_memory'] >= phases['parse']['peak_memory'] > 0
+
+    def test_validate_coverage_profile_invalid(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                               coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, line=0, profile=tmp_path / 'covcheck.prof',
+                                            profile_type='disk'))
+        captured = capsys.readouterr()
+        assert "Invalid profile type (disk)" in captured.err
+
+    def test_validate_coverage_baseline(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                        coverage_filepath: Path) -> None:
+        baseline_filepath = tmp_path / 'baseline.json'
+        validate_coverage(Config.create(coverage_filepath, output=baseline_filepath, output_format='compact'))
+        validate_coverage(Config.create(coverage_filepath, baseline=baseline_filepath))
+        captured = capsys.readouterr()
+        assert "Baseline passed: 0 files changed, none regressed" in captured.out
+
+        # Raise the coverage of a file in the baseline, so that the current coverage of the file has dropped from it
+        baseline = CoverageResult.from_xml(coverage_filepath).tree
+        file_path, file_node = next((path, node) for path, node in baseline.walk()
+                                    if node.node_type == CoverageNodeType.FILE and 0 < node.summary.line_rate < 1)
+        summary = file_node.summary
+        file_node.set_summary(CoverageSummary(summary.n_lines, summary.n_lines, summary.n_branches,
+                                              summary.n_branches_covered))
+        with open(baseline_filepath, 'w', encoding='utf-8') as f:
+            json.dump(baseline.serialize(), f)
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, baseline=baseline_filepath))
+        captured = capsys.readouterr()
+        assert f"Coverage regressed from baseline in {file_path}: line coverage 100.00% ->" in captured.err
+        assert "Coverage regressed from baseline in .: line coverage" in captured.err
+
+        validate_coverage(Config.create(coverage_filepath, baseline=baseline_filepath, baseline_tolerance=100))
+        captured = capsys.readouterr()
+        assert "Baseline passed: 1 files changed, none regressed" in captured.out
+
+    def test_validate_coverage_baseline_invalid(self, capsys: pytest.CaptureFixture, tmp_path: Path,
+                                                coverage_filepath: Path) -> None:
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, baseline=tmp_path / 'missing.json'))
+        captured = capsys.readouterr()
+        assert "Could not read baseline" in captured.err
+
+        with pytest.raises(SystemExit):
+            validate_coverage(Config.create(coverage_filepath, baseline=tmp_path / 'missing.json',
+                                            baseline_tolerance=-1))
+        captured = capsys.readouterr()
+        assert "Invalid baseline tolerance (-1)" in captured.err
@@ -0,0 +1,73 @@
+import csv
+import re
+from pathlib import Path
+
+import pytest
+
+from covcheck import CompactCoverageTree
+from covcheck import CoverageExporter
+from covcheck._output import columnar_export
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+class TestCoverageExporter:
+    def test_export_csv(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        for tree in (node, CompactCoverageTree.from_node(node).root):
+            export_filepath = tmp_path / 'coverage.csv'
+            assert CoverageExporter.export(tree, export_filepath, batch_size=4) == 'csv'
+
+            with open(export_filepath, 'r', encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+            assert len(rows) == len(list(node.walk()))
+            assert rows[0]['path'] == ''
+            assert rows[0]['parent'] == ''
+            assert rows[0]['depth'] == '0'
+            assert int(rows[0]['n_lines']) == node.summary.n_lines
+            assert rows[2] == {
+                'path': 'covcheck/__init__.py',
+                'node_type': 'file',
+                'depth': '2',
+                'parent': 'covcheck',
+                'n_lines': '5',
+                'n_lines_covered': '5',
+                'n_branches': '0',
+                'n_branches_covered': '0',
+            }
+
+    def test_iter_batches(self, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        batches = list(CoverageExporter.iter_batches(node, batch_size=5))
+        assert all(len(batch) == 5 for batch in batches[:-1])
+        assert [row[0] for batch in batches for row in batch] == [path for path, _ in node.walk()]
+        assert batches[0][0][3] is None
+
+    def test_export_auto_without_pyarrow(self, tmp_path: Path, coverage_filepath: Path,
+                                         monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(columnar_export, 'PYARROW_INSTALLED', False)
+        node = CoverageXMLParser.parse(coverage_filepath)
+        assert CoverageExporter.export(node, tmp_path / 'coverage') == 'csv'
+        with pytest.raises(ImportError, match="pip install pyarrow"):
+            CoverageExporter.export(node, tmp_path / 'coverage.parquet')
+
+    def test_export_parquet(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        parquet = pytest.importorskip('pyarrow.parquet')
+        node = CoverageXMLParser.parse(coverage_filepath)
+        export_filepath = tmp_path / 'coverage.parquet'
+        assert CoverageExporter.export(node, export_filepath, batch_size=4) == 'parquet'
+
+        table = parquet.read_table(export_filepath)
+        assert table.num_rows == len(list(node.walk()))
+        assert table.column('parent')[0].as_py() is None
+        assert table.column('n_lines')[0].as_py() == node.summary.n_lines
+
+        assert CoverageExporter.export(node, tmp_path / 'coverage') == 'parquet'
+        assert CoverageExporter.export(node, tmp_path / 'coverage.csv', export_format='parquet') == 'parquet'
+        assert parquet.read_table(tmp_path / 'coverage.csv').to_pylist() == table.to_pylist()
+
+    def test_export_invalid_format(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        with pytest.raises(ValueError, match="Invalid export format"):
+            CoverageExporter.export(node, tmp_path / 'coverage.csv', export_format='xlsx')
+        with pytest.raises(ValueError, match=re.escape("Invalid batch size (0). Must be at least 1.")):
+            CoverageExporter.export(node, tmp_path / 'coverage.csv', batch_size=0)
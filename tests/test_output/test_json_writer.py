@@ -0,0 +1,86 @@
+import io
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from covcheck import CompactCoverageTree
+from covcheck import CoverageJSONWriter
+from covcheck import CoverageNode
+from covcheck import CoverageNodeType
+from covcheck import CoverageSummary
+from covcheck._output import json_writer
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+class TestCoverageJSONWriter:
+    @pytest.mark.parametrize('output_format, kwargs', [
+        ('indent', {'indent': 4}),
+        ('compact', {'separators': (',', ':')}),
+    ])
+    def test_write(self, coverage_filepath: Path, output_format: str, kwargs: dict) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        for tree in (node, CompactCoverageTree.from_node(node).root):
+            f = io.StringIO()
+            CoverageJSONWriter.write(tree, f, output_format=output_format)
+            assert f.getvalue() == json.dumps(node.serialize(), **kwargs)
+
+    def test_write_escaped_names(self) -> None:
+        node = CoverageNode('root', CoverageNodeType.DIR)
+        node.add_child(CoverageNode('"é\\.py', CoverageNodeType.FILE, CoverageSummary(1, 1, 0, 0)))
+
+        f = io.StringIO()
+        CoverageJSONWriter.write(node, f)
+        assert f.getvalue() == json.dumps(node.serialize(), indent=4)
+
+    @pytest.mark.parametrize('output_format', ['indent', 'compact', 'ndjson'])
+    def test_write_buffered(self, monkeypatch: pytest.MonkeyPatch, output_format: str) -> None:
+        monkeypatch.setattr(json_writer, '_BUFFER_SIZE', 1024)
+        node = CoverageNode('root', CoverageNodeType.DIR)
+        for index in range(1000):
+            node.add_child(CoverageNode(f'{index}.py', CoverageNodeType.FILE, CoverageSummary(1, 1, 0, 0)), 'src')
+
+        writes: List[str] = []
+
+        def write(text: str) -> int:
+            writes.append(text)
+            return len(text)
+
+        f = io.StringIO()
+        monkeypatch.setattr(f, 'write', write)
+        CoverageJSONWriter.write(node, f, output_format=output_format)
+
+        expected = io.StringIO()
+        CoverageJSONWriter.write(node, expected, output_format=output_format)
+        assert ''.join(writes) == expected.getvalue()
+        assert len(writes) > 1
+        assert max(len(text) for text in writes) < 2048
+
+    def test_write_ndjson(self, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        f = io.StringIO()
+        CoverageJSONWriter.write(node, f, output_format='ndjson')
+
+        rows = [json.loads(line) for line in f.getvalue().splitlines()]
+        assert rows[0]['path'] == ''
+        assert rows[0]['parent'] is None
+        assert rows[0]['n_lines'] == node.summary.n_lines
+        assert rows[2] == {
+            'path': 'covcheck/__init__.py',
+            'name': '__init__.py',
+            'node_type': 'file',
+            'depth': 2,
+            'parent': 'covcheck',
+            'n_lines': 5,
+            'line_rate': 1.0,
+            'n_lines_covered': 5,
+            'n_branches': 0,
+            'branch_rate': 0,
+            'n_branches_covered': 0,
+        }
+        assert len(rows) == len(list(node.walk()))
+
+    def test_write_invalid_format(self) -> None:
+        with pytest.raises(ValueError, match="Invalid output format"):
+            CoverageJSONWriter.write(CoverageNode('root', CoverageNodeType.DIR), io.StringIO(), output_format='xml')
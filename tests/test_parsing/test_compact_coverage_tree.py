@@ -0,0 +1,103 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from covcheck import BaseCoverageNode
+from covcheck import CompactCoverageTree
+from covcheck import CoverageNode
+from covcheck import CoverageNodeType
+from covcheck import CoverageSummary
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+class TestCompactCoverageTree:
+    def test_from_node(self) -> None:
+        node = CoverageNode('root', CoverageNodeType.DIR)
+        node.add_child(CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(12, 6, 5, 2)), 'dir-1/dir-2')
+        node.add_child(CoverageNode('file-2.txt', CoverageNodeType.FILE, CoverageSummary(8, 2, 5, 1)), 'dir-1')
+        node.add_child(CoverageNode('file-3.txt', CoverageNodeType.FILE, CoverageSummary(1, 1, 0, 0)))
+
+        tree = CompactCoverageTree.from_node(node)
+        assert len(tree) == 6
+        assert list(tree.parents) == [-1, 0, 1, 2, 1, 0]
+        assert list(tree.sizes) == [6, 4, 2, 1, 1, 1]
+        assert tree.root.serialize() == node.serialize()
+
+    def test_from_file_nodes(self, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        compact_node = CoverageXMLParser.parse(coverage_filepath, compact=True)
+        assert compact_node.serialize() == node.serialize()
+
+    def test_from_file_nodes_duplicate(self) -> None:
+        file_nodes = [
+            (Path('dir-1'), CoverageNode('file-1.txt', CoverageNodeType.FILE)),
+            (Path('dir-1'), CoverageNode('file-1.txt', CoverageNodeType.FILE)),
+        ]
+        with pytest.raises(ValueError, match="A node with the name file-1.txt was already added as a child"):
+            CompactCoverageTree.from_file_nodes(file_nodes)
+
+    def test_from_file_nodes_invalid_dirpath(self) -> None:
+        file_nodes = [(Path('dir-1').parent, CoverageNode('file-1.txt', CoverageNodeType.FILE))]
+        with pytest.raises(ValueError, match="Invalid child dirpath: '.'"):
+            CompactCoverageTree.from_file_nodes(file_nodes)
+
+    def test_view(self) -> None:
+        file_nodes = [(Path('dir-1'), CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(4, 1, 2, 1)))]
+        root = CompactCoverageTree.from_file_nodes(file_nodes).root
+        assert root.name == 'root'
+        assert root.node_type == CoverageNodeType.DIR
+
+        directory = list(root.children())[0]
+        assert directory.name == 'dir-1'
+        assert directory.summary.line_rate == 0.25
+        assert directory.summary.branch_rate == 0.5
+
+        file_node = list(directory.children())[0]
+        assert file_node.node_type == CoverageNodeType.FILE
+        assert len(list(file_node.children())) == 0
+
+        assert root.parent is None
+        assert file_node.parent is not None
+        assert file_node.parent.name == 'dir-1'
+
+        with pytest.raises(TypeError, match="Nodes of a CompactCoverageTree cannot be modified"):
+            root.add_child(CoverageNode('file-2.txt', CoverageNodeType.FILE))
+        with pytest.raises(TypeError, match="Nodes of a CompactCoverageTree cannot be modified"):
+            file_node.set_summary(CoverageSummary(0, 0, 0, 0))
+
+    def test_empty(self) -> None:
+        root = CompactCoverageTree.from_file_nodes([]).root
+        assert root.summary.n_lines == 0
+        assert len(list(root.children())) == 0
+
+    def test_slots(self) -> None:
+        root = CompactCoverageTree.from_file_nodes([]).root
+        node = CoverageNode('root', CoverageNodeType.DIR)
+        assert not hasattr(root, '__dict__')
+        assert isinstance(root, BaseCoverageNode)
+        assert not isinstance(root, CoverageNode)
+        assert sys.getsizeof(root) < sys.getsizeof(node)
+
+    def test_find(self, coverage_filepath: Path) -> None:
+        root = CompactCoverageTree.from_node(CoverageXMLParser.parse(coverage_filepath)).root
+        file_node = root.find('covcheck/_cli/main.py')
+        assert file_node is not None
+        assert file_node.name == 'main.py'
+        assert file_node.node_type == CoverageNodeType.FILE
+        assert root.find('covcheck/missing.py') is None
+
+    def test_write_from_buffer(self, coverage_filepath: Path) -> None:
+        tree = CompactCoverageTree.from_node(CoverageXMLParser.parse(coverage_filepath))
+        buffer = io.BytesIO()
+        tree.write(buffer)
+
+        loaded_tree = CompactCoverageTree.from_buffer(buffer.getvalue())
+        assert len(loaded_tree) == len(tree)
+        assert loaded_tree.root.serialize() == tree.root.serialize()
+
+        with pytest.raises(ValueError, match="Invalid compact coverage tree, the data is truncated"):
+            CompactCoverageTree.from_buffer(buffer.getvalue()[:-1])
+        with pytest.raises(ValueError, match="Invalid compact coverage tree, unknown format"):
+            CompactCoverageTree.from_buffer(b'\0' * 64)
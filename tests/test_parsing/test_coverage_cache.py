@@ -0,0 +1,112 @@
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from covcheck import CompactCoverageNode
+from covcheck import CompactCoverageTree
+from covcheck import CoverageCache
+from covcheck import CoverageResult
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+class TestCoverageCache:
+    def test_store_load(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        cache = CoverageCache(tmp_path / 'cache')
+        key = cache.key(coverage_filepath)
+        assert cache.load(key) is None
+
+        node = CoverageXMLParser.parse(coverage_filepath)
+        cache.store(key, node)
+        tree = cache.load(key)
+        assert tree is not None
+        assert tree.root.serialize() == node.serialize()
+
+    def test_key(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        copy_filepath = tmp_path / 'coverage.xml'
+        copy_filepath.write_bytes(coverage_filepath.read_bytes())
+
+        cache = CoverageCache(tmp_path / 'cache')
+        assert cache.key(copy_filepath) == cache.key(coverage_filepath)
+        assert cache.key(coverage_filepath, trust_header=True) != cache.key(coverage_filepath)
+
+        stat_cache = CoverageCache(tmp_path / 'cache', hash_content=False)
+        key = stat_cache.key(copy_filepath)
+        assert key != stat_cache.key(coverage_filepath)
+        os.utime(copy_filepath, ns=(0, 0))
+        assert stat_cache.key(copy_filepath) != key
+
+    def test_evict(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        cache = CoverageCache(tmp_path / 'cache')
+        cache.store('a', node)
+        entry_size = (tmp_path / 'cache' / 'a.covtree').stat().st_size
+
+        cache = CoverageCache(tmp_path / 'cache', max_bytes=2 * entry_size)
+        cache.store('b', node)
+        os.utime(tmp_path / 'cache' / 'a.covtree', ns=(0, 0))
+        os.utime(tmp_path / 'cache' / 'b.covtree', ns=(1, 1))
+        assert cache.load('a') is not None
+
+        cache.store('c', node)
+        assert cache.load('b') is None
+        assert cache.load('a') is not None
+        assert cache.load('c') is not None
+
+        CoverageCache(tmp_path / 'cache', max_bytes=0).evict()
+        assert not list((tmp_path / 'cache').iterdir())
+
+    def test_evict_error(self, tmp_path: Path, coverage_filepath: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Entries which cannot be listed or deleted are kept rather than failing the run
+        def fail(*_: Any) -> None:
+            raise OSError("Permission denied")
+
+        cache = CoverageCache(tmp_path / 'cache')
+        cache.store('a', CoverageXMLParser.parse(coverage_filepath))
+        cache.max_bytes = 0
+        with monkeypatch.context() as m:
+            m.setattr(Path, 'unlink', fail)
+            cache.evict()
+        with monkeypatch.context() as m:
+            m.setattr(Path, 'glob', fail)
+            cache.evict()
+        assert cache.load('a') is not None
+
+    def test_store_error(self, tmp_path: Path, coverage_filepath: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Failures to write the cache are ignored, without leaving partially written entries behind
+        node = CoverageXMLParser.parse(coverage_filepath)
+        (tmp_path / 'file').touch()
+        CoverageCache(tmp_path / 'file').store('a', node)
+
+        def fail(*_: Any) -> None:
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(CompactCoverageTree, 'write', fail)
+        cache = CoverageCache(tmp_path / 'cache')
+        cache.store('a', node)
+        assert cache.load('a') is None
+        assert not list((tmp_path / 'cache').iterdir())
+
+    def test_invalid_entry(self, tmp_path: Path) -> None:
+        cache = CoverageCache(tmp_path)
+        (tmp_path / 'a.covtree').write_bytes(b'invalid')
+        (tmp_path / 'b.covtree').write_bytes(b'')
+        assert cache.load('a') is None
+        assert cache.load('b') is None
+
+        with pytest.raises(ValueError, match=re.escape("Invalid cache size (-1). Must be at least 0.")):
+            CoverageCache(tmp_path, max_bytes=-1)
+
+    def test_result_from_xml(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        cache = CoverageCache(tmp_path)
+        result = CoverageResult.from_xml(coverage_filepath, cache=cache)
+        assert not isinstance(result.tree, CompactCoverageNode)
+
+        cached_result = CoverageResult.from_xml(coverage_filepath, cache=cache)
+        assert isinstance(cached_result.tree, CompactCoverageNode)
+        assert cached_result.tree.serialize() == result.tree.serialize()
+
+        result = CoverageResult.from_xml(coverage_filepath, cache=cache, keep_lines=True)
+        assert not isinstance(result.tree, CompactCoverageNode)
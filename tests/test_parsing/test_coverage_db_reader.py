@@ -0,0 +1,64 @@
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from utilities.coverage_utilities import assert_same_coverage, run_coverage
+
+from covcheck._parsing import coverage_db_reader
+from covcheck._parsing.coverage_db_reader import CoverageDBReader
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+class TestCoverageDBReader:
+    @pytest.mark.parametrize('args', [(), ('--branch', ), ('--branch', '--context=test')])
+    def test_read(self, project_path: Path, args: tuple) -> None:
+        run_coverage(project_path, *args)
+        node = CoverageDBReader.read(project_path / '.coverage', keep_lines=True)
+        xml_node = CoverageXMLParser.parse(project_path / 'coverage.xml', keep_lines=True)
+        assert_same_coverage(node, xml_node)
+
+    def test_read_compact(self, project_path: Path) -> None:
+        run_coverage(project_path, '--branch')
+        node = CoverageDBReader.read(project_path / '.coverage', compact=True)
+        xml_node = CoverageXMLParser.parse(project_path / 'coverage.xml')
+        assert node.serialize() == xml_node.serialize()
+
+    def test_read_config(self, project_path: Path) -> None:
+        (project_path / '.coveragerc').write_text('[report]\nomit = main.py\nskip_empty = True\n')
+        run_coverage(project_path, '--branch')
+        node = CoverageDBReader.read(project_path / '.coverage')
+        assert node.find('main.py') is None
+        assert node.find('pkg/__init__.py') is None
+        assert node.serialize() == CoverageXMLParser.parse(project_path / 'coverage.xml').serialize()
+
+    def test_fail_missing_source(self, project_path: Path) -> None:
+        run_coverage(project_path)
+        (project_path / 'pkg' / 'sub' / 'mod.py').unlink()
+        with pytest.raises(ValueError, match=re.escape("Could not analyze")):
+            CoverageDBReader.read(project_path / '.coverage')
+
+    def test_fail_invalid(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match=re.escape("does not exist")):
+            CoverageDBReader.read(tmp_path / '.coverage')
+
+        filepath = tmp_path / 'not-a-database'
+        filepath.write_text('not a database')
+        with pytest.raises(ValueError, match=re.escape(f"Could not read coverage data file {filepath}")):
+            CoverageDBReader.read(filepath)
+
+        with pytest.raises(ValueError, match=re.escape("Compact trees do not keep per-line coverage")):
+            CoverageDBReader.read(filepath, compact=True, keep_lines=True)
+
+    def test_fail_not_installed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(coverage_db_reader, 'COVERAGE_INSTALLED', False)
+        with pytest.raises(ImportError, match=re.escape("pip install coverage")):
+            CoverageDBReader.read(tmp_path / '.coverage')
+
+    def test_fail_plugin(self, project_path: Path) -> None:
+        run_coverage(project_path)
+        with sqlite3.connect(project_path / '.coverage') as connection:
+            connection.execute("INSERT INTO tracer SELECT id, 'Cython.Coverage.Plugin' FROM file")
+        with pytest.raises(ValueError, match=re.escape("measured by the coverage.py plugin Cython.Coverage.Plugin")):
+            CoverageDBReader.read(project_path / '.coverage')
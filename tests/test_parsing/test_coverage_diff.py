@@ -0,0 +1,77 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from covcheck import CoverageChange, CoverageDiff, CoverageNode, CoverageNodeType, CoverageResult, CoverageSummary
+from covcheck._output.json_writer import CoverageJSONWriter
+
+
+def build_tree(files: dict) -> CoverageNode:
+    file_nodes = []
+    for filepath, summary in files.items():
+        dirpath, _, name = filepath.rpartition('/')
+        file_nodes.append((dirpath or None, CoverageNode(name, CoverageNodeType.FILE, summary)))
+    return CoverageNode.from_paths(file_nodes)
+
+
+class TestCoverageDiff:
+    def test_compare_unchanged(self, coverage_filepath: Path) -> None:
+        baseline = CoverageResult.from_xml(coverage_filepath).tree
+        assert not CoverageDiff.compare(baseline, CoverageResult.from_xml(coverage_filepath).tree)
+        assert not CoverageDiff.compare(baseline, CoverageResult.from_xml(coverage_filepath, compact=True).tree)
+
+    def test_compare(self) -> None:
+        baseline = build_tree({
+            'pkg/a.py': CoverageSummary(10, 8, 4, 2),
+            'pkg/b.py': CoverageSummary(10, 5, 0, 0),
+            'other/c.py': CoverageSummary(4, 4, 0, 0),
+            'removed/d.py': CoverageSummary(4, 0, 0, 0),
+        })
+        current = build_tree({
+            'pkg/b.py': CoverageSummary(10, 5, 0, 0),
+            'pkg/a.py': CoverageSummary(10, 7, 4, 3),
+            'other/c.py': CoverageSummary(4, 4, 0, 0),
+            'added/e.py': CoverageSummary(2, 2, 0, 0),
+        })
+
+        changes = CoverageDiff.compare(baseline, current)
+        assert [change.describe() for change in changes] == [
+            ".: line coverage 60.71% -> 69.23%, branch coverage 50.00% -> 75.00%",
+            "added/: added",
+            "pkg/: line coverage 65.00% -> 60.00%, branch coverage 50.00% -> 75.00%",
+            "pkg/a.py: line coverage 80.00% -> 70.00%, branch coverage 50.00% -> 75.00%",
+            "removed/: removed",
+        ]
+        assert [change.regressed() for change in changes] == [False, False, True, True, False]
+        assert [change.regressed(tolerance=10) for change in changes] == [False, False, False, False, False]
+
+    def test_compare_moved_file(self) -> None:
+        # Summaries of directories can stay the same while their files change
+        baseline = build_tree({'pkg/a.py': CoverageSummary(10, 8, 0, 0), 'pkg/b.py': CoverageSummary(10, 4, 0, 0)})
+        current = build_tree({'pkg/a.py': CoverageSummary(10, 4, 0, 0), 'pkg/b.py': CoverageSummary(10, 8, 0, 0)})
+        changes = CoverageDiff.compare(baseline, current)
+        assert [(change.path, change.regressed()) for change in changes] == [('pkg/a.py', True), ('pkg/b.py', False)]
+
+    def test_regressed(self) -> None:
+        baseline = CoverageSummary(10, 8, 4, 2)
+        assert not CoverageChange('a.py', CoverageNodeType.FILE, baseline, CoverageSummary(0, 0, 0, 0)).regressed()
+        change = CoverageChange('a.py', CoverageNodeType.FILE, baseline, CoverageSummary(10, 8, 4, 1))
+        assert change.regressed()
+        assert change.describe() == "a.py: branch coverage 50.00% -> 25.00%"
+
+    @pytest.mark.parametrize('output_format', ['indent', 'compact', 'ndjson'])
+    def test_read_output(self, tmp_path: Path, coverage_filepath: Path, output_format: str) -> None:
+        tree = CoverageResult.from_xml(coverage_filepath).tree
+        filepath = tmp_path / 'coverage.json'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            CoverageJSONWriter.write(tree, f, output_format=output_format)
+
+        assert CoverageDiff.read_output(filepath).serialize() == tree.serialize()
+
+    def test_read_output_fail(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'coverage.json'
+        for content in ['', '{"name": "root"}', '[1, 2]']:
+            filepath.write_text(content)
+            with pytest.raises(ValueError, match=re.escape(f"Could not read covcheck output {filepath}")):
+                CoverageDiff.read_output(filepath)
@@ -0,0 +1,63 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from utilities.coverage_utilities import assert_same_coverage, run_coverage
+
+from covcheck._parsing import coverage_json_reader
+from covcheck._parsing.coverage_json_reader import CoverageJSONReader
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+
+
+class TestCoverageJSONReader:
+    @pytest.mark.parametrize('args', [(), ('--branch', )])
+    def test_read(self, project_path: Path, args: tuple) -> None:
+        run_coverage(project_path, *args, report='json')
+        run_coverage(project_path, *args, report='xml')
+        node = CoverageJSONReader.read(project_path / 'coverage.json', keep_lines=True)
+        xml_node = CoverageXMLParser.parse(project_path / 'coverage.xml', keep_lines=True)
+        assert_same_coverage(node, xml_node)
+
+    def test_read_chunks(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Values, including numbers and multi-byte characters, are split between chunks
+        report = {
+            'meta': {'version': '7.0.0', 'branch_coverage': False},
+            'files': {
+                f'src/módulo_{index}.py': {'executed_lines': [1, 2, 10 + index], 'missing_lines': [123456]}
+                for index in range(20)
+            },
+            'totals': {'covered_lines': 60, 'num_statements': 80},
+        }
+        filepath = tmp_path / 'coverage.json'
+        filepath.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        expected = CoverageJSONReader.read(filepath).serialize()
+        assert len(expected['children'][0]['children']) == 20
+        for chunk_size in [1, 3, 64]:
+            monkeypatch.setattr(coverage_json_reader, '_CHUNK_SIZE', chunk_size)
+            assert CoverageJSONReader.read(filepath).serialize() == expected
+
+    def test_read_keep_lines_compact(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'coverage.json'
+        filepath.write_text('{"files": {}}')
+        with pytest.raises(ValueError, match=re.escape("Compact trees do not keep per-line coverage")):
+            CoverageJSONReader.read(filepath, compact=True, keep_lines=True)
+
+    def test_sniff(self) -> None:
+        assert CoverageJSONReader.sniff(b'{"meta": {')
+        assert CoverageJSONReader.sniff(b'\n  {')
+        assert not CoverageJSONReader.sniff(b'<coverage>')
+
+    @pytest.mark.parametrize('report, message', [
+        ('{"meta": {}}', "no attribute 'files'"),
+        ('{"files": {"main.py": {"executed_lines": []}}}', "no attribute 'missing_lines' in entry of main.py"),
+        ('{"files": {"main.py": []}}', "invalid entry of main.py"),
+        ('{"files": {"main.py": {"executed_lines": [1], ', "Could not parse coverage JSON"),
+        ('[]', "expected '{'"),
+    ])
+    def test_fail_invalid(self, tmp_path: Path, report: str, message: str) -> None:
+        filepath = tmp_path / 'coverage.json'
+        filepath.write_text(report)
+        with pytest.raises(ValueError, match=re.escape(message)):
+            CoverageJSONReader.read(filepath)
@@ -1,10 +1,12 @@
 from pathlib import Path
+from typing import List, Union
 
 import pytest
 
 from covcheck import CoverageNode
 from covcheck import CoverageNodeType
 from covcheck import CoverageSummary
+from covcheck._parsing.coverage_node import dirpath_parts
 
 
 class TestCoverageNode:
@@ -16,6 +18,11 @@ class TestCoverageNode:
         assert node.summary.n_lines == node.summary.n_branches == 0
         assert node.summary.line_rate == node.summary.branch_rate == 0
 
+    def test_slots(self) -> None:
+        node = CoverageNode('myfile', CoverageNodeType.FILE, summary=CoverageSummary(1, 1, 0, 0))
+        assert not hasattr(node, '__dict__')
+        assert not hasattr(node.summary, '__dict__')
+
     def test_add_child(self) -> None:
         node = CoverageNode('file-1', CoverageNodeType.DIR)
         child_node = CoverageNode('file-2', CoverageNodeType.FILE)
@@ -66,6 +73,63 @@ class TestCoverageNode:
         assert parent_node.summary.n_branches == 10
         assert parent_node.summary.branch_rate == 0.3
 
+    def test_summary_incremental(self) -> None:
+        parent_node = CoverageNode('parent', CoverageNodeType.DIR)
+        parent_node.add_child(CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(12, 6, 5, 2)), 'a/b')
+        directory_node = list(parent_node.children())[0]
+        assert directory_node.summary.n_lines == 12
+
+        parent_node.add_child(CoverageNode('file-2.txt', CoverageNodeType.FILE, CoverageSummary(8, 2, 5, 1)), 'a')
+        assert parent_node.summary.n_lines == directory_node.summary.n_lines == 20
+        assert parent_node.summary.n_branches_covered == 3
+
+    def test_replace_child(self) -> None:
+        parent_node = CoverageNode('parent', CoverageNodeType.DIR)
+        parent_node.add_child(CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(12, 6, 5, 2)), 'a')
+        parent_node.add_child(CoverageNode('file-2.txt', CoverageNodeType.FILE, CoverageSummary(8, 2, 5, 1)), 'a')
+
+        replacement = CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(10, 10, 0, 0))
+        parent_node.add_child(replacement, 'a', replace=True)
+        assert parent_node.summary.n_lines == 18
+        assert parent_node.summary.n_lines_covered == 12
+        assert parent_node.summary.n_branches == 5
+        assert [child.name for child in list(parent_node.children())[0].children()] == ['file-1.txt', 'file-2.txt']
+
+    def test_set_summary(self) -> None:
+        child_node = CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(12, 6, 5, 2))
+        parent_node = CoverageNode('parent', CoverageNodeType.DIR)
+        parent_node.add_child(child_node, 'a/b')
+
+        child_node.set_summary(CoverageSummary(4, 4, 2, 2))
+        assert parent_node.summary.n_lines == parent_node.summary.n_lines_covered == 4
+        assert parent_node.summary.branch_rate == 1.0
+
+        with pytest.raises(ValueError, match="Cannot set the summary of parent, it is aggregated from its children"):
+            parent_node.set_summary(CoverageSummary(0, 0, 0, 0))
+
+    def test_parent(self) -> None:
+        child_node = CoverageNode('file-1.txt', CoverageNodeType.FILE)
+        parent_node = CoverageNode('parent', CoverageNodeType.DIR)
+        assert child_node.parent is None
+
+        parent_node.add_child(child_node, 'a')
+        assert child_node.parent is not None
+        assert child_node.parent.name == 'a'
+
+        with pytest.raises(ValueError, match="The node file-1.txt was already added as a child of a"):
+            CoverageNode('other', CoverageNodeType.DIR).add_child(child_node)
+
+    def test_summary_replaced_by_children(self) -> None:
+        summary = CoverageSummary(3, 3, 0, 0)
+        node = CoverageNode('dir-1', CoverageNodeType.DIR, summary=summary)
+        parent_node = CoverageNode('parent', CoverageNodeType.DIR)
+        parent_node.add_child(node)
+        assert parent_node.summary.n_lines == 3
+
+        node.add_child(CoverageNode('file-1.txt', CoverageNodeType.FILE, CoverageSummary(1, 0, 0, 0)))
+        assert node.summary.n_lines == parent_node.summary.n_lines == 1
+        assert summary.n_lines == 3
+
     def test_serialize(self) -> None:
         summary = CoverageSummary(12, 6, 5, 2)
         node = CoverageNode('file-1', CoverageNodeType.FILE, summary=summary)
@@ -83,3 +147,67 @@ class TestCoverageNode:
                 'branch_rate': 0.4,
             }
         }
+
+    def test_deserialize(self) -> None:
+        root = CoverageNode('root', CoverageNodeType.DIR)
+        root.add_child(CoverageNode('a.py', CoverageNodeType.FILE, CoverageSummary(10, 5, 4, 2)), dirpath='pkg/sub')
+        root.add_child(CoverageNode('b.py', CoverageNodeType.FILE, CoverageSummary(6, 6, 0, 0)))
+        root.add_child(CoverageNode('c.py', CoverageNodeType.FILE, CoverageSummary(2, 1, 2, 0)), dirpath='pkg')
+        serialized = root.serialize()
+        assert CoverageNode.deserialize(serialized).serialize() == serialized
+
+        file_node = CoverageNode.deserialize(CoverageNode('a.py', CoverageNodeType.FILE).serialize())
+        assert file_node.node_type == CoverageNodeType.FILE
+        assert file_node.summary.n_lines == 0
+
+    def test_find(self) -> None:
+        node = CoverageNode('root', CoverageNodeType.DIR)
+        file_node = CoverageNode('file-1.txt', CoverageNodeType.FILE)
+        node.add_child(file_node, dirpath='dir-1/dir-2')
+
+        assert node.find('dir-1/dir-2/file-1.txt') is file_node
+        assert node.child('dir-1') is file_node.parent.parent  # type: ignore
+        assert node.find('dir-1/file-1.txt') is None
+        assert node.find('dir-1/dir-2/file-1.txt/other') is None
+
+    def test_walk(self) -> None:
+        node = CoverageNode('root', CoverageNodeType.DIR)
+        node.add_child(CoverageNode('file-1.txt', CoverageNodeType.FILE), dirpath='dir-1/dir-2')
+        node.add_child(CoverageNode('file-2.txt', CoverageNodeType.FILE), dirpath='dir-1')
+
+        assert [path for path, _ in node.walk()] == ['', 'dir-1', 'dir-1/dir-2', 'dir-1/dir-2/file-1.txt',
+                                                     'dir-1/file-2.txt']
+
+    def test_from_paths(self) -> None:
+        dirpaths = ['a/b', 'a', None, 'a/b', Path('a/c'), 'c/./d', 'c//d/', '/e', '..', 'a/b/c']
+        file_nodes = [(dirpath, CoverageNode(f'file-{index}.txt', CoverageNodeType.FILE,
+                                             CoverageSummary(index + 2, index, index % 3, index % 2)))
+                      for index, dirpath in enumerate(dirpaths)]
+        node = CoverageNode.from_paths(file_nodes)
+
+        expected_node = CoverageNode('root', CoverageNodeType.DIR)
+        for dirpath, file_node in file_nodes:
+            expected_node.add_child(CoverageNode(file_node.name, CoverageNodeType.FILE, file_node.summary),
+                                    dirpath=dirpath)
+        assert node.serialize() == expected_node.serialize()
+        assert [path for path, _ in node.walk()] == [path for path, _ in expected_node.walk()]
+        assert node.find('a/b/file-3.txt') is file_nodes[3][1]
+        assert node.find('c/d/file-6.txt') is file_nodes[6][1]
+
+        empty_node = CoverageNode.from_paths([])
+        assert empty_node.serialize() == CoverageNode('root', CoverageNodeType.DIR).serialize()
+
+    def test_from_paths_fail(self) -> None:
+        with pytest.raises(ValueError, match="A node with the name file-1.txt was already added as a child"):
+            CoverageNode.from_paths([('a', CoverageNode('file-1.txt', CoverageNodeType.FILE)),
+                                     ('a', CoverageNode('file-1.txt', CoverageNodeType.FILE))])
+        with pytest.raises(ValueError, match="A file node with the name a was already added as a child"):
+            CoverageNode.from_paths([(None, CoverageNode('a', CoverageNodeType.FILE)),
+                                     ('a/b', CoverageNode('file-1.txt', CoverageNodeType.FILE))])
+        with pytest.raises(ValueError, match="Invalid child dirpath: '.'"):
+            CoverageNode.from_paths([('.', CoverageNode('file-1.txt', CoverageNodeType.FILE))])
+
+    def test_dirpath_parts(self) -> None:
+        dirpaths: List[Union[Path, str]] = ['a', 'a/b/c', 'a//b/', './a', '/a/b', '..', Path('a/b')]
+        for dirpath in dirpaths:
+            assert dirpath_parts(dirpath) == Path(dirpath).parts
@@ -0,0 +1,71 @@
+import gzip
+import io
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from covcheck._parsing.coverage_reader import CoverageReader
+from covcheck._parsing.coverage_readers import detect_format, get_reader
+from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
+from covcheck._parsing.lcov_reader import LCOVReader
+
+
+class TestCoverageReaders:
+    def test_detect_format(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        assert detect_format(coverage_filepath) == 'xml'
+
+        lcov_filepath = tmp_path / 'lcov.info.gz'
+        with gzip.open(lcov_filepath, 'wb') as f:
+            f.write(b'TN:\nSF:main.c\nDA:1,1\nend_of_record\n')
+        assert detect_format(lcov_filepath) == 'lcov'
+
+        json_filepath = tmp_path / 'coverage.json'
+        json_filepath.write_text('{"meta": {}, "files": {}}')
+        assert detect_format(json_filepath) == 'json'
+
+        db_filepath = tmp_path / '.coverage'
+        with sqlite3.connect(db_filepath) as connection:
+            connection.execute('CREATE TABLE meta (key text, value text)')
+        assert detect_format(db_filepath) == 'coverage-db'
+
+        unknown_filepath = tmp_path / 'unknown'
+        unknown_filepath.write_text('not coverage')
+        assert detect_format(unknown_filepath) == 'xml'
+
+    def test_detect_format_stdin(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(b'SF:main.c\nDA:1,1\nend_of_record\n')))
+        monkeypatch.setattr(sys, 'stdin', stdin)
+        assert detect_format('-') == 'lcov'
+        assert get_reader('auto', '-').read('-').summary.n_lines == 1
+
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip.compress(b'SF:main.c\n'))))
+        monkeypatch.setattr(sys, 'stdin', stdin)
+        assert detect_format('-') == 'xml'
+
+    def test_get_reader(self, coverage_filepath: Path) -> None:
+        assert get_reader('lcov') is LCOVReader
+        assert get_reader('auto', coverage_filepath) is CoverageXMLParser
+
+    def test_fail_get_reader(self) -> None:
+        with pytest.raises(ValueError, match=re.escape("Invalid format (yaml). Must be one of: auto, xml, json, lcov, "
+                                                       "coverage-db.")):
+            get_reader('yaml')
+        with pytest.raises(ValueError, match=re.escape("requires its path")):
+            get_reader('auto')
+
+    def test_incomplete_reader(self) -> None:
+        with pytest.raises(TypeError, match="Coverage reader YAMLReader does not implement read"):
+            class YAMLReader(CoverageReader):  # pylint: disable=unused-variable
+                name = 'yaml'
+
+                @classmethod
+                def sniff(cls, head: bytes) -> bool:
+                    return head.startswith(b'---')
+
+    def test_parent_dirpath(self) -> None:
+        assert CoverageXMLParser._parent_dirpath('main.py') is None
+        for filepath in ['a/main.py', 'a/b/c/main.py', '/main.py', '/a/main.py', 'a//b/main.py', 'a/', 'a/.']:
+            assert Path(CoverageXMLParser._parent_dirpath(filepath) or '') == Path(filepath).parent
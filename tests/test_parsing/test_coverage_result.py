@@ -2,6 +2,8 @@ import math
 
 from pathlib import Path
 
+import pytest
+
 from covcheck import CoverageResult
 
 
@@ -10,3 +12,88 @@ class TestCoverageResult:
         result = CoverageResult.from_xml(coverage_filepath)
         assert math.isclose(result.summary.line_rate, 0.7561837455830389)
         assert math.isclose(result.summary.branch_rate, 0.5057471264367817)
+
+    def test_result_streaming(self, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_xml(coverage_filepath, streaming=True)
+        assert math.isclose(result.summary.line_rate, 0.7561837455830389)
+        assert math.isclose(result.summary.branch_rate, 0.5057471264367817)
+
+    def test_result_parallel(self, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_xml(coverage_filepath, jobs=2)
+        assert math.isclose(result.summary.line_rate, 0.7561837455830389)
+        assert math.isclose(result.summary.branch_rate, 0.5057471264367817)
+
+    def test_from_file(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_file(coverage_filepath)
+        assert math.isclose(result.summary.line_rate, 0.7561837455830389)
+
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text('SF:main.c\nDA:1,1\nDA:2,0\nend_of_record\n')
+        for file_format in ['auto', 'lcov']:
+            result = CoverageResult.from_file(filepath, file_format=file_format, keep_lines=True)
+            assert math.isclose(result.summary.line_rate, 0.5)
+
+    def test_merge(self, coverage_filepath: Path) -> None:
+        result = CoverageResult.merge([coverage_filepath, coverage_filepath], jobs=2)
+        assert math.isclose(result.summary.line_rate, 0.7561837455830389)
+        assert math.isclose(result.summary.branch_rate, 0.5057471264367817)
+
+    def test_summary_from_xml(self, coverage_filepath: Path) -> None:
+        summary = CoverageResult.summary_from_xml(coverage_filepath)
+        result = CoverageResult.from_xml(coverage_filepath)
+        assert math.isclose(summary.line_rate, result.summary.line_rate)
+        assert math.isclose(summary.branch_rate, result.summary.branch_rate)
+
+    def test_verify_xml(self, coverage_filepath: Path) -> None:
+        result, mismatches = CoverageResult.verify_xml(coverage_filepath)
+        assert math.isclose(result.summary.line_rate, 0.7561837455830389)
+        assert not mismatches
+
+    def test_diff_summary(self, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_xml(coverage_filepath, keep_lines=True)
+        changed_lines = {
+            'covcheck/_cli/main.py': (1 << 3) | (1 << 28) | (1 << 29),
+            'covcheck/missing.py': 1 << 1,
+            'covcheck/_cli': 1 << 1,
+        }
+
+        summary = result.diff_summary(changed_lines)
+        assert (summary.n_lines, summary.n_lines_covered) == (2, 1)
+        assert result.unmatched_paths(changed_lines) == ['covcheck/missing.py', 'covcheck/_cli']
+
+    def test_resolve_diff_paths(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_xml(coverage_filepath, keep_lines=True)
+        changed_lines = {
+            'src/covcheck/_cli/main.py': 1 << 3,
+            'lib/covcheck/__init__.py': 1 << 1,
+            'covcheck/_cli/main.py': 1 << 28,
+            'src/missing.py': 1 << 1,
+            'README.md': 1 << 1,
+        }
+        source_dirpaths = [str(tmp_path / 'src'), 'lib', str(tmp_path), '/elsewhere/src']
+
+        assert result.resolve_diff_paths(changed_lines, source_dirpaths, root=tmp_path) == {
+            'covcheck/_cli/main.py': (1 << 3) | (1 << 28),
+            'covcheck/__init__.py': 1 << 1,
+            'src/missing.py': 1 << 1,
+            'README.md': 1 << 1,
+        }
+        assert result.resolve_diff_paths(changed_lines, [], root=tmp_path) == changed_lines
+
+    def test_sources_from_xml(self, coverage_filepath: Path) -> None:
+        assert CoverageResult.sources_from_xml(coverage_filepath) == ['/Users/chris/Documents/src/covcheck']
+
+    def test_diff_summary_without_lines(self, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_xml(coverage_filepath)
+        with pytest.raises(ValueError, match="Per-line coverage of covcheck/__init__.py was not kept"):
+            result.diff_summary({'covcheck/__init__.py': 1 << 3})
+
+    def test_path_queries(self, coverage_filepath: Path) -> None:
+        result = CoverageResult.from_xml(coverage_filepath)
+
+        node = result.get('covcheck/_cli/main.py')
+        assert node is not None
+        assert node.summary.n_lines == 47
+        assert result.glob('**/*.py').n_lines == result.summary.n_lines
+        assert result.prefix('covcheck/_cli').n_lines == result.glob('covcheck/_cli').n_lines
+        assert result.index is result.index
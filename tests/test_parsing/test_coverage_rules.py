@@ -0,0 +1,65 @@
+import re
+
+import pytest
+
+from covcheck import CoverageNode
+from covcheck import CoverageNodeType
+from covcheck import CoverageSummary
+from covcheck._parsing.coverage_rules import CoverageRule
+from covcheck._parsing.coverage_rules import CoverageRules
+
+
+@pytest.fixture(name='root')
+def fixture_root() -> CoverageNode:
+    root = CoverageNode('root', CoverageNodeType.DIR)
+    root.add_child(CoverageNode('a.py', CoverageNodeType.FILE, CoverageSummary(4, 4, 2, 2)), dirpath='src/payments')
+    root.add_child(CoverageNode('b.py', CoverageNodeType.FILE, CoverageSummary(4, 2, 0, 0)),
+                   dirpath='src/payments/handlers')
+    root.add_child(CoverageNode('c.py', CoverageNodeType.FILE, CoverageSummary(10, 1, 2, 0)),
+                   dirpath='src/experimental/handlers')
+    return root
+
+
+class TestCoverageRules:
+    @pytest.mark.parametrize('pattern, n_lines', [
+        ('src/payments/**', 8),
+        ('src/payments', 8),
+        ('src/*/handlers', 14),
+        ('**/handlers/*.py', 14),
+        ('**/handlers/**', 14),
+        ('**', 18),
+        ('**/*.py', 18),
+        ('src/**/**/a.py', 4),
+        ('src/[!e]*/handlers/?.py', 4),
+    ])
+    def test_summaries(self, root: CoverageNode, pattern: str, n_lines: int) -> None:
+        summary = CoverageRules([CoverageRule(pattern)]).summaries(root)[0]
+        assert summary is not None
+        assert summary.n_lines == n_lines
+
+    def test_summaries_many_rules(self, root: CoverageNode) -> None:
+        rules = CoverageRules([CoverageRule('src/payments/**'), CoverageRule('src/payments/*.py'),
+                               CoverageRule('missing/**'), CoverageRule('src/payments/**')])
+        assert [summary.n_lines if summary else None for summary in rules.summaries(root)] == [8, 4, None, 8]
+
+    def test_check(self, root: CoverageNode) -> None:
+        rules = CoverageRules.from_config({
+            'src/payments/**': {'line': 75, 'branch': 100},
+            'src/experimental/**': {'line': 40, 'branch': 0},
+            'src/*/handlers': {'line': 20},
+            'missing/**': {'line': 10},
+        })
+        assert len(rules) == 4
+        assert rules.check(root) == [
+            "Line coverage of src/experimental/** (10.00%) below threshold (40%)",
+            "Rule missing/** matches no files",
+        ]
+
+    @pytest.mark.parametrize('rules, message', [
+        ({'src/**': 90}, "Invalid rule src/**. Must be a table of thresholds, such as {line = 90}."),
+        ({'src/**': {'lines': 90}}, "Invalid rule src/**. Unknown thresholds: lines."),
+        ({'src/**': {'branch': 101}}, "Invalid threshold for branch coverage (101) of rule src/**."),
+    ])
+    def test_from_config_invalid(self, rules: dict, message: str) -> None:
+        with pytest.raises(ValueError, match=re.escape(message)):
+            CoverageRules.from_config(rules)
@@ -0,0 +1,111 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from covcheck._parsing import coverage_source
+from covcheck._parsing.coverage_source import CoverageSource, ReplayReader, SpanReader
+
+
+@pytest.fixture(name='gzip_coverage_filepath')
+def fixture_gzip_coverage_filepath(tmp_path: Path, coverage_filepath: Path) -> Path:
+    filepath = tmp_path / 'coverage.xml.gz'
+    with open(coverage_filepath, 'rb') as f_in, gzip.open(filepath, 'wb') as f_out:
+        f_out.write(f_in.read())
+    return filepath
+
+
+def set_stdin(monkeypatch: pytest.MonkeyPatch, data: bytes) -> None:
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BufferedReader(io.BytesIO(data))))
+
+
+class TestCoverageSource:
+    def test_open(self, coverage_filepath: Path, gzip_coverage_filepath: Path) -> None:
+        with CoverageSource.open(coverage_filepath) as f:
+            data = f.read()
+        with CoverageSource.open(gzip_coverage_filepath) as f:
+            assert f.read() == data
+        with CoverageSource.open(str(gzip_coverage_filepath)) as f:
+            assert f.read(10) == data[:10]
+
+    def test_open_zstd(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        zstandard = pytest.importorskip('zstandard')
+        filepath = tmp_path / 'coverage.xml.zst'
+        data = coverage_filepath.read_bytes()
+        filepath.write_bytes(zstandard.ZstdCompressor().compress(data))
+
+        with CoverageSource.open(filepath) as f:
+            assert f.read() == data
+
+    def test_open_zstd_not_installed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(coverage_source, 'ZSTANDARD_INSTALLED', False)
+        filepath = tmp_path / 'coverage.xml.zst'
+        filepath.write_bytes(b'\x28\xb5\x2f\xfd')
+        with pytest.raises(ImportError, match="pip install zstandard"):
+            with CoverageSource.open(filepath):
+                pass
+
+    def test_open_stdin(self, monkeypatch: pytest.MonkeyPatch, gzip_coverage_filepath: Path,
+                        coverage_filepath: Path) -> None:
+        set_stdin(monkeypatch, gzip_coverage_filepath.read_bytes())
+        with CoverageSource.open('-') as f:
+            assert f.read() == coverage_filepath.read_bytes()
+        assert not sys.stdin.closed
+
+    def test_open_stdin_zstd(self, monkeypatch: pytest.MonkeyPatch, coverage_filepath: Path) -> None:
+        zstandard = pytest.importorskip('zstandard')
+        data = coverage_filepath.read_bytes()
+        set_stdin(monkeypatch, zstandard.ZstdCompressor().compress(data))
+        with CoverageSource.open('-') as f:
+            assert f.read() == data
+        assert not sys.stdin.closed
+
+    def test_is_plain_file(self, coverage_filepath: Path, gzip_coverage_filepath: Path) -> None:
+        assert CoverageSource.is_plain_file(coverage_filepath)
+        assert not CoverageSource.is_plain_file(gzip_coverage_filepath)
+        assert not CoverageSource.is_plain_file('-')
+        assert not CoverageSource.is_stdin(Path('-'))
+
+    def test_map(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        with CoverageSource.map(coverage_filepath) as data:
+            assert data[:] == coverage_filepath.read_bytes()
+
+        empty_filepath = tmp_path / 'empty.xml'
+        empty_filepath.touch()
+        with CoverageSource.map(empty_filepath) as data:
+            assert data == b''
+
+
+class TestReplayReader:
+    def test_rewind(self) -> None:
+        reader = ReplayReader(io.BytesIO(b'0123456789'))
+        assert reader.read(4) == b'0123'
+        assert reader.read(2) == b'45'
+        reader.rewind()
+        assert reader.read(3) == b'012'
+        assert reader.read(5) == b'345'
+        assert reader.read(5) == b'6789'
+        assert reader.read(5) == b''
+
+    def test_rewind_read_all(self) -> None:
+        reader = ReplayReader(io.BytesIO(b'0123456789'))
+        assert reader.read(4) == b'0123'
+        reader.rewind()
+        assert reader.read() == b'0123456789'
+
+
+class TestSpanReader:
+    def test_read(self) -> None:
+        reader = SpanReader(b'0123456789', [(1, 3), (5, 9)], prefix=b'<', suffix=b'>')
+        assert reader.read(2) == b'<1'
+        assert reader.read(4) == b'2567'
+        assert reader.read(4) == b'8>'
+        assert reader.read(4) == b''
+
+    def test_read_all(self) -> None:
+        reader = SpanReader(b'0123456789', [(0, 2), (2, 4), (8, 10)])
+        assert reader.read(1) == b'0'
+        assert reader.read() == b'12389'
+        assert reader.read() == b''
@@ -1,32 +1,72 @@
+import gzip
+import io
 import re
+import sys
+from concurrent import futures
 from pathlib import Path
-from xml.etree.ElementTree import Element, ParseError
+from typing import List
+from xml.etree.ElementTree import ParseError
 
 import pytest
 
 from covcheck._parsing.coverage_xml_parser import CoverageXMLParser
 
 
-class TestCoverageXmlParser:
+HEADER_XML = (
+    '<coverage lines-valid="3" lines-covered="2" branches-valid="2" branches-covered="1"><packages><package><classes>'
+    '<class name="a.py" filename="src/a.py" lines-valid="3" lines-covered="2" branches-valid="2" branches-covered="1">'
+    '<lines><line number="1" hits="1"/><line number="2" hits="0"/></lines></class>'
+    '</classes></package></packages></coverage>')
+
+
+SHARD_XML = (
+    '<coverage><packages><package><classes>'
+    '<class name="a.py" filename="src/a.py"><lines>{lines}</lines></class>'
+    '</classes></package></packages></coverage>')
+
+
+@pytest.fixture(name='shard_coverage_filepaths')
+def fixture_shard_coverage_filepaths(tmp_path: Path) -> List[Path]:
+    shards = [
+        '<line number="1" hits="1"/><line number="2" hits="0" branch="true" condition-coverage="50% (1/2)"/>',
+        '<line number="1" hits="0"/><line number="2" hits="1" branch="true" condition-coverage="0% (0/2)"/>',
+        '<line number="1" hits="0"/><line number="3" hits="0"/>',
+    ]
+    filepaths = []
+    for i, lines in enumerate(shards):
+        filepath = tmp_path / f'coverage-{i}.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(SHARD_XML.format(lines=lines))
+        filepaths.append(filepath)
+    return filepaths
+
+
+@pytest.fixture(name='header_coverage_filepath')
+def fixture_header_coverage_filepath(tmp_path: Path) -> Path:
+    filepath = tmp_path / 'coverage.xml'
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(HEADER_XML)
+    return filepath
+
+
+class TestCoverageXmlParser:  # pylint: disable=too-many-public-methods
     def test_parser_invalid_xml(self, tmp_path: Path) -> None:
         filepath = tmp_path / 'coverage.txt'
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write("[invalid xml]")
 
         parser = CoverageXMLParser()
-        with pytest.raises(ParseError, match="syntax error: line 1, column 0"):
+        with pytest.raises(ParseError):
             parser.parse(filepath)
+        for backend in ['etree', 'iterparse', 'expat']:
+            with pytest.raises(ParseError, match="syntax error: line 1, column 0"):
+                parser.parse(filepath, parser=backend)
 
     def test_parser_invalid_condition(self, invalid_coverage_filepath: Path) -> None:
         parser = CoverageXMLParser()
         with pytest.raises(ValueError, match=re.escape("Failed to parse condition-coverage XML: 0% (0//2)")):
             parser.parse(invalid_coverage_filepath)
 
-    def test_fail_try_get_child(self) -> None:
-        element = Element('tag')
-        with pytest.raises(ValueError, match="Could not parse coverage XML, no attribute 'attr'"):
-            CoverageXMLParser._try_get_child(element, 'attr')
-
     def test_parser(self, coverage_filepath: Path) -> None:
         parser = CoverageXMLParser()
         node = parser.parse(coverage_filepath)
@@ -34,3 +74,269 @@ class TestCoverageXmlParser:
 
         children = list(node.children())
         assert len(children) == 2
+
+    def test_parser_streaming(self, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        streamed_node = CoverageXMLParser.parse(coverage_filepath, streaming=True)
+        assert streamed_node.serialize() == node.serialize()
+
+    def test_parser_streaming_invalid_condition(self, invalid_coverage_filepath: Path) -> None:
+        with pytest.raises(ValueError, match=re.escape("Failed to parse condition-coverage XML: 0% (0//2)")):
+            CoverageXMLParser.parse(invalid_coverage_filepath, streaming=True)
+
+    @pytest.mark.parametrize('xml, tag', [
+        ('<coverage><sources/></coverage>', 'packages'),
+        ('<coverage><packages><package/></packages></coverage>', 'classes'),
+        ('<coverage><packages><package><classes><class name="a.py" filename="a.py"/></classes></package></packages>'
+         '</coverage>', 'lines'),
+    ])
+    def test_parser_streaming_missing_child(self, tmp_path: Path, xml: str, tag: str) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(xml)
+
+        for streaming in [False, True]:
+            with pytest.raises(ValueError, match=f"Could not parse coverage XML, no attribute '{tag}'"):
+                CoverageXMLParser.parse(filepath, streaming=streaming)
+
+        with pytest.raises(ValueError, match=f"Could not parse coverage XML, no attribute '{tag}'"):
+            CoverageXMLParser.parse(filepath, jobs=2)
+
+    def test_parse_header(self, coverage_filepath: Path) -> None:
+        summary = CoverageXMLParser.parse_header(coverage_filepath)
+        assert summary.n_lines == 283
+        assert summary.n_lines_covered == 214
+        assert summary.n_branches == 87
+        assert summary.n_branches_covered == 44
+
+    def test_parse_sources(self, tmp_path: Path, coverage_filepath: Path) -> None:
+        assert CoverageXMLParser.parse_sources(coverage_filepath) == ['/Users/chris/Documents/src/covcheck']
+
+        filepath = tmp_path / 'coverage.xml'
+        filepath.write_text('<coverage><sources><source> src </source><source/></sources></coverage>')
+        assert CoverageXMLParser.parse_sources(filepath) == ['src']
+
+    def test_parse_header_missing_attribute(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('<coverage lines-valid="3" lines-covered="2"><packages/></coverage>')
+
+        with pytest.raises(ValueError, match="Could not parse coverage XML, no attribute 'branches-valid'"):
+            CoverageXMLParser.parse_header(filepath)
+
+    def test_parser_trust_header(self, header_coverage_filepath: Path) -> None:
+        counted = CoverageXMLParser.parse(header_coverage_filepath).summary
+        assert (counted.n_lines, counted.n_lines_covered, counted.n_branches) == (2, 1, 0)
+
+        trusted = CoverageXMLParser.parse(header_coverage_filepath, trust_header=True).summary
+        assert (trusted.n_lines, trusted.n_lines_covered) == (3, 2)
+        assert (trusted.n_branches, trusted.n_branches_covered) == (2, 1)
+
+    def test_verify_header(self, coverage_filepath: Path) -> None:
+        node, mismatches = CoverageXMLParser.verify_header(coverage_filepath)
+        assert node.summary.n_lines == 283
+        assert not mismatches
+
+    @pytest.mark.parametrize('streaming', [False, True])
+    def test_verify_header_hit_counts(self, tmp_path: Path, streaming: bool) -> None:
+        # Cobertura reports other than coverage.py's record how many times each line was hit
+        filepath = tmp_path / 'coverage.xml'
+        filepath.write_text(
+            '<coverage lines-valid="3" lines-covered="2" branches-valid="0" branches-covered="0"><packages><package>'
+            '<classes><class name="a.py" filename="a.py" lines-valid="3" lines-covered="2" branches-valid="0" '
+            'branches-covered="0"><lines><line number="1" hits="12"/><line number="2" hits="1"/>'
+            '<line number="3" hits="0"/></lines></class></classes></package></packages></coverage>')
+
+        node, mismatches = CoverageXMLParser.verify_header(filepath, streaming=streaming, keep_lines=True)
+        assert not mismatches
+        file_node = node.find('a.py')
+        assert file_node is not None and file_node.line_coverage is not None
+        assert file_node.line_coverage.line_numbers == [1, 2, 3]
+        assert file_node.line_coverage.summary.n_lines_covered == 2
+        assert CoverageXMLParser.parse(filepath).summary.n_lines_covered == 2
+
+    def test_verify_header_mismatch(self, header_coverage_filepath: Path) -> None:
+        node, mismatches = CoverageXMLParser.verify_header(header_coverage_filepath, streaming=True)
+        assert node.summary.n_lines == 2
+        assert mismatches[0] == "src/a.py: lines-valid=3, counted 2"
+        assert mismatches[-1] == "<coverage>: branches-covered=1, counted 0"
+        assert len(mismatches) == 8
+
+    @pytest.mark.parametrize('jobs', [2, 3])
+    def test_parser_parallel(self, coverage_filepath: Path, jobs: int) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath)
+        parallel_node = CoverageXMLParser.parse(coverage_filepath, jobs=jobs)
+        assert parallel_node.serialize() == node.serialize()
+
+    def test_parser_parallel_in_process(self, coverage_filepath: Path, shard_coverage_filepaths: List[Path],
+                                        monkeypatch: pytest.MonkeyPatch) -> None:
+        # Run the jobs in threads, so that the code run in worker processes is measured as well
+        monkeypatch.setattr(futures, 'ProcessPoolExecutor', futures.ThreadPoolExecutor)
+        node = CoverageXMLParser.parse(coverage_filepath, jobs=2)
+        assert node.serialize() == CoverageXMLParser.parse(coverage_filepath).serialize()
+        node = CoverageXMLParser.merge(shard_coverage_filepaths, jobs=2)
+        assert node.serialize() == CoverageXMLParser.merge(shard_coverage_filepaths).serialize()
+
+    def test_parser_parallel_trust_header(self, header_coverage_filepath: Path) -> None:
+        summary = CoverageXMLParser.parse(header_coverage_filepath, trust_header=True, jobs=2).summary
+        assert (summary.n_lines, summary.n_lines_covered) == (3, 2)
+
+    def test_parser_parallel_empty_elements(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('<coverage><packages><package name="a"><classes/></package><package name="b"><classes>'
+                    '<class name="b.py" filename="b/b.py"><lines><line number="1" hits="1"/></lines></class>'
+                    '</classes></package></packages></coverage>')
+
+        node = CoverageXMLParser.parse(filepath, jobs=2)
+        assert node.serialize() == CoverageXMLParser.parse(filepath).serialize()
+
+    @pytest.mark.parametrize('prolog, classes', [
+        ('<!-- <packages><package><classes> -->', '<!-- <class name="x" filename="x.py"> -->'),
+        ('<!DOCTYPE coverage SYSTEM "coverage-04.dtd">', '<![CDATA[</class>]]>'),
+        ('<?xml-stylesheet href="coverage.xsl"?>', '<?pi </classes>?>'),
+        ('', '<class name="c/>.py" filename="c/c.py"><lines><line number="1" hits="0"/></lines></class>'),
+    ])
+    def test_parser_parallel_markup(self, tmp_path: Path, prolog: str, classes: str) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(f'<?xml version="1.0" ?>{prolog}<coverage><packages><package name="a"><classes>{classes}'
+                    '<class name="a.py" filename="a/a.py"><lines><line number="1" hits="1"/></lines></class>'
+                    '</classes></package></packages></coverage>')
+
+        node = CoverageXMLParser.parse(filepath, jobs=2)
+        assert node.serialize() == CoverageXMLParser.parse(filepath).serialize()
+
+    @pytest.mark.parametrize('parser', ['etree', 'iterparse', 'expat', 'lxml'])
+    def test_parser_parallel_encoding(self, tmp_path: Path, parser: str) -> None:
+        if parser == 'lxml':
+            pytest.importorskip('lxml')
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='iso-8859-1') as f:
+            f.write('<?xml version="1.0" encoding="ISO-8859-1"?><coverage><packages><package><classes>'
+                    '<class name="café.py" filename="src/café.py"><lines><line number="1" hits="1"/></lines></class>'
+                    '</classes></package></packages></coverage>')
+
+        node = CoverageXMLParser.parse(filepath, jobs=2, parser=parser)
+        assert node.serialize() == CoverageXMLParser.parse(filepath, parser=parser).serialize()
+        assert node.find('src/café.py') is not None
+
+    def test_parser_parallel_invalid(self, coverage_filepath: Path) -> None:
+        with pytest.raises(ValueError, match=re.escape("Invalid number of jobs (0). Must be at least 1.")):
+            CoverageXMLParser.parse(coverage_filepath, jobs=0)
+
+        with pytest.raises(ValueError, match="Parallel parsing does not support streaming"):
+            CoverageXMLParser.parse(coverage_filepath, streaming=True, jobs=2)
+
+    def test_parse_lines(self, coverage_filepath: Path) -> None:
+        records = list(CoverageXMLParser.parse_lines(coverage_filepath))
+        filename, name, line_coverage = records[0]
+        assert (filename, name) == ('covcheck/__init__.py', '__init__.py')
+        assert line_coverage.lines == line_coverage.covered == 0b101111000
+
+    @pytest.mark.parametrize('jobs', [1, 2])
+    def test_merge(self, shard_coverage_filepaths: List[Path], jobs: int) -> None:
+        node = CoverageXMLParser.merge(shard_coverage_filepaths, jobs=jobs)
+        summary = node.summary
+        assert (summary.n_lines, summary.n_lines_covered) == (3, 2)
+        assert (summary.n_branches, summary.n_branches_covered) == (2, 1)
+        assert [child.name for child in node.children()] == ['src']
+
+    def test_merge_same(self, coverage_filepath: Path) -> None:
+        node = CoverageXMLParser.merge([coverage_filepath, coverage_filepath], compact=True)
+        assert node.serialize() == CoverageXMLParser.parse(coverage_filepath).serialize()
+
+    def test_merge_classes_of_file(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('<coverage><packages><package><classes>'
+                    '<class name="Foo" filename="com/x/Foo.java"><lines><line number="1" hits="1"/></lines></class>'
+                    '<class name="Foo$Bar" filename="com/x/Foo.java"><lines><line number="5" hits="0"/></lines>'
+                    '</class>'
+                    '</classes></package></packages></coverage>')
+
+        node = CoverageXMLParser.merge([filepath])
+        assert node.serialize() == CoverageXMLParser.parse(filepath).serialize()
+        directory = node.find('com/x')
+        assert directory is not None
+        assert [child.name for child in directory.children()] == ['Foo', 'Foo$Bar']
+
+    def test_merge_invalid(self, coverage_filepath: Path) -> None:
+        with pytest.raises(ValueError, match="No coverage files to merge"):
+            CoverageXMLParser.merge([])
+
+        with pytest.raises(ValueError, match=re.escape("Invalid number of jobs (0). Must be at least 1.")):
+            CoverageXMLParser.merge([coverage_filepath], jobs=0)
+
+    @pytest.mark.parametrize('jobs', [1, 2])
+    @pytest.mark.parametrize('trust_header', [False, True])
+    def test_parser_keep_lines(self, coverage_filepath: Path, jobs: int, trust_header: bool) -> None:
+        node = CoverageXMLParser.parse(coverage_filepath, jobs=jobs, trust_header=trust_header, keep_lines=True)
+        assert node.serialize() == CoverageXMLParser.parse(coverage_filepath).serialize()
+
+        file_node = next(next(node.children()).children())
+        assert file_node.name == '__init__.py'
+        assert file_node.line_coverage is not None
+        assert file_node.line_coverage.line_numbers == [3, 4, 5, 6, 8]
+        assert CoverageXMLParser.parse(coverage_filepath).line_coverage is None
+
+    def test_merge_keep_lines(self, shard_coverage_filepaths: List[Path]) -> None:
+        node = CoverageXMLParser.merge(shard_coverage_filepaths, keep_lines=True)
+        file_node = next(next(node.children()).children())
+        assert file_node.line_coverage is not None
+        assert file_node.line_coverage.summary.n_lines_covered == file_node.summary.n_lines_covered
+
+    def test_parser_keep_lines_compact(self, coverage_filepath: Path) -> None:
+        with pytest.raises(ValueError, match="Compact trees do not keep per-line coverage"):
+            CoverageXMLParser.parse(coverage_filepath, compact=True, keep_lines=True)
+        with pytest.raises(ValueError, match="Compact trees do not keep per-line coverage"):
+            CoverageXMLParser.merge([coverage_filepath], compact=True, keep_lines=True)
+
+    @pytest.mark.parametrize('parser', ['etree', 'iterparse', 'expat', 'lxml'])
+    @pytest.mark.parametrize('jobs', [1, 2])
+    def test_parser_backends(self, coverage_filepath: Path, parser: str, jobs: int) -> None:
+        if parser == 'lxml':
+            pytest.importorskip('lxml')
+        node = CoverageXMLParser.parse(coverage_filepath)
+        assert CoverageXMLParser.parse(coverage_filepath, jobs=jobs, parser=parser).serialize() == node.serialize()
+        assert CoverageXMLParser.merge([coverage_filepath], jobs=jobs, parser=parser).serialize() == node.serialize()
+
+    def test_count_lines(self) -> None:
+        lines = [
+            {'number': '1', 'hits': '1'},
+            {'number': '2', 'hits': '0', 'branch': 'true', 'condition-coverage': '50% (1/2)'},
+            {'number': '3', 'hits': '1', 'branch': 'true', 'condition-coverage': '75% (3/4)\n'},
+            {'number': '4', 'hits': '2', 'branch': '', 'condition-coverage': 'ignored'},
+            {'number': '5', 'hits': '1', 'branch': 'true', 'condition-coverage': '100% (١٢/12)'},
+        ]
+        summary = CoverageXMLParser._count_lines(lines)
+        assert (summary.n_lines, summary.n_lines_covered, summary.n_branches, summary.n_branches_covered) == (
+            5, 4, 18, 16)
+
+    def test_count_lines_invalid_condition(self) -> None:
+        lines = [
+            {'number': '1', 'hits': '1', 'branch': 'true', 'condition-coverage': '50% (1/2)'},
+            {'number': '2', 'hits': '1', 'branch': 'true', 'condition-coverage': '50% (1/2)\x00 (1/2)'},
+        ]
+        with pytest.raises(ValueError, match="Failed to parse condition-coverage XML"):
+            CoverageXMLParser._count_lines(lines)
+
+    def test_parser_compressed_stdin(self, tmp_path: Path, coverage_filepath: Path,
+                                     monkeypatch: pytest.MonkeyPatch) -> None:
+        gzip_filepath = tmp_path / 'coverage.xml.gz'
+        with gzip.open(gzip_filepath, 'wb') as f:
+            f.write(coverage_filepath.read_bytes())
+
+        node = CoverageXMLParser.parse(coverage_filepath)
+        assert CoverageXMLParser.parse(gzip_filepath).serialize() == node.serialize()
+        assert CoverageXMLParser.parse_header(gzip_filepath).n_lines == 283
+
+        for parser in ['etree', 'expat']:
+            monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BufferedReader(io.BytesIO(
+                gzip_filepath.read_bytes()))))
+            verified_node, mismatches = CoverageXMLParser.verify_header('-', parser=parser)
+            assert verified_node.serialize() == node.serialize()
+            assert len(mismatches) == 0
+
+        with pytest.raises(ValueError, match="Parallel parsing requires an uncompressed coverage file"):
+            CoverageXMLParser.parse(gzip_filepath, jobs=2)
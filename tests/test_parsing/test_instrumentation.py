@@ -0,0 +1,86 @@
+import io
+import tracemalloc
+from typing import Iterator, List
+
+import pytest
+
+from covcheck import CoverageNode, CoverageNodeType, CoverageSummary, Instrumentation, PhaseMetrics
+from covcheck._parsing.instrumentation import Stopwatch, TimedReader, tree_counts
+
+
+@pytest.fixture(name='collected')
+def fixture_collected() -> Iterator[List[PhaseMetrics]]:
+    collected: List[PhaseMetrics] = []
+    Instrumentation.add_hook(collected.append)
+    yield collected
+    Instrumentation.remove_hook(collected.append)
+
+
+class TestInstrumentation:
+    def test_phase(self, collected: List[PhaseMetrics]) -> None:
+        assert Instrumentation.enabled()
+        with Instrumentation.phase('outer') as outer_counts:
+            with Instrumentation.phase('inner') as inner_counts:
+                inner_counts['files'] = 3
+            outer_counts['files'] = 4
+
+        assert [metrics.name for metrics in collected] == ['inner', 'outer']
+        inner, outer = collected
+        assert inner.counts == {'files': 3}
+        assert outer.counts == {'files': 4}
+        assert outer.wall_seconds >= inner.wall_seconds >= 0
+        assert inner.peak_memory is None
+        assert outer.to_dict()['counts'] == {'files': 4}
+
+    def test_phase_error(self, collected: List[PhaseMetrics]) -> None:
+        with pytest.raises(SystemExit):
+            with Instrumentation.phase('failing'):
+                raise SystemExit(1)
+        assert [metrics.name for metrics in collected] == ['failing']
+
+    def test_phase_disabled(self) -> None:
+        assert not Instrumentation.enabled()
+        with Instrumentation.phase('unmeasured') as counts:
+            counts['files'] = 1
+
+    def test_phase_peak_memory(self, collected: List[PhaseMetrics]) -> None:
+        tracemalloc.start()
+        try:
+            with Instrumentation.phase('outer'):
+                with Instrumentation.phase('inner'):
+                    data = bytearray(4 * 1024 * 1024)
+                    del data
+                with Instrumentation.phase('after'):
+                    pass
+        finally:
+            tracemalloc.stop()
+
+        peaks = {metrics.name: metrics.peak_memory for metrics in collected}
+        assert peaks['inner'] is not None and peaks['inner'] >= 4 * 1024 * 1024
+        assert peaks['after'] is not None and peaks['after'] < 1024 * 1024
+        assert peaks['outer'] is not None and peaks['outer'] >= peaks['inner']
+
+    def test_stopwatch(self, collected: List[PhaseMetrics]) -> None:
+        outer, inner = Stopwatch(), Stopwatch()
+        for _ in range(2):
+            with outer, inner:
+                pass
+        metrics = outer.metrics('outer', {'files': 2}, excluding=[inner])
+        assert metrics.wall_seconds >= 0
+        assert metrics.counts == {'files': 2}
+        Instrumentation.emit(metrics)
+        assert collected == [metrics]
+
+    def test_timed_reader(self) -> None:
+        stopwatch = Stopwatch()
+        reader = TimedReader(io.BytesIO(b'<coverage/>'), stopwatch)
+        assert reader.read(4) == b'<cov'
+        assert reader.read() == b'erage/>'
+        assert reader.n_bytes == 11
+        assert stopwatch.wall_seconds > 0
+
+    def test_tree_counts(self) -> None:
+        root = CoverageNode('root', CoverageNodeType.DIR)
+        root.add_child(CoverageNode('a.py', CoverageNodeType.FILE, CoverageSummary(10, 5, 4, 2)), dirpath='pkg')
+        root.add_child(CoverageNode('b.py', CoverageNodeType.FILE, CoverageSummary(6, 6, 0, 0)))
+        assert tree_counts(root) == {'files': 2, 'directories': 2, 'lines': 16, 'branches': 4}
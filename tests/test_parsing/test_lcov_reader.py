@@ -0,0 +1,106 @@
+import gzip
+import re
+from pathlib import Path
+
+import pytest
+
+from covcheck._parsing import lcov_reader
+from covcheck._parsing.lcov_reader import LCOVReader
+
+TRACEFILE = '''TN:
+SF:src/app/main.js
+FN:1,main
+FNDA:1,main
+DA:1,1
+DA:2,3,checksum
+DA:4,0
+DA:5,1
+BRDA:2,0,0,2
+BRDA:2,0,1,-
+BRDA:5,e1,0,0
+BRDA:5,e1,1,1
+BRF:4
+BRH:2
+LF:4
+LH:3
+end_of_record
+TN:
+SF:src/util.js
+DA:1,1
+DA:2,0
+end_of_record
+'''
+
+
+class TestLCOVReader:
+    def test_read(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text(TRACEFILE)
+        node = LCOVReader.read(filepath, keep_lines=True)
+
+        summary = node.summary
+        assert (summary.n_lines, summary.n_lines_covered) == (6, 4)
+        assert (summary.n_branches, summary.n_branches_covered) == (4, 2)
+
+        file_node = node.find('src/app/main.js')
+        assert file_node is not None and file_node.line_coverage is not None
+        assert file_node.line_coverage.line_numbers == [1, 2, 4, 5]
+        assert file_node.line_coverage.missing_line_numbers == [4]
+        assert list(file_node.line_coverage.branch_lines) == [2, 5]
+        assert list(file_node.line_coverage.branches_covered) == [1, 1]
+        assert list(file_node.line_coverage.branches_total) == [2, 2]
+
+        util_node = node.find('src/util.js')
+        assert util_node is not None and util_node.summary.n_lines_covered == 1
+
+    def test_read_merged_records(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text(TRACEFILE + 'SF:src/util.js\nDA:2,1\nDA:3,0\nend_of_record\n')
+        node = LCOVReader.read(filepath)
+
+        util_node = node.find('src/util.js')
+        assert util_node is not None
+        assert (util_node.summary.n_lines, util_node.summary.n_lines_covered) == (3, 2)
+
+    def test_read_chunks(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Records, and end_of_record lines, are split between chunks
+        filepath = tmp_path / 'lcov.info.gz'
+        with gzip.open(filepath, 'wt') as f:
+            f.write(TRACEFILE * 3)
+        expected = LCOVReader.read(filepath).serialize()
+        for chunk_size in [1, 5, 7, 64]:
+            monkeypatch.setattr(lcov_reader, '_CHUNK_SIZE', chunk_size)
+            assert LCOVReader.read(filepath).serialize() == expected
+
+    def test_read_absolute_paths(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text(f'SF:{tmp_path}/src/main.c\nDA:1,1\nend_of_record\nSF:/usr/include/stdio.h\nDA:1,0\n'
+                            'end_of_record\n')
+        node = LCOVReader.read(filepath)
+        assert node.find('src/main.c') is not None
+        assert node.find('usr/include/stdio.h') is not None
+
+    def test_read_compact(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text(TRACEFILE)
+        assert LCOVReader.read(filepath, compact=True).serialize() == LCOVReader.read(filepath).serialize()
+        with pytest.raises(ValueError, match=re.escape("Compact trees do not keep per-line coverage")):
+            LCOVReader.read(filepath, compact=True, keep_lines=True)
+
+    def test_sniff(self) -> None:
+        assert LCOVReader.sniff(b'TN:\nSF:main.c\n')
+        assert LCOVReader.sniff(b'\xef\xbb\xbfSF:main.c\n')
+        assert not LCOVReader.sniff(b'<?xml version="1.0" ?>')
+
+    @pytest.mark.parametrize('tracefile, message', [
+        ('SF:main.c\nDA:1,1\n', "no end_of_record after the last record"),
+        ('DA:1,1\nend_of_record\n', "no SF line in record"),
+        ('SF:main.c\nDA:one,1\nend_of_record\n', "invalid DA line in record of main.c"),
+        ('SF:main.c\nBRDA:1,0,0\nend_of_record\n', "invalid BRDA line in record of main.c"),
+    ])
+    def test_fail_invalid(self, tmp_path: Path, tracefile: str, message: str) -> None:
+        filepath = tmp_path / 'lcov.info'
+        filepath.write_text(tracefile)
+        with pytest.raises(ValueError, match=re.escape(message)):
+            LCOVReader.read(filepath)
@@ -0,0 +1,57 @@
+from covcheck._parsing.line_coverage import LineCoverage
+
+
+class TestLineCoverage:
+    def test_from_lines(self) -> None:
+        line_coverage = LineCoverage.from_lines([1, 2, 3, 10], [2, 10], [(3, 1, 2), (1, 0, 4)])
+        assert line_coverage.lines == 0b10000001110
+        assert line_coverage.covered == 0b10000000100
+        assert list(line_coverage.branch_lines) == [1, 3]
+        assert list(line_coverage.branches_covered) == [0, 1]
+        assert list(line_coverage.branches_total) == [4, 2]
+
+    def test_summary(self) -> None:
+        summary = LineCoverage.from_lines([1, 2, 3, 10], [2, 10], [(3, 1, 2), (1, 0, 4)]).summary
+        assert summary.n_lines == 4
+        assert summary.n_lines_covered == 2
+        assert summary.n_branches == 6
+        assert summary.n_branches_covered == 1
+
+    def test_union(self) -> None:
+        line_coverage_1 = LineCoverage.from_lines([1, 2, 3], [1], [(2, 1, 2)])
+        line_coverage_2 = LineCoverage.from_lines([1, 2, 3, 4], [2, 4], [(2, 0, 2), (3, 2, 2)])
+
+        summary = line_coverage_1.union(line_coverage_2).summary
+        assert summary.n_lines == 4
+        assert summary.n_lines_covered == 3
+        assert summary.n_branches == 4
+        assert summary.n_branches_covered == 3
+
+    def test_empty(self) -> None:
+        summary = LineCoverage().summary
+        assert summary.n_lines == summary.n_branches == 0
+
+    def test_line_numbers(self) -> None:
+        line_coverage = LineCoverage.from_lines([1, 2, 3, 10, 700], [2, 10])
+        assert line_coverage.line_numbers == [1, 2, 3, 10, 700]
+        assert line_coverage.covered_line_numbers == [2, 10]
+        assert line_coverage.missing_line_numbers == [1, 3, 700]
+
+    def test_intersection(self) -> None:
+        line_coverage = LineCoverage.from_lines([1, 2, 3, 4], [2, 4], [(2, 0, 2), (3, 2, 2)])
+        other = LineCoverage.from_lines([3, 4, 5], [])
+
+        intersection = line_coverage.intersection(other)
+        assert intersection.line_numbers == [3, 4]
+        assert intersection.covered_line_numbers == [4]
+        assert list(intersection.branch_lines) == [3]
+        assert list(intersection.branches_covered) == [2]
+
+    def test_in_range(self) -> None:
+        line_coverage = LineCoverage.from_lines([1, 2, 3, 4], [2, 4], [(2, 0, 2), (3, 2, 2)])
+
+        in_range = line_coverage.in_range(2, 4)
+        assert in_range.line_numbers == [2, 3]
+        assert in_range.covered_line_numbers == [2]
+        assert list(in_range.branch_lines) == [2, 3]
+        assert line_coverage.in_range(4, 2).summary.n_lines == 0
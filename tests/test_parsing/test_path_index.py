@@ -0,0 +1,64 @@
+import pytest
+
+from covcheck import CompactCoverageTree
+from covcheck import CoverageNode
+from covcheck import CoverageNodeType
+from covcheck import CoverageSummary
+from covcheck import PathIndex
+
+
+@pytest.fixture(name='root')
+def fixture_root() -> CoverageNode:
+    root = CoverageNode('root', CoverageNodeType.DIR)
+    root.add_child(CoverageNode('a.py', CoverageNodeType.FILE, CoverageSummary(1, 1, 0, 0)), dirpath='services/pay')
+    root.add_child(CoverageNode('b.py', CoverageNodeType.FILE, CoverageSummary(2, 1, 2, 1)),
+                   dirpath='services/pay/handlers')
+    root.add_child(CoverageNode('c.py', CoverageNodeType.FILE, CoverageSummary(4, 0, 0, 0)),
+                   dirpath='services/payroll/handlers')
+    root.add_child(CoverageNode('d.py', CoverageNodeType.FILE, CoverageSummary(8, 8, 2, 2)),
+                   dirpath='services/payroll/handlers/handlers')
+    root.add_child(CoverageNode('e.py', CoverageNodeType.FILE, CoverageSummary(16, 0, 0, 0)), dirpath='tools')
+    return root
+
+
+class TestPathIndex:
+    def test_get(self, root: CoverageNode) -> None:
+        index = PathIndex(root)
+        assert len(index) == 13
+
+        node = index.get('services/pay/handlers/b.py')
+        assert node is not None
+        assert node.summary.n_lines == 2
+        assert index.get('./services/pay/') is index.get('services/pay')
+        assert index.get('') is root
+        assert index.get('services/missing.py') is None
+
+    @pytest.mark.parametrize('pattern, n_lines', [
+        ('services/*/handlers', 14),
+        ('services/**/handlers', 14),
+        ('**/*.py', 31),
+        ('**', 31),
+        ('services/pay*/**/?.py', 15),
+        ('tools/e.py', 16),
+        ('missing/**', 0),
+        ('services/[!p]*', 0),
+    ])
+    def test_glob(self, root: CoverageNode, pattern: str, n_lines: int) -> None:
+        assert PathIndex(root).glob(pattern).n_lines == n_lines
+
+    @pytest.mark.parametrize('prefix, n_lines', [
+        ('services/pay', 15),
+        ('services/payroll/handlers/', 12),
+        ('t', 16),
+        ('', 31),
+        ('x', 0),
+    ])
+    def test_prefix(self, root: CoverageNode, prefix: str, n_lines: int) -> None:
+        assert PathIndex(root).prefix(prefix).n_lines == n_lines
+
+    def test_compact(self, root: CoverageNode) -> None:
+        index = PathIndex(CompactCoverageTree.from_node(root).root)
+        node = index.get('services/pay/handlers/b.py')
+        assert node is not None
+        assert node.summary.n_branches_covered == 1
+        assert index.glob('services/*/handlers').n_lines == 14
@@ -0,0 +1,82 @@
+import re
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from covcheck._parsing.unified_diff_parser import UnifiedDiffParser
+
+DIFF = """diff --git a/covcheck/_cli/main.py b/covcheck/_cli/main.py
+index 1111111..2222222 100644
+--- a/covcheck/_cli/main.py
++++ b/covcheck/_cli/main.py
+@@ -3,4 +3,5 @@ import argparse
+ context
+-removed
++added 4
++added 5
+ context
+ context
+@@ -20 +21 @@ def parse_args():
+-removed
++added 21
+\\ No newline at end of file
+diff --git a/removed.py b/removed.py
+deleted file mode 100644
+--- a/removed.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-removed
+-removed
+diff --git a/new.py b/new.py
+new file mode 100644
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1,2 @@
+++++ added 1
++added 2
+"""
+
+
+class TestUnifiedDiffParser:
+    def test_parse_lines(self) -> None:
+        changed_lines = UnifiedDiffParser.parse_lines(DIFF.splitlines())
+        assert changed_lines == {
+            'covcheck/_cli/main.py': (1 << 4) | (1 << 5) | (1 << 21),
+            'new.py': (1 << 1) | (1 << 2),
+        }
+
+    def test_parse(self, tmp_path: Path) -> None:
+        filepath = tmp_path / 'changes.diff'
+        filepath.write_text(DIFF, encoding='utf-8')
+        assert UnifiedDiffParser.parse(filepath) == UnifiedDiffParser.parse_lines(DIFF.splitlines())
+
+    def test_parse_quoted_path(self) -> None:
+        changed_lines = UnifiedDiffParser.parse_lines(['+++ "b/caf\\303\\251 \\"x\\".py"', '@@ -1 +1 @@', '+added'])
+        assert changed_lines == {'café "x".py': 1 << 1}
+
+    def test_parse_invalid_hunk_header(self) -> None:
+        with pytest.raises(ValueError, match="Could not parse diff hunk header: @@ invalid"):
+            UnifiedDiffParser.parse_lines(['+++ b/a.py', '@@ invalid'])
+
+    def test_parse_git(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        def git(*args: str) -> None:
+            subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args], cwd=tmp_path,
+                           check=True, capture_output=True)
+
+        git('init')
+        (tmp_path / 'a.py').write_text('a\nb\nc\n', encoding='utf-8')
+        git('add', 'a.py')
+        git('commit', '-m', 'Add a.py')
+        (tmp_path / 'a.py').write_text('a\nchanged\nc\nd\n', encoding='utf-8')
+
+        assert UnifiedDiffParser.parse_git('HEAD', cwd=tmp_path) == {'a.py': (1 << 2) | (1 << 4)}
+        for setting in ['diff.noprefix', 'diff.mnemonicPrefix']:
+            git('config', setting, 'true')
+            assert UnifiedDiffParser.parse_git('HEAD', cwd=tmp_path) == {'a.py': (1 << 2) | (1 << 4)}
+
+        with pytest.raises(ValueError, match=re.escape("Could not run git diff not-a-revision")):
+            UnifiedDiffParser.parse_git('not-a-revision', cwd=tmp_path)
+        monkeypatch.setenv('PATH', str(tmp_path / 'no-git'))
+        with pytest.raises(ValueError, match=re.escape("Could not run git diff")):
+            UnifiedDiffParser.parse_git('HEAD', cwd=tmp_path)
@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import List, Type
+from xml.etree.ElementTree import Element, ParseError
+
+import pytest
+
+from covcheck._parsing import xml_backends
+from covcheck._parsing.xml_backends import XML_BACKENDS, ClassData, XMLBackend, get_backend, try_get_child
+
+BACKENDS = [backend for backend in XML_BACKENDS.values() if backend.is_available()]
+
+
+def _read_classes(backend: Type[XMLBackend], filepath: Path) -> List[ClassData]:
+    with open(filepath, 'rb') as f:
+        return [(dict(attrib), None if lines is None else [dict(line) for line in lines])
+                for attrib, lines in backend.iter_classes(f)]
+
+
+class TestXMLBackends:
+    @pytest.mark.parametrize('backend', BACKENDS, ids=lambda backend: backend.name)
+    def test_iter_classes(self, coverage_filepath: Path, backend: Type[XMLBackend]) -> None:
+        classes = _read_classes(backend, coverage_filepath)
+        assert classes == _read_classes(xml_backends.EtreeBackend, coverage_filepath)
+        assert len(classes) == 20
+        assert classes[0][0]['filename'] == 'covcheck/__init__.py'
+
+    def test_iter_classes_expat_chunks(self, coverage_filepath: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(xml_backends, '_CHUNK_SIZE', 7)
+        classes = _read_classes(xml_backends.ExpatBackend, coverage_filepath)
+        assert classes == _read_classes(xml_backends.EtreeBackend, coverage_filepath)
+
+    @pytest.mark.parametrize('backend', BACKENDS, ids=lambda backend: backend.name)
+    def test_iter_classes_nesting(self, tmp_path: Path, backend: Type[XMLBackend]) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('<coverage><packages><package><classes><class name="a" filename="a"><other/>'
+                    '<lines><line number="1" hits="1"/></lines><lines><line number="2" hits="1"/></lines></class>'
+                    '</classes><classes><class name="b" filename="b"/></classes></package></packages>'
+                    '<packages><package><classes><class name="c" filename="c"/></classes></package></packages>'
+                    '</coverage>')
+
+        classes = _read_classes(backend, filepath)
+        assert classes == [({'name': 'a', 'filename': 'a'}, [{'number': '1', 'hits': '1'}])]
+
+    @pytest.mark.parametrize('backend', BACKENDS, ids=lambda backend: backend.name)
+    def test_iter_classes_invalid_xml(self, tmp_path: Path, backend: Type[XMLBackend]) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write("[invalid xml]")
+
+        with pytest.raises(ParseError):
+            _read_classes(backend, filepath)
+
+    @pytest.mark.parametrize('xml, tag', [
+        ('<coverage><sources/></coverage>', 'packages'),
+        ('<coverage><packages><package/></packages></coverage>', 'classes'),
+    ])
+    @pytest.mark.parametrize('backend', BACKENDS, ids=lambda backend: backend.name)
+    def test_iter_classes_missing_child(self, tmp_path: Path, backend: Type[XMLBackend], xml: str, tag: str) -> None:
+        filepath = tmp_path / 'coverage.xml'
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(xml)
+
+        with pytest.raises(ValueError, match=f"Could not parse coverage XML, no attribute '{tag}'"):
+            _read_classes(backend, filepath)
+
+    def test_get_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert get_backend('expat') is xml_backends.ExpatBackend
+        monkeypatch.setattr(xml_backends, 'LXML_INSTALLED', False)
+        assert get_backend() is xml_backends.ExpatBackend
+        assert get_backend(streaming=True) is xml_backends.ExpatBackend
+        monkeypatch.setattr(xml_backends, 'LXML_INSTALLED', True)
+        assert get_backend() is xml_backends.LxmlBackend
+
+    def test_get_backend_invalid(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with pytest.raises(ValueError, match="Invalid parser \\(sax\\)"):
+            get_backend('sax')
+        with pytest.raises(ValueError, match="The etree parser does not support streaming"):
+            get_backend('etree', streaming=True)
+        monkeypatch.setattr(xml_backends, 'LXML_INSTALLED', False)
+        with pytest.raises(ImportError, match="pip install lxml"):
+            get_backend('lxml')
+
+    def test_incomplete_backend(self) -> None:
+        with pytest.raises(TypeError, match="XML backend SaxBackend does not implement iter_classes"):
+            class SaxBackend(XMLBackend):  # pylint: disable=unused-variable
+                name = 'sax'
+
+    def test_fail_try_get_child(self) -> None:
+        element = Element('tag')
+        with pytest.raises(ValueError, match="Could not parse coverage XML, no attribute 'attr'"):
+            try_get_child(element, 'attr')
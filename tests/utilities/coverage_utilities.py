@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from covcheck._parsing.coverage_node import BaseCoverageNode
+
+MODULE_SOURCE = '''
+def sign(x):
+    if x > 0:
+        return 1
+    elif x < -100:  # pragma: no cover
+        return -2
+    for i in range(3):
+        if i == x:
+            break
+    return (x +
+            1)
+
+
+def unused():
+    return 0
+'''
+
+
+def write_project(dirpath: Path) -> None:
+    (dirpath / 'pkg' / 'sub').mkdir(parents=True)
+    (dirpath / 'pkg' / '__init__.py').touch()
+    (dirpath / 'pkg' / 'sub' / 'mod.py').write_text(MODULE_SOURCE)
+    (dirpath / 'main.py').write_text('from pkg.sub.mod import sign\nsign(1)\nsign(0)\n')
+
+
+def run_coverage(project_path: Path, *args: str, report: str = 'xml') -> None:
+    for command in [['run', *args, 'main.py'], [report, '-q']]:
+        subprocess.run([sys.executable, '-m', 'coverage', *command], cwd=project_path, check=True)
+
+
+def assert_same_coverage(node: BaseCoverageNode, xml_node: BaseCoverageNode, path: str = 'pkg/sub/mod.py') -> None:
+    assert node.serialize() == xml_node.serialize()
+
+    file_node = node.find(path)
+    assert file_node is not None and file_node.line_coverage is not None
+    xml_file_node = xml_node.find(path)
+    assert xml_file_node is not None and xml_file_node.line_coverage is not None
+    for attribute in ['lines', 'covered', 'branch_lines', 'branches_covered', 'branches_total']:
+        assert getattr(file_node.line_coverage, attribute) == getattr(xml_file_node.line_coverage, attribute)